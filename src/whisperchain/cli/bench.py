@@ -0,0 +1,519 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import click
+import numpy as np
+
+from whisperchain.core.codec import create_codec
+from whisperchain.core.config import ServerConfig
+from whisperchain.core.protocol import (
+    SAMPLE_RATE,
+    encode_audio_frame,
+    end_message,
+    hello_message,
+    start_message,
+)
+from whisperchain.utils.logger import get_logger
+from whisperchain.utils.wav import read_wav
+
+logger = get_logger(__name__)
+
+# Canned cleanup output of the fake LLM; its length sets how many deltas are streamed.
+FAKE_CLEANUP = "This is the cleaned transcription produced by the benchmark's fake LLM."
+
+Clip = Tuple[str, bytes]
+
+
+class Result(NamedTuple):
+    clip: str
+    audio_seconds: float
+    # From sending the end message to receiving the final message.
+    latency: float
+    timings: dict
+    error: Optional[str] = None
+
+
+def load_clips(directory: Path) -> List[Clip]:
+    paths = sorted(Path(directory).glob("*.wav"))
+    if not paths:
+        raise click.UsageError(f"No .wav files in {directory}")
+    return [(path.name, read_wav(path)) for path in paths]
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident memory of this process, None where it cannot be measured (non-Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class RSSSampler:
+    """
+    Tracks the peak resident memory of this process while in use.
+
+    Unlike the process-wide `ru_maxrss`, which never goes down, this measures each run
+    separately. Memory is polled on a background thread, so it is sampled while the event loop
+    is busy too.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RSSSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def summarize(
+    results: List[Result], wall_seconds: float, peak_rss_mb: Optional[float] = None
+) -> dict:
+    """
+    Throughput, latency percentiles and real-time factor of one benchmark run.
+
+    Args:
+        peak_rss_mb: Peak resident memory of the server during the run, if measured.
+    """
+    ok = [result for result in results if result.error is None]
+    audio_seconds = sum(result.audio_seconds for result in ok)
+    summary = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_second": round(len(ok) / wall_seconds, 3) if wall_seconds else None,
+        # Seconds of audio transcribed per second of wall time.
+        "audio_throughput": round(audio_seconds / wall_seconds, 3) if wall_seconds else None,
+    }
+    if ok:
+        latencies = np.array([result.latency for result in ok]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        decode = sum(result.timings.get("decode_ms", 0) for result in ok) / 1000
+        summary.update(
+            latency_p50_ms=round(float(p50), 1),
+            latency_p95_ms=round(float(p95), 1),
+            latency_p99_ms=round(float(p99), 1),
+            real_time_factor=round(decode / audio_seconds, 4) if audio_seconds else None,
+        )
+    summary["peak_rss_mb"] = round(peak_rss_mb, 1) if peak_rss_mb is not None else None
+    return summary
+
+
+def frames(pcm: bytes, frame_bytes: int) -> List[bytes]:
+    return [pcm[i : i + frame_bytes] for i in range(0, len(pcm), frame_bytes)]
+
+
+def create_fake_llm(latency: float, stream: bool):
+    """A fake chat model that answers after `latency` seconds, standing in for ChatOpenAI."""
+    from langchain_core.language_models import FakeListChatModel
+
+    # The fake model sleeps once per call, or once per character when streaming.
+    sleep = latency / len(FAKE_CLEANUP) if stream else latency
+    return FakeListChatModel(responses=[FAKE_CLEANUP], sleep=sleep or None)
+
+
+class MessageSink:
+    """Stands in for the websocket when driving the server in-process."""
+
+    def __init__(self):
+        self.final: Optional[dict] = None
+
+    async def send_json(self, message: dict):
+        if message.get("is_final"):
+            self.final = message
+
+
+class Benchmark:
+    """Replays WAV clips through a WhisperServer, in-process or over its websocket."""
+
+    def __init__(
+        self,
+        clips: List[Clip],
+        codec: str = "pcm",
+        frame_seconds: float = 1.0,
+        realtime: bool = False,
+        options: Optional[dict] = None,
+    ):
+        self.clips = clips
+        self.codec = codec
+        self.frame_bytes = int(frame_seconds * SAMPLE_RATE) * 2
+        # Send audio at the pace it would be recorded instead of as fast as possible.
+        self.realtime = realtime
+        self.frame_seconds = frame_seconds
+        self.options = options or {}
+
+    async def _pace(self):
+        if self.realtime:
+            await asyncio.sleep(self.frame_seconds)
+
+    async def replay_in_process(self, server, clip: Clip) -> Result:
+        """Feed a clip to the server's session handling directly, without a network."""
+        name, pcm = clip
+        session_id = uuid.uuid4().hex
+        codec = create_codec(self.codec)
+        sink = MessageSink()
+        session = server.start_session(
+            start_message(session_id, self.codec, options=self.options), client_id=session_id
+        )
+        seq = 0
+        try:
+            for chunk in frames(pcm, self.frame_bytes):
+                payload = codec.encode(chunk)
+                if payload:
+                    await server.receive_audio(sink, session, encode_audio_frame(seq, payload))
+                    seq += 1
+                await self._pace()
+            flushed = codec.flush()
+            if flushed:
+                await server.receive_audio(sink, session, encode_audio_frame(seq, flushed))
+                seq += 1
+            start = time.perf_counter()
+            await server.end_session(sink, session, seq - 1)
+        except Exception as e:
+            server.close_session(session, "error")
+            return Result(name, len(pcm) / 2 / SAMPLE_RATE, 0.0, {}, str(e) or type(e).__name__)
+        return Result(
+            name, len(pcm) / 2 / SAMPLE_RATE, time.perf_counter() - start, sink.final["timings"]
+        )
+
+    async def replay_websocket(self, websocket, clip: Clip) -> Result:
+        """Stream a clip over an open connection the way StreamClient does."""
+        name, pcm = clip
+        session_id = uuid.uuid4().hex
+        codec = create_codec(self.codec)
+        audio_seconds = len(pcm) / 2 / SAMPLE_RATE
+        await websocket.send(
+            json.dumps(start_message(session_id, self.codec, options=self.options))
+        )
+
+        async def receive() -> dict:
+            async for raw in websocket:
+                message = json.loads(raw)
+                if message.get("session_id") != session_id:
+                    continue
+                if message.get("type") == "error" or message.get("is_final"):
+                    return message
+            raise ConnectionError("Connection closed before the final result")
+
+        receiver = asyncio.create_task(receive())
+        seq = 0
+        for chunk in frames(pcm, self.frame_bytes):
+            payload = codec.encode(chunk)
+            if payload:
+                await websocket.send(encode_audio_frame(seq, payload))
+                seq += 1
+            await self._pace()
+        flushed = codec.flush()
+        if flushed:
+            await websocket.send(encode_audio_frame(seq, flushed))
+            seq += 1
+        start = time.perf_counter()
+        await websocket.send(json.dumps(end_message(session_id, seq - 1)))
+        message = await receiver
+        latency = time.perf_counter() - start
+        if message.get("type") == "error":
+            return Result(name, audio_seconds, latency, {}, message.get("error"))
+        return Result(name, audio_seconds, latency, message.get("timings", {}))
+
+    async def run(self, replay, concurrency: int, repeat: int) -> List[Result]:
+        """
+        Replay every clip `repeat` times with `concurrency` replays in flight.
+
+        `replay(worker, clip)` is awaited for each clip; each worker replays its clips one
+        after another.
+        """
+        queue = asyncio.Queue()
+        for _ in range(repeat):
+            for clip in self.clips:
+                queue.put_nowait(clip)
+        results: List[Result] = []
+
+        async def worker(index: int):
+            while not queue.empty():
+                results.append(await replay(index, queue.get_nowait()))
+
+        await asyncio.gather(*[worker(index) for index in range(concurrency)])
+        return results
+
+
+async def start_in_process(server):
+    """Run the server's startup and wait for its models and cleaner to load."""
+    await server.startup_event()
+    await asyncio.gather(server.model_task, server.cleaner_task)
+
+
+class ServerThread:
+    """Serves a WhisperServer with uvicorn on a background thread."""
+
+    def __init__(self, server, port: int):
+        import uvicorn
+
+        self.server = server
+        self.uvicorn = uvicorn.Server(
+            uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.uvicorn.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.uvicorn.config.port}/stream"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.uvicorn.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("Benchmark server failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.uvicorn.should_exit = True
+        self.thread.join()
+
+
+async def wait_until_ready(http_url: str, timeout: float = 600.0):
+    """Poll the server's /ready endpoint until its models and cleaner are loaded."""
+    import urllib.error
+    import urllib.request
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"{http_url}/ready") as response:
+                if response.status == 200:
+                    return
+        except urllib.error.HTTPError as e:
+            if e.code != 503:
+                raise
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Server at {http_url} not ready after {timeout}s")
+        await asyncio.sleep(0.2)
+
+
+async def bench_in_process(
+    benchmark: Benchmark, config: ServerConfig, llm, levels: List[int], repeat: int, warmup: int
+) -> List[dict]:
+    from whisperchain.server.server import WhisperServer
+
+    server = WhisperServer(config, llm=llm)
+    await start_in_process(server)
+    try:
+
+        async def replay(worker: int, clip: Clip) -> Result:
+            return await benchmark.replay_in_process(server, clip)
+
+        await benchmark.run(replay, 1, warmup)
+        rows = []
+        for concurrency in levels:
+            start = time.perf_counter()
+            with RSSSampler() as memory:
+                results = await benchmark.run(replay, concurrency, repeat)
+            summary = summarize(results, time.perf_counter() - start, memory.peak)
+            rows.append({"concurrency": concurrency, **summary})
+        return rows
+    finally:
+        await server.shutdown_event()
+
+
+async def bench_websocket(
+    benchmark: Benchmark,
+    url: str,
+    levels: List[int],
+    repeat: int,
+    warmup: int,
+    measure_memory: bool = True,
+) -> List[dict]:
+    """
+    Replay the clips over the websocket at `url` at each concurrency level.
+
+    Args:
+        measure_memory: Whether the server runs in this process, so its memory can be measured.
+    """
+    import websockets
+
+    await wait_until_ready(url.replace("ws", "http", 1).rsplit("/", 1)[0])
+    rows = []
+    for concurrency in [1] * bool(warmup) + levels:
+        # One connection per worker, kept across its utterances like the hotkey client's.
+        connections = [await websockets.connect(url, max_size=None) for _ in range(concurrency)]
+        try:
+            for websocket in connections:
+                await websocket.send(json.dumps(hello_message([benchmark.codec])))
+                hello = json.loads(await websocket.recv())
+                if hello.get("codec") != benchmark.codec:
+                    raise click.UsageError(f"Server does not accept the {benchmark.codec} codec")
+
+            async def replay(worker: int, clip: Clip) -> Result:
+                return await benchmark.replay_websocket(connections[worker], clip)
+
+            if warmup:
+                await benchmark.run(replay, 1, warmup)
+                warmup = 0
+                continue
+            start = time.perf_counter()
+            with RSSSampler() as memory:
+                results = await benchmark.run(replay, concurrency, repeat)
+            peak_rss_mb = memory.peak if measure_memory else None
+            summary = summarize(results, time.perf_counter() - start, peak_rss_mb)
+            rows.append({"concurrency": concurrency, **summary})
+        finally:
+            for websocket in connections:
+                await websocket.close()
+    return rows
+
+
+def print_table(rows: List[dict]):
+    columns = [
+        ("mode", "mode"),
+        ("model", "model"),
+        ("concurrency", "conc"),
+        ("requests", "reqs"),
+        ("errors", "errs"),
+        ("requests_per_second", "req/s"),
+        ("audio_throughput", "audio x"),
+        ("latency_p50_ms", "p50 ms"),
+        ("latency_p95_ms", "p95 ms"),
+        ("latency_p99_ms", "p99 ms"),
+        ("real_time_factor", "RTF"),
+        ("peak_rss_mb", "RSS MB"),
+    ]
+    table = [[header for _, header in columns]]
+    for row in rows:
+        cells = []
+        for key, _ in columns:
+            value = row.get(key)
+            cells.append(
+                f"{value:.1f}" if isinstance(value, float) and key == "peak_rss_mb" else str(value)
+            )
+        table.append(cells)
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    for line in table:
+        click.echo("  ".join(cell.rjust(width) for cell, width in zip(line, widths)))
+
+
+@click.command()
+@click.argument("wav_dir", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option(
+    "--mode",
+    type=click.Choice(["in-process", "websocket", "both"]),
+    default="both",
+    help="Drive the server directly, over its websocket, or both",
+)
+@click.option("--model", "models", multiple=True, help="Whisper model(s) to benchmark")
+@click.option(
+    "--concurrency", default="1,4", help="Comma-separated numbers of utterances in flight"
+)
+@click.option("--repeat", default=1, help="Times each clip is replayed per concurrency level")
+@click.option("--warmup", default=1, help="Untimed replays before measuring")
+@click.option("--workers", type=int, help="Inference workers (from the config if unset)")
+@click.option("--codec", default="pcm", help="Audio codec used on the websocket")
+@click.option("--frame-seconds", default=1.0, help="Seconds of audio per frame")
+@click.option("--realtime", is_flag=True, help="Send audio at recording speed")
+@click.option("--llm-latency", default=0.3, help="Seconds the fake LLM takes per cleanup")
+@click.option("--no-cleanup", is_flag=True, help="Skip LLM cleanup entirely")
+@click.option("--config", type=click.Path(exists=True), help="Path to config JSON file")
+@click.option("--url", help="Benchmark a running server's websocket instead of starting one")
+@click.option("--port", default=8765, help="Port of the websocket benchmark server")
+@click.option("--output", type=click.Path(path_type=Path), help="Write the results as JSON")
+def main(
+    wav_dir: Path,
+    mode: str,
+    models: Tuple[str, ...],
+    concurrency: str,
+    repeat: int,
+    warmup: int,
+    workers: Optional[int],
+    codec: str,
+    frame_seconds: float,
+    realtime: bool,
+    llm_latency: float,
+    no_cleanup: bool,
+    config: Optional[str],
+    url: Optional[str],
+    port: int,
+    output: Optional[Path],
+):
+    """
+    Benchmark transcription of the WAV files in WAV_DIR.
+
+    A fake LLM with a fixed latency replaces OpenAI, so only the whisper pipeline and the
+    server's own overhead vary between runs.
+    """
+    server_config = ServerConfig()
+    if config:
+        with open(config) as f:
+            config_dict = json.load(f)
+        server_config = ServerConfig.model_validate(config_dict.get("server", config_dict))
+    server_config.debug = False
+    # Repeated clips would otherwise be served from the cache after the first replay.
+    server_config.cleanup.cache.enabled = False
+    if workers:
+        server_config.inference.workers = workers
+    levels = [int(level) for level in concurrency.split(",")]
+    clips = load_clips(wav_dir)
+    total = sum(len(pcm) for _, pcm in clips) / 2 / SAMPLE_RATE
+    click.echo(f"{len(clips)} clips, {total:.1f} s of audio")
+    options = {"cleanup": False} if no_cleanup else {}
+    benchmark = Benchmark(clips, codec, frame_seconds, realtime, options)
+    llm = create_fake_llm(llm_latency, server_config.cleanup.stream)
+
+    rows: List[Dict] = []
+    for model in models or [server_config.model_name]:
+        model_config = server_config.model_copy(deep=True)
+        model_config.model_name = model
+        model_config.models.preload = [model]
+        # Ask for the model explicitly, so a running server (--url) uses it too.
+        benchmark.options = {**options, "model": model}
+        if mode in ("in-process", "both"):
+            results = asyncio.run(
+                bench_in_process(benchmark, model_config, llm, levels, repeat, warmup)
+            )
+            rows.extend({"mode": "in-process", "model": model, **row} for row in results)
+        if mode in ("websocket", "both"):
+            if url:
+                # The server's memory is not ours to measure.
+                results = asyncio.run(
+                    bench_websocket(benchmark, url, levels, repeat, warmup, measure_memory=False)
+                )
+            else:
+                from whisperchain.server.server import WhisperServer
+
+                with ServerThread(WhisperServer(model_config, llm=llm), port) as thread:
+                    results = asyncio.run(
+                        bench_websocket(benchmark, thread.url, levels, repeat, warmup)
+                    )
+            rows.extend({"mode": "websocket", "model": model, **row} for row in results)
+
+    print_table(rows)
+    if output:
+        output.write_text(json.dumps(rows, indent=2))
+        click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,29 @@ from pathlib import Path
 from typing import Optional
 
 import click
-import streamlit.web.cli as stcli
-import uvicorn
 
-from whisperchain.client.key_listener import HotKeyRecordingListener
-from whisperchain.core.config import ClientConfig, ServerConfig, config
-from whisperchain.server.server import WhisperServer
+from whisperchain.core.config import ClientConfig, ConfigManager, ServerConfig
+
+# Each component imports its heavy dependencies (uvicorn and the server, streamlit, pynput)
+# only when it runs, so e.g. --client-only starts without loading the server stack.
 
 
 def run_server(server_config: ServerConfig):
     """Run the WhisperServer with given config"""
+    import uvicorn
+
+    from whisperchain.server.server import WhisperServer
+
     server = WhisperServer(config=server_config)
     uvicorn.run(server.app, host=server_config.host, port=server_config.port)
 
 
 def run_ui():
     """Run the Streamlit UI"""
+    import streamlit.web.cli as stcli
+
     # Ensure config is up to date
-    config.generate_streamlit_config()
+    ConfigManager.get_instance().generate_streamlit_config()
 
     # Get the UI script path
     ui_path = Path(__file__).parent.parent / "ui" / "streamlit_app.py"
@@ -33,6 +38,8 @@ def run_ui():
 
 def run_client(client_config: ClientConfig):
     """Run the recording client"""
+    from whisperchain.client.key_listener import HotKeyRecordingListener
+
     listener = HotKeyRecordingListener(config=client_config)
     listener.start()
 
@@ -1,8 +1,6 @@
 import click
-import uvicorn
 
 from whisperchain.core.config import ServerConfig
-from whisperchain.server.server import WhisperServer
 from whisperchain.utils.secrets import load_secrets
 
 
@@ -16,6 +14,11 @@ def main(host: str, port: int, model: str, debug: bool):
     # Initialize secrets
     load_secrets()
 
+    # Import after parsing arguments so --help does not load the server stack.
+    import uvicorn
+
+    from whisperchain.server.server import WhisperServer
+
     config = ServerConfig(host=host, port=port, model_name=model, debug=debug)
     server = WhisperServer(config)
     uvicorn.run(server.app, host=config.host, port=config.port)
@@ -0,0 +1,133 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+import click
+import requests
+
+from whisperchain.core.config import UIConfig
+
+# Files uploaded from directories: WAV files and raw 16 kHz mono int16 PCM.
+RECORDING_SUFFIXES = (".wav", ".pcm", ".raw")
+
+
+def find_recordings(paths: Iterable[Path]) -> List[Path]:
+    """The given files, plus the recordings in the given directories and their subdirectories."""
+    recordings = []
+    for path in paths:
+        if path.is_dir():
+            recordings.extend(
+                sorted(
+                    child
+                    for child in path.rglob("*")
+                    if child.is_file() and child.suffix.lower() in RECORDING_SUFFIXES
+                )
+            )
+        else:
+            recordings.append(path)
+    return recordings
+
+
+def transcribe_file(url: str, path: Path, params: dict, timeout: float) -> dict:
+    """Upload a recording to the server's /transcribe and return its result."""
+    with open(path, "rb") as f:
+        # Passing the file streams it instead of reading it into memory.
+        response = requests.post(
+            url.rstrip("/") + "/transcribe",
+            data=f,
+            params={**params, "filename": path.name},
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=timeout,
+        )
+    if not response.ok:
+        try:
+            detail = response.json()["detail"]
+        except (ValueError, KeyError):
+            detail = response.text
+        raise RuntimeError(f"HTTP {response.status_code}: {detail}")
+    return response.json()
+
+
+def transcribe_files(
+    recordings: List[Path],
+    url: str,
+    params: dict,
+    output: TextIO,
+    concurrency: int = 4,
+    timeout: float = 600.0,
+) -> Tuple[int, int]:
+    """
+    Transcribe recordings with up to `concurrency` uploads in flight.
+
+    Each result is written to `output` as a JSON line with its `file` as soon as it completes,
+    so results arrive out of order. Failed files get an `error` instead.
+
+    Returns:
+        The numbers of transcribed and failed files.
+    """
+    done = failed = 0
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = {
+            executor.submit(transcribe_file, url, path, params, timeout): path
+            for path in recordings
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = {"file": str(path), **future.result()}
+                done += 1
+            except (OSError, RuntimeError, requests.RequestException) as e:
+                result = {"file": str(path), "error": str(e)}
+                failed += 1
+                click.echo(f"{path}: {e}", err=True)
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    return done, failed
+
+
+@click.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option("--url", default=UIConfig().server_url, help="Server URL")
+@click.option("--concurrency", default=4, help="Recordings uploaded at a time")
+@click.option("--no-cleanup", is_flag=True, help="Skip LLM cleanup of the transcriptions")
+@click.option("--model", help="Whisper model (the server's default if unset)")
+@click.option("--timeout", default=600.0, help="Seconds to wait for each recording's result")
+@click.option(
+    "--output", type=click.Path(path_type=Path), help="Append JSON lines here (stdout if unset)"
+)
+def main(
+    paths: Tuple[Path, ...],
+    url: str,
+    concurrency: int,
+    no_cleanup: bool,
+    model: Optional[str],
+    timeout: float,
+    output: Optional[Path],
+):
+    """
+    Transcribe recordings with a running server, writing one JSON line per recording.
+
+    PATHS are WAV or raw 16 kHz mono int16 PCM files, or directories of .wav, .pcm and .raw
+    files.
+    """
+    recordings = find_recordings(paths)
+    if not recordings:
+        raise click.UsageError("No recordings found")
+    params = {"cleanup": "false" if no_cleanup else "true"}
+    if model:
+        params["model"] = model
+    click.echo(f"Transcribing {len(recordings)} recordings", err=True)
+    if output:
+        with open(output, "a") as f:
+            done, failed = transcribe_files(recordings, url, params, f, concurrency, timeout)
+    else:
+        done, failed = transcribe_files(recordings, url, params, sys.stdout, concurrency, timeout)
+    click.echo(f"{done} transcribed, {failed} failed", err=True)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+from typing import Coroutine, Optional, Tuple
+
+import websockets
+from websockets.protocol import State
+
+from whisperchain.core.codec import PCMCodec, available_codecs
+from whisperchain.core.config import ClientConfig
+from whisperchain.core.protocol import hello_message
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def negotiate_codec_name(websocket, config: ClientConfig) -> str:
+    """Offer the configured codecs to the server and return the name of the one it picks."""
+    offered = [name for name in config.stream.codecs if name in available_codecs()]
+    if not offered or offered == [PCMCodec.name]:
+        return PCMCodec.name
+    await websocket.send(json.dumps(hello_message(offered)))
+    reply = json.loads(await websocket.recv())
+    return reply.get("codec", PCMCodec.name)
+
+
+def connect(config: ClientConfig):
+    """Open a websocket to the server with the configured keepalive pings."""
+    return websockets.connect(
+        config.server_url,
+        ping_interval=config.stream.ping_interval,
+        ping_timeout=config.stream.ping_timeout,
+    )
+
+
+class ConnectionManager:
+    """
+    Keeps one websocket connection to the server open across utterances.
+
+    The manager owns a single event loop running in a background thread; every utterance runs
+    on it (see `submit`), so the connection, its keepalive pings and the codec negotiated in the
+    handshake are reused instead of being set up again for each hotkey press. A dropped
+    connection is reopened on the next `connect` with exponential backoff.
+    """
+
+    def __init__(self, config: ClientConfig = None):
+        self.config = config or ClientConfig()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.websocket = None
+        self.codec_name: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def start(self):
+        if self._thread:
+            return
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info("ConnectionManager: Started event loop")
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self._lock = asyncio.Lock()
+        self.loop.run_forever()
+        self.loop.close()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self.submit(self.close()).result(timeout=5.0)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5.0)
+        self._thread = None
+        logger.info("ConnectionManager: Stopped event loop")
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Run a coroutine on the manager's event loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    @property
+    def connected(self) -> bool:
+        return self.websocket is not None and self.websocket.state is State.OPEN
+
+    async def connect(self) -> Tuple[object, str]:
+        """
+        Return the open connection and its negotiated codec, reconnecting if needed.
+
+        Raises:
+            ConnectionError: If the server is still unreachable after the configured retries.
+        """
+        async with self._lock:
+            if self.connected:
+                return self.websocket, self.codec_name
+            await self.reset()
+            stream_config = self.config.stream
+            delay = stream_config.reconnect_initial_delay
+            for attempt in range(stream_config.reconnect_attempts + 1):
+                try:
+                    websocket = await connect(self.config)
+                    try:
+                        self.codec_name = await negotiate_codec_name(websocket, self.config)
+                    except BaseException:
+                        # Don't leak the connection when the handshake fails or is cancelled.
+                        await websocket.close()
+                        raise
+                    self.websocket = websocket
+                    logger.info(f"ConnectionManager: Connected using {self.codec_name} codec")
+                    return self.websocket, self.codec_name
+                # A ValueError is a malformed handshake reply.
+                except (OSError, ValueError, websockets.WebSocketException) as e:
+                    if attempt == stream_config.reconnect_attempts:
+                        raise ConnectionError(f"Could not connect to the server: {e}") from e
+                    logger.warning(f"ConnectionManager: Connect failed ({e}), retry in {delay}s")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, stream_config.reconnect_max_delay)
+
+    async def reset(self):
+        """Drop the current connection; the next `connect` opens a new one."""
+        websocket, self.websocket = self.websocket, None
+        if websocket is not None:
+            try:
+                await websocket.close()
+            except Exception as e:
+                logger.warning(f"ConnectionManager: Error while closing connection: {e}")
+
+    async def close(self):
+        await self.reset()
+        logger.info("ConnectionManager: Connection closed")
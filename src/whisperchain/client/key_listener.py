@@ -1,11 +1,12 @@
-import asyncio
 import multiprocessing as mp
-from threading import Thread
+import time
 
 import pyperclip
 from pynput import keyboard
 
+from whisperchain.client.connection import ConnectionManager
 from whisperchain.client.stream_client import StreamClient
+from whisperchain.core.audio import WarmAudioCapture
 from whisperchain.core.config import ClientConfig
 from whisperchain.utils.decorators import handle_exceptions
 from whisperchain.utils.logger import get_logger
@@ -52,55 +53,104 @@ class HotKeyRecordingListener(HotKeyListener):
         self.config = config or ClientConfig(hotkey=hotkey)
         self.recording = False
         self.stop_event = mp.Event()
-        self.streaming_thread = None
+        # All utterances run on the connection manager's event loop and share its connection.
+        self.connection = ConnectionManager(self.config)
+        self.streaming_future = None
+        self.client = None
+        # When the hotkey was last released (`time.perf_counter()`), to measure latency.
+        self.released_at = None
+        self.capture = WarmAudioCapture(self.config.audio) if self.config.audio.warm else None
 
     @handle_exceptions
     async def _streaming_loop(self):
         messages = []
         total_bytes_sent = 0
-
-        async with StreamClient(config=self.config) as client:
+        cleaned_so_far = ""
+
+        connection = self.connection if self.config.stream.persistent else None
+        async with StreamClient(
+            config=self.config, connection=connection, capture=self.capture
+        ) as client:
+            self.client = client
+            # The hotkey may have been released before the client existed.
+            if self.stop_event.is_set():
+                client.stop()
             async for message in client.stream_microphone():
-                if self.stop_event.is_set():
-                    logger.info("Stopping audio capture")
-                    client.stop()
-
                 messages.append(message)
                 # Extract byte count from message text if available.
                 if not message.get("is_final"):
                     try:
-                        byte_count = int(message["processed_bytes"])
+                        byte_count = int(message.get("processed_bytes", 0))
                         total_bytes_sent += byte_count
                     except (IndexError, ValueError):
                         pass
+                if message.get("type") == "cleaned_delta":
+                    cleaned_so_far += message["delta"]
+                    logger.info(f"Cleaning: {cleaned_so_far.strip()}")
+                    continue
+                if message.get("type") == "error":
+                    logger.error(f"Server error: {message.get('error')}")
+                    break
                 if message.get("is_final"):
                     final_cleaned = message["cleaned_transcription"]
                     pyperclip.copy(final_cleaned)
                     logger.info(f"Copied to clipboard: {final_cleaned}")
+                    self._log_latency(message)
                     break
+        self.client = None
         # Optionally, you can log or store the messages/byte counts.
         logger.info(f"Async streaming loop finished. Total bytes sent: {total_bytes_sent}")
 
+    def _log_latency(self, message: dict):
+        """Log the time from hotkey release to the final result, and the server's share."""
+        if self.released_at is None:
+            return
+        latency_ms = (time.perf_counter() - self.released_at) * 1000
+        timings = message.get("timings", {})
+        logger.info(
+            f"End-to-end latency: {latency_ms:.0f} ms after release "
+            f"(server {timings.get('server_ms')} ms: "
+            f"decode wait {timings.get('decode_wait_ms')} ms, "
+            f"decode {timings.get('decode_ms')} ms, "
+            f"cleanup {timings.get('cleanup_ms')} ms; "
+            f"{timings.get('audio_seconds')} s of audio)"
+        )
+
     def on_activate(self):
         super().on_activate()
         if not self.recording:
+            self.released_at = None
             self.stop_event.clear()
             logger.info("Starting async streaming loop")
-            # Run the async _streaming_loop() in a background thread.
-            self.streaming_thread = Thread(
-                target=lambda: asyncio.run(self._streaming_loop()), daemon=True
-            )
-            self.streaming_thread.start()
+            self.streaming_future = self.connection.submit(self._streaming_loop())
             self.recording = True
 
     def on_deactivate(self, key):
         super().on_deactivate(key)
         if self.recording:
+            self.released_at = time.perf_counter()
             self.stop_event.set()
+            if self.client:
+                logger.info("Stopping audio capture")
+                self.client.stop()
             self.recording = False
-            logger.info("Joining streaming thread")
-            self.streaming_thread.join()
-            logger.info("Streaming thread joined")
+            logger.info("Waiting for streaming loop")
+            try:
+                self.streaming_future.result()
+            except Exception as e:
+                logger.error(f"Streaming loop failed: {e}")
+            logger.info("Streaming loop finished")
+
+    def start(self):
+        self.connection.start()
+        if self.capture:
+            self.capture.open()
+        try:
+            super().start()
+        finally:
+            if self.capture:
+                self.capture.close()
+            self.connection.stop()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,34 @@
 import asyncio
 import json
 import multiprocessing as mp
-import queue
 import threading
 import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
 
 import websockets
 
-from whisperchain.core.audio import AudioCapture
+from whisperchain.client.connection import (
+    ConnectionManager,
+    connect,
+    negotiate_codec_name,
+)
+from whisperchain.core.audio import (
+    AudioCapture,
+    AudioReader,
+    WarmAudioCapture,
+    bytes_per_second,
+)
+from whisperchain.core.codec import Codec, create_codec
 from whisperchain.core.config import ClientConfig
+from whisperchain.core.protocol import (
+    cancel_message,
+    encode_audio_frame,
+    end_message,
+    start_message,
+)
+from whisperchain.core.vad import SilenceGate
 from whisperchain.utils.decorators import handle_exceptions
 from whisperchain.utils.logger import get_logger
 
@@ -17,83 +37,210 @@ logger = get_logger(__name__)
 
 # StreamClient manages the connection to the WebSocket server and sends audio captured by AudioCapture.
 class StreamClient:
-    def __init__(self, config: ClientConfig = None):
+    def __init__(
+        self,
+        config: ClientConfig = None,
+        connection: ConnectionManager = None,
+        capture: WarmAudioCapture = None,
+    ):
         self.config = config or ClientConfig()
+        # Without a connection manager, each utterance opens its own connection.
+        self.connection = connection
+        # Without a warm capture, each utterance opens the microphone itself.
+        self.capture = capture
         self.server_url = self.config.server_url
         self.min_buffer_size = self.config.stream.min_buffer_size
-        self.audio_queue = queue.Queue()
+        self.audio_reader: Optional[AudioReader] = None
+        self.audio_capture: Optional[AudioCapture] = None
         self.is_audio_capturing = threading.Event()
         self.stop_event = threading.Event()
-        self.audio_thread = None
+        self.silence_gate = None
+        if self.config.audio.vad.enabled:
+            self.silence_gate = SilenceGate(self.config.audio.vad, self.config.audio.sample_rate)
 
     def _start_audio_capture(self):
-        self.stop_event.clear()
         self.is_audio_capturing.set()
-        capture = AudioCapture(self.audio_queue, self.is_audio_capturing, config=self.config.audio)
-        self.audio_thread = threading.Thread(target=capture.start)
-        self.audio_thread.start()
-        logger.info("StreamClient: Started recording thread")
+        audio_config = self.config.audio
+        self.audio_reader = AudioReader(
+            int(audio_config.capture_buffer_seconds * bytes_per_second(audio_config))
+        )
+        if self.capture:
+            self.capture.begin(self.audio_reader)
+            return
+        self.audio_capture = AudioCapture(
+            self.audio_reader, self.is_audio_capturing, config=audio_config
+        )
+        self.audio_capture.open()
 
     def _stop_audio_capture(self):
         if self.is_audio_capturing.is_set():
             logger.info("StreamClient: Stopping audio capture")
             self.is_audio_capturing.clear()
-        if self.audio_thread:
-            self.audio_thread.join(timeout=2.0)
-            if self.audio_thread.is_alive():
-                logger.warning("StreamClient: Audio thread still running")
-            self.audio_thread = None
+            if self.capture:
+                self.capture.end()
+            if self.audio_capture:
+                self.audio_capture.cleanup()
+                self.audio_capture = None
+            self.audio_reader.close()
+            if self.audio_reader.num_dropped:
+                logger.warning(
+                    f"StreamClient: Dropped {self.audio_reader.num_dropped} bytes of audio "
+                    "the sender could not keep up with"
+                )
             logger.info("StreamClient: Audio capture stopped")
 
     def stop(self):
+        """Stop recording; safe to call from any thread."""
         self.stop_event.set()
+        if self.audio_reader:
+            # Wake the sender if it is waiting for audio.
+            self.audio_reader.close()
+
+    @asynccontextmanager
+    async def _connect(self):
+        """Yield an open websocket and the codec negotiated on it."""
+        if self.connection is None:
+            logger.info("StreamClient: Connecting to server")
+            async with connect(self.config) as websocket:
+                logger.info("StreamClient: Connected to server")
+                yield websocket, await negotiate_codec_name(websocket, self.config)
+            return
+        websocket, codec_name = await self.connection.connect()
+        try:
+            yield websocket, codec_name
+        except (OSError, websockets.ConnectionClosed):
+            # Reconnect on the next utterance.
+            await self.connection.reset()
+            raise
+
+    def _create_codec(self, name: str) -> Codec:
+        logger.info(f"StreamClient: Using {name} codec")
+        return create_codec(name, self.config.audio.sample_rate, self.config.audio.channels)
+
+    async def _send_audio(self, websocket, codec: Codec, session_id: str):
+        """Send captured audio until recording stops, then the end message."""
+        audio_buffer = bytearray()
+        seq = 0
+
+        async def send_frame(pcm: bytes):
+            nonlocal seq
+            payload = codec.encode(pcm)
+            if payload:
+                # send() waits while the connection's write buffer is full; meanwhile capture
+                # keeps filling the reader, whose next read returns everything at once.
+                await websocket.send(encode_audio_frame(seq, payload))
+                logger.debug(f"StreamClient: Sent audio frame {seq}")
+                seq += 1
+
+        # Check if the stop event has been set (e.g., hotkey released)
+        while not self.stop_event.is_set():
+            data = await self.audio_reader.read()
+            if self.silence_gate:
+                # Only send speech (plus padding) to the server.
+                data = self.silence_gate.process(data)
+            audio_buffer.extend(data)
+            if len(audio_buffer) >= self.min_buffer_size:
+                await send_frame(bytes(audio_buffer))
+                audio_buffer.clear()
+
+        self._stop_audio_capture()
+        # The reader is closed now, so this returns at once with anything captured last.
+        data = await self.audio_reader.read()
+        audio_buffer.extend(self.silence_gate.process(data) if self.silence_gate else data)
+        if audio_buffer:
+            await send_frame(bytes(audio_buffer))
+        flushed = codec.flush()
+        if flushed:
+            await websocket.send(encode_audio_frame(seq, flushed))
+            seq += 1
+        logger.info("StreamClient: Sending end message")
+        await websocket.send(json.dumps(end_message(session_id, seq - 1)))
+
+    async def _receive_messages(self, websocket, session_id: str, messages: asyncio.Queue):
+        """Queue this utterance's messages from the server up to the final one."""
+        async for raw in websocket:
+            message = json.loads(raw)
+            logger.debug(f"StreamClient: Received message: {message}")
+            if message.get("session_id", session_id) != session_id:
+                # Late message from an earlier utterance on this connection.
+                continue
+            if message.get("type") == "started":
+                continue
+            await messages.put(message)
+            if message.get("is_final"):
+                return
+        raise ConnectionError("Connection closed before the final result")
+
+    @staticmethod
+    async def _forward_errors(coro, messages: asyncio.Queue):
+        try:
+            await coro
+        except Exception as e:
+            await messages.put(e)
 
     @handle_exceptions
     async def stream_microphone(self):
-        audio_buffer = bytearray()
-        end_sent = False
-        logger.info("StreamClient: Connecting to server")
-        async with websockets.connect(self.server_url) as websocket:
-            logger.info("StreamClient: Connected to server")
-            self._start_audio_capture()
-            while True:
-                # Check if the is_audio_capturing event has been cleared (e.g., hotkey released)
-                if self.stop_event.is_set() and not end_sent:
-                    self._stop_audio_capture()
-                    if audio_buffer:
-                        await websocket.send(bytes(audio_buffer))
-                        logger.info("StreamClient: Sent remaining audio, cleared buffer")
-                        audio_buffer.clear()
-                    logger.info("StreamClient: Sending END marker")
-                    await websocket.send(self.config.stream.end_marker.encode())
-                    end_sent = True
-
-                if not end_sent:
-                    try:
-                        data = self.audio_queue.get_nowait()
-                        logger.info(f"StreamClient: Got {len(data)} bytes from queue")
-                        audio_buffer.extend(data)
-                        if len(audio_buffer) >= self.min_buffer_size:
-                            await websocket.send(bytes(audio_buffer))
-                            logger.info("StreamClient: Sent audio chunk")
-                            audio_buffer.clear()
-                    except Exception:
-                        await asyncio.sleep(0.01)
-
-                try:
-                    message = await asyncio.wait_for(
-                        websocket.recv(), timeout=self.config.stream.timeout
+        """
+        Stream one utterance and yield the server's messages until the final result.
+
+        Audio is sent and messages are received by two concurrent tasks, so neither waits on
+        the other: the end message goes out as soon as recording stops and the final result is
+        yielded as soon as it arrives.
+        """
+        finished = False
+        session_id = uuid.uuid4().hex
+        # Start capturing before connecting; audio queues up until the stream is set up.
+        self._start_audio_capture()
+        async with self._connect() as (websocket, codec_name):
+            codec = self._create_codec(codec_name)
+            audio_config = self.config.audio
+            await websocket.send(
+                json.dumps(
+                    start_message(
+                        session_id,
+                        codec.name,
+                        sample_rate=audio_config.sample_rate,
+                        channels=audio_config.channels,
+                        format=audio_config.format,
+                        options=self.config.stream.options,
                     )
-                    msg = json.loads(message)
-                    logger.info(f"StreamClient: Received message: {msg}")
-                    yield msg
-                    if msg.get("is_final"):
-                        break
-                except asyncio.TimeoutError:
-                    continue
-            await asyncio.sleep(0.1)
+                )
+            )
+            # Messages, or the exception that ended the sender or receiver.
+            messages = asyncio.Queue()
+            tasks = [
+                asyncio.create_task(
+                    self._forward_errors(self._send_audio(websocket, codec, session_id), messages)
+                ),
+                asyncio.create_task(
+                    self._forward_errors(
+                        self._receive_messages(websocket, session_id, messages), messages
+                    )
+                ),
+            ]
+            try:
+                while not finished:
+                    message = await messages.get()
+                    if isinstance(message, Exception):
+                        raise message
+                    finished = bool(message.get("is_final"))
+                    yield message
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if not finished:
+                    await self._cancel(websocket, session_id)
             logger.info("StreamClient: Stream ended")
 
+    async def _cancel(self, websocket, session_id: str):
+        """Tell the server to discard an utterance that was abandoned before its final result."""
+        self._stop_audio_capture()
+        try:
+            await websocket.send(json.dumps(cancel_message(session_id)))
+        except (OSError, websockets.ConnectionClosed):
+            pass
+
     async def __aenter__(self):
         return self
 
@@ -1,22 +1,42 @@
+import asyncio
 import multiprocessing as mp
+import threading
+import time
 
+import numpy as np
 import pyaudio
 
+from whisperchain.core.buffer import RingBuffer
 from whisperchain.core.config import AudioConfig
 from whisperchain.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def bytes_per_second(config: AudioConfig) -> int:
+    return config.sample_rate * config.channels * np.dtype(config.format).itemsize
+
+
 class AudioCapture:
+    """
+    Microphone capture in PyAudio callback mode.
+
+    PortAudio calls `deliver` from its own thread with each captured chunk, so no Python thread
+    spends its time blocked in `stream.read`. Chunks go to `queue`, which only needs a `put`
+    method (a queue or an `AudioReader`).
+    """
+
     def __init__(self, queue: mp.Queue, is_recording: mp.Event, config: AudioConfig = None):
         self.queue = queue
         self.is_recording = is_recording
         self.config = config or AudioConfig()
         self.audio = None
         self.stream = None
+        self.num_chunks = 0
+        self.num_overflows = 0
 
-    def start(self):
+    def open(self):
+        """Open the microphone; audio is delivered until `cleanup` is called."""
         self.audio = pyaudio.PyAudio()
         self.stream = self.audio.open(
             format=getattr(pyaudio, f"pa{self.config.format.capitalize()}"),
@@ -24,22 +44,134 @@ class AudioCapture:
             rate=self.config.sample_rate,
             input=True,
             frames_per_buffer=self.config.chunk_size,
+            stream_callback=self._callback,
         )
         logger.info("AudioCapture: Started capturing audio")
-        while self.is_recording.is_set():
-            try:
-                data = self.stream.read(self.config.chunk_size, exception_on_overflow=False)
-                logger.info(f"AudioCapture: Captured {len(data)} bytes")
-                self.queue.put(data)
-            except Exception as e:
-                logger.error(f"AudioCapture error: {e}")
-                break
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status & pyaudio.paInputOverflow:
+            self.num_overflows += 1
+        try:
+            self.deliver(in_data)
+        except Exception as e:
+            logger.error(f"AudioCapture error: {e}")
+            return None, pyaudio.paAbort
+        self.num_chunks += 1
+        return None, pyaudio.paContinue
+
+    def start(self):
+        """Capture until `is_recording` is cleared (blocking)."""
+        self.open()
+        while self.is_recording.is_set() and self.stream.is_active():
+            time.sleep(0.05)
         self.cleanup()
 
+    def deliver(self, data: bytes):
+        self.queue.put(data)
+
     def cleanup(self):
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
+            self.stream = None
         if self.audio:
             self.audio.terminate()
-        logger.info("AudioCapture: Stopped capturing audio")
+            self.audio = None
+        logger.info(
+            f"AudioCapture: Stopped capturing audio after {self.num_chunks} chunks "
+            f"({self.num_overflows} overflows)"
+        )
+
+
+class AudioReader:
+    """
+    Hands audio from the capture thread to an asyncio consumer.
+
+    `put` copies each chunk into a preallocated ring buffer and wakes the event loop with
+    `call_soon_threadsafe` only if the consumer is not already due to wake up; `read` waits
+    without polling and returns everything captured since the previous read. If the consumer
+    falls more than the ring's capacity behind, the oldest audio is dropped.
+    """
+
+    def __init__(self, capacity: int, loop: asyncio.AbstractEventLoop = None):
+        self.loop = loop or asyncio.get_running_loop()
+        self.ring = RingBuffer(capacity)
+        self.num_dropped = 0
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self._wakeup_pending = False
+        self._closed = False
+
+    def _wake(self):
+        # Called with the lock held.
+        if not self._wakeup_pending:
+            self._wakeup_pending = True
+            self.loop.call_soon_threadsafe(self._ready.set)
+
+    def put(self, data: bytes):
+        with self._lock:
+            overflow = len(self.ring) + len(data) - self.ring.capacity
+            if overflow > 0:
+                self.num_dropped += overflow
+            self.ring.write(data)
+            self._wake()
+
+    def close(self):
+        """Wake the consumer; `read` returns whatever is left, then empty bytes."""
+        with self._lock:
+            self._closed = True
+            self._wake()
+
+    async def read(self) -> bytes:
+        """Wait for captured audio and return it; empty once closed and drained."""
+        await self._ready.wait()
+        with self._lock:
+            self._ready.clear()
+            self._wakeup_pending = False
+            data = self.ring.drain()
+            if self._closed:
+                # Keep waking the consumer so every later read returns immediately.
+                self._wake()
+        return data
+
+
+class WarmAudioCapture(AudioCapture):
+    """
+    Microphone capture that stays open between utterances.
+
+    While no utterance is recording, captured audio goes into a ring buffer holding the last
+    `preroll_ms`. `begin` hands that pre-roll to the utterance's queue followed by live audio, so
+    the first words spoken as the hotkey is pressed are neither delayed by opening the device nor
+    clipped.
+    """
+
+    def __init__(self, config: AudioConfig = None):
+        super().__init__(None, threading.Event(), config)
+        bytes_per_frame = self.config.channels * np.dtype(self.config.format).itemsize
+        preroll_frames = int(self.config.preroll_ms * self.config.sample_rate / 1000)
+        self.preroll = RingBuffer(preroll_frames * bytes_per_frame)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.end()
+        self.cleanup()
+
+    def begin(self, target):
+        """Send the pre-roll and then live audio to `target` until `end` is called."""
+        with self._lock:
+            preroll = self.preroll.drain()
+            if preroll:
+                target.put(preroll)
+            self.queue = target
+        logger.info(f"WarmAudioCapture: Started utterance with {len(preroll)} bytes of pre-roll")
+
+    def end(self):
+        with self._lock:
+            self.queue = None
+
+    def deliver(self, data: bytes):
+        with self._lock:
+            if self.queue is None:
+                self.preroll.write(data)
+            else:
+                self.queue.put(data)
@@ -0,0 +1,176 @@
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INT16_SCALE = np.float32(np.iinfo(np.int16).max)
+
+
+class AudioBufferFull(RuntimeError):
+    """Raised when appending would exceed the buffer's upper bound."""
+
+
+class PCMBuffer:
+    """
+    Growable float32 audio buffer fed with raw int16 PCM chunks.
+
+    Each chunk is converted to float32 directly into preallocated storage, so appending is
+    amortized O(chunk) and `view()` hands whisper a ready float32 array without further copies.
+    Storage doubles when full, up to `max_seconds`. If `spill_after_seconds` is set, storage
+    beyond that size moves to a memory-mapped temporary file instead of RAM.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        initial_seconds: float = 10.0,
+        max_seconds: float = 600.0,
+        spill_after_seconds: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_seconds * sample_rate)
+        self.spill_samples = (
+            int(spill_after_seconds * sample_rate) if spill_after_seconds is not None else None
+        )
+        self.spill_dir = spill_dir
+        self._data = np.empty(
+            min(int(initial_seconds * sample_rate), self.max_samples), np.float32
+        )
+        self._size = 0
+        # A chunk may end in the middle of an int16 sample; keep the odd byte for the next one.
+        self._pending = b""
+        self._spill_file = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def num_bytes(self) -> int:
+        """Number of PCM bytes appended so far."""
+        return self._size * 2 + len(self._pending)
+
+    @property
+    def free_bytes(self) -> int:
+        """Number of PCM bytes that can still be appended before the buffer is full."""
+        return (self.max_samples - self._size) * 2 - len(self._pending)
+
+    @property
+    def duration(self) -> float:
+        """Buffered audio duration in seconds."""
+        return self._size / self.sample_rate
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill_file is not None
+
+    def _reserve(self, num_samples: int):
+        required = self._size + num_samples
+        if required <= len(self._data):
+            return
+        if required > self.max_samples:
+            raise AudioBufferFull(
+                f"Audio buffer limit of {self.max_samples / self.sample_rate:.0f}s exceeded"
+            )
+        capacity = min(max(required, 2 * len(self._data)), self.max_samples)
+        if self.spill_samples is not None and capacity > self.spill_samples:
+            self._grow_on_disk(capacity)
+        else:
+            data = np.empty(capacity, np.float32)
+            data[: self._size] = self._data[: self._size]
+            self._data = data
+
+    def _grow_on_disk(self, capacity: int):
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(
+                prefix="whisperchain-", dir=Path(self.spill_dir) if self.spill_dir else None
+            )
+            logger.info(f"PCMBuffer: Spilling audio to disk after {self.duration:.1f}s")
+            previous = self._data[: self._size]
+        else:
+            previous = None
+        self._spill_file.truncate(capacity * np.dtype(np.float32).itemsize)
+        # Remapping the grown file keeps what is already on disk, so only the first spill copies.
+        self._data = np.memmap(self._spill_file, dtype=np.float32, mode="r+", shape=(capacity,))
+        if previous is not None:
+            self._data[: self._size] = previous
+
+    def append(self, data: bytes):
+        """Append int16 PCM bytes, converting them to float32 in place."""
+        if self._pending:
+            data = self._pending + data
+        usable = len(data) - len(data) % 2
+        self._pending = bytes(data[usable:])
+        samples = np.frombuffer(data, dtype=np.int16, count=usable // 2)
+        if not len(samples):
+            return
+        self._reserve(len(samples))
+        out = self._data[self._size : self._size + len(samples)]
+        np.divide(samples, INT16_SCALE, out=out, casting="unsafe")
+        self._size += len(samples)
+
+    def view(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Float32 view of the buffered samples; valid until the buffer is closed."""
+        end = self._size if end is None else min(end, self._size)
+        return self._data[start:end]
+
+    def to_pcm16(self) -> bytes:
+        """Convert the buffered audio back to int16 PCM bytes (e.g. for playback)."""
+        return np.rint(self.view() * INT16_SCALE).astype(np.int16).tobytes()
+
+    def close(self):
+        """Release any spill file."""
+        if self._spill_file is not None:
+            self._data = np.empty(0, np.float32)
+            self._size = 0
+            self._spill_file.close()
+            self._spill_file = None
+
+
+class RingBuffer:
+    """
+    Fixed-size byte ring that keeps only the most recently written bytes.
+
+    Storage is allocated once; writes overwrite the oldest bytes in place.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._end = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data: bytes):
+        if not self.capacity:
+            return
+        data = memoryview(data)[-self.capacity :]
+        first = min(len(data), self.capacity - self._end)
+        self._data[self._end : self._end + first] = data[:first]
+        self._data[: len(data) - first] = data[first:]
+        self._end = (self._end + len(data)) % self.capacity
+        self._size = min(self._size + len(data), self.capacity)
+
+    def read(self) -> bytes:
+        """The buffered bytes, oldest first."""
+        start = self._end - self._size
+        if start >= 0:
+            return bytes(self._data[start : self._end])
+        return bytes(self._data[start:] + self._data[: self._end])
+
+    def clear(self):
+        self._end = 0
+        self._size = 0
+
+    def drain(self) -> bytes:
+        """Return the buffered bytes and empty the ring."""
+        data = self.read()
+        self.clear()
+        return data
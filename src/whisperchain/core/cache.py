@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_transcription(transcription: str) -> str:
+    """Normalize whitespace and case so trivially different transcriptions share a cache entry."""
+    return " ".join(transcription.split()).casefold()
+
+
+def cache_key(transcription: str, prompt: str, model_name: str) -> str:
+    """Content address for a cleanup result."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = "\0".join([normalize_transcription(transcription), prompt_hash, model_name])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CleanupCache:
+    """
+    Two-tier cache of LLM cleanup results.
+
+    Entries are kept in an in-memory LRU and, if `disk_path` is given, in a SQLite database so
+    they survive restarts. Entries older than `ttl` seconds are treated as missing, and each tier
+    evicts its least recently used entries beyond its size limit. The disk tier is trimmed in
+    batches, once it holds a tenth more than `disk_max_entries`.
+
+    `aget` and `aput` run the disk tier in a worker thread so that callers on an event loop are
+    not blocked by SQLite.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 100000,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # The memory tier and counters are guarded separately from SQLite, so a lookup on the
+        # event loop never waits for a disk operation running in a worker thread.
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        # Upper bound on the rows on disk, so eviction only scans the table once it is due.
+        self._disk_entries = 0
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cleanup_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS cleanup_cache_accessed ON cleanup_cache (accessed_at)"
+            )
+            self._db.commit()
+            self._disk_entries = self._count_disk()
+
+    def _count_disk(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM cleanup_cache").fetchone()[0]
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, created_at = entry
+            if not self._expired(created_at, now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._memory[key]
+        return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        row = None
+        if self._db is not None:
+            with self._disk_lock:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM cleanup_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    self._db.execute(
+                        "UPDATE cleanup_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._db.commit()
+                else:
+                    row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._put_memory(key, row[0], row[1])
+            self.hits += 1
+            self.disk_hits += 1
+            return row[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(key, now)
+        return value if value is not None else self._get_disk(key, now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Like `get`, but looks up the disk tier in a worker thread."""
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(key, now)
+        if value is not None or self._db is None:
+            return value if value is not None else self._get_disk(key, now)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._get_disk, key, now)
+
+    def _put_memory(self, key: str, value: str, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _put_disk(self, key: str, value: str, now: float):
+        with self._disk_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cleanup_cache VALUES (?, ?, ?, ?)", (key, value, now, now)
+            )
+            self._disk_entries += 1
+            if self._disk_entries > self.disk_max_entries + self.disk_max_entries // 10:
+                self._evict_disk(now)
+            self._db.commit()
+
+    def _evict_disk(self, now: float):
+        self._db.execute(
+            "DELETE FROM cleanup_cache WHERE key IN (SELECT key FROM cleanup_cache "
+            "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,),
+        )
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM cleanup_cache WHERE created_at < ?", (now - self.ttl,))
+        self._disk_entries = self._count_disk()
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, value, now)
+        if self._db is not None:
+            self._put_disk(key, value, now)
+
+    async def aput(self, key: str, value: str):
+        """Like `put`, but writes the disk tier in a worker thread."""
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, value, now)
+        if self._db is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._put_disk, key, value, now)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self._db is not None:
+            with self._disk_lock:
+                self._db.close()
+                self._db = None
@@ -1,13 +1,16 @@
 import getpass
 import os
+import re
 from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Optional
 
-from langchain.prompts.chat import ChatPromptTemplate
-from langchain.schema import AIMessage
-from langchain_openai import ChatOpenAI
-
+from whisperchain.core.cache import CleanupCache, cache_key
 from whisperchain.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from langchain.schema import AIMessage
+    from langchain_core.language_models import BaseChatModel
+
 logger = get_logger(__name__)
 
 
@@ -33,6 +36,61 @@ def load_prompt(prompt_path: str | Path) -> str:
         return file.read()
 
 
+# Non-speech markers whisper emits for silence or noise, e.g. "[BLANK_AUDIO]" or "(music)".
+BLANK_MARKER_PATTERN = re.compile(r"\[[^\]]*\]|\([^)]*\)|\*[^*]*\*")
+# Hesitations and self-corrections that the LLM is needed to clean up.
+FILLER_PATTERN = re.compile(
+    r"\b(u+m+|u+h+|e+r+m*|a+h+|h+m+|m+h*m+|you know|i mean|sort of|kind of|scratch that|"
+    r"no wait|sorry|actually)\b",
+    re.IGNORECASE,
+)
+REPEATED_WORD_PATTERN = re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE)
+
+# "never": always call the LLM. "trivial": skip empty, blank and very short transcripts.
+# "clean": additionally skip transcripts without any fillers or repeated words.
+SKIP_POLICIES = ("never", "trivial", "clean")
+
+
+def strip_blank_markers(transcription: str) -> str:
+    """Remove whisper's non-speech markers and normalize whitespace."""
+    return " ".join(BLANK_MARKER_PATTERN.sub(" ", transcription).split())
+
+
+def needs_cleanup(text: str) -> bool:
+    """Whether the text contains fillers or repeated words."""
+    return bool(FILLER_PATTERN.search(text) or REPEATED_WORD_PATTERN.search(text))
+
+
+def cleanup_skip_reason(
+    transcription: str, policy: str = "trivial", max_words: int = 2
+) -> Optional[str]:
+    """
+    Decide whether LLM cleanup can be skipped for a transcription.
+
+    Args:
+        transcription (str): The raw transcription text.
+        policy (str): One of SKIP_POLICIES.
+        max_words (int): Transcripts with at most this many words and no fillers are skipped.
+
+    Returns:
+        Optional[str]: The reason cleanup can be skipped, or None if it is needed.
+    """
+    if policy not in SKIP_POLICIES:
+        raise ValueError(f"Unknown skip policy {policy}, expected one of {SKIP_POLICIES}")
+    if policy == "never":
+        return None
+    text = strip_blank_markers(transcription)
+    if not text:
+        return "blank_audio" if transcription.strip() else "empty"
+    if needs_cleanup(text):
+        return None
+    if len(text.split()) <= max_words:
+        return "short"
+    if policy == "clean":
+        return "no_fillers"
+    return None
+
+
 class TranscriptionCleaner:
     """
     Uses a composed (chained) runnable to clean up raw transcription text.
@@ -40,6 +98,7 @@ class TranscriptionCleaner:
     This class builds a chain by composing a runnable prompt with an LLM. The prompt instructs
     the LLM to remove filler words, fix grammatical errors, and produce a coherent cleaned transcription.
     This composition via the pipe operator leverages the new RunnableSequence interface.
+    Results can optionally be cached by (normalized transcription, prompt, model name).
     """
 
     def __init__(
@@ -47,13 +106,43 @@ class TranscriptionCleaner:
         model_name: str = "gpt-3.5-turbo",
         prompt_path: str = "prompts/transcription_cleanup.txt",  # relative to the whisperchain package
         verbose: bool = False,
+        cache: Optional[CleanupCache] = None,
+        llm: Optional["BaseChatModel"] = None,
     ):
+        # langchain takes over a second to import, so only load it when a cleaner is created.
+        from langchain.prompts.chat import ChatPromptTemplate
+        from langchain_openai import ChatOpenAI
+
         # Load and convert the prompt text into a runnable ChatPromptTemplate.
         prompt_text = load_prompt(prompt_path)
+        self.model_name = model_name
+        self.prompt_text = prompt_text
+        self.cache = cache
         self.prompt_template = ChatPromptTemplate.from_template(prompt_text)
-        self.llm = ChatOpenAI(model_name=model_name, temperature=0, verbose=verbose)
+        # Any chat model can stand in for OpenAI, e.g. a fake one for benchmarks.
+        self.llm = llm or ChatOpenAI(model_name=model_name, temperature=0, verbose=verbose)
         self.runnable_chain = self.prompt_template | self.llm
 
+    def _lookup(self, transcription: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.get(cache_key(transcription, self.prompt_text, self.model_name))
+
+    def _store(self, transcription: str, cleaned: str):
+        if self.cache is not None:
+            self.cache.put(cache_key(transcription, self.prompt_text, self.model_name), cleaned)
+
+    async def _alookup(self, transcription: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return await self.cache.aget(cache_key(transcription, self.prompt_text, self.model_name))
+
+    async def _astore(self, transcription: str, cleaned: str):
+        if self.cache is not None:
+            await self.cache.aput(
+                cache_key(transcription, self.prompt_text, self.model_name), cleaned
+            )
+
     def clean(self, transcription: str) -> str:
         """
         Synchronously clean the provided transcription text by invoking the composed chain.
@@ -64,8 +153,13 @@ class TranscriptionCleaner:
         Returns:
             str: The cleaned transcription text.
         """
-        result: AIMessage = self.runnable_chain.invoke({"transcription": transcription})
-        return result.content.strip()
+        cached = self._lookup(transcription)
+        if cached is not None:
+            return cached
+        result: "AIMessage" = self.runnable_chain.invoke({"transcription": transcription})
+        cleaned = result.content.strip()
+        self._store(transcription, cleaned)
+        return cleaned
 
     async def aclean(self, transcription: str) -> str:
         """
@@ -77,5 +171,31 @@ class TranscriptionCleaner:
         Returns:
             str: The cleaned transcription text.
         """
-        result: AIMessage = await self.runnable_chain.ainvoke({"transcription": transcription})
-        return result.content.strip()
+        cached = await self._alookup(transcription)
+        if cached is not None:
+            return cached
+        result: "AIMessage" = await self.runnable_chain.ainvoke({"transcription": transcription})
+        cleaned = result.content.strip()
+        await self._astore(transcription, cleaned)
+        return cleaned
+
+    async def astream(self, transcription: str) -> AsyncIterator[str]:
+        """
+        Asynchronously clean the provided transcription text, yielding text as the LLM produces it.
+
+        Args:
+            transcription (str): The raw transcription text.
+
+        Yields:
+            str: The next piece of the cleaned transcription text.
+        """
+        cached = await self._alookup(transcription)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.runnable_chain.astream({"transcription": transcription}):
+            if chunk.content:
+                chunks.append(chunk.content)
+                yield chunk.content
+        await self._astore(transcription, "".join(chunks).strip())
@@ -0,0 +1,171 @@
+import struct
+import zlib
+from typing import Dict, List, Optional, Sequence, Type
+
+import numpy as np
+
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import opuslib
+except Exception:  # opuslib raises a plain Exception when libopus itself is missing
+    opuslib = None
+
+# Little-endian int16, matching the PCM the client captures.
+PCM16 = np.dtype("<i2")
+
+
+class Codec:
+    """
+    Encodes int16 PCM audio for the websocket transport.
+
+    Codec instances are stateful and belong to a single stream: `encode` may hold back samples
+    until it has a full frame, and `flush` returns whatever is left at the end of the stream.
+    Each encoded payload is decoded with a single `decode` call on the receiving side.
+
+    `decode` takes the most PCM bytes the receiver will accept, so a small compressed payload
+    from an untrusted peer cannot expand into an arbitrarily large allocation.
+    """
+
+    name = ""
+    lossless = True
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def encode(self, pcm: bytes) -> bytes:
+        raise NotImplementedError
+
+    def flush(self) -> bytes:
+        return b""
+
+    def decode(self, payload: bytes, max_bytes: Optional[int] = None) -> bytes:
+        raise NotImplementedError
+
+
+class PCMCodec(Codec):
+    """Raw PCM, unchanged."""
+
+    name = "pcm"
+
+    def encode(self, pcm: bytes) -> bytes:
+        return pcm
+
+    def decode(self, payload: bytes, max_bytes: Optional[int] = None) -> bytes:
+        if max_bytes is not None and len(payload) > max_bytes:
+            raise ValueError(f"Frame of {len(payload)} bytes exceeds the {max_bytes} allowed")
+        return payload
+
+
+class DeltaCodec(Codec):
+    """
+    Lossless delta compression.
+
+    Each sample is replaced by its difference from the previous one (wrapping in int16, so the
+    transform is exactly invertible). Speech changes slowly at 16 kHz, so the high bytes of the
+    deltas are mostly 0x00 or 0xFF; grouping all low bytes before all high bytes lets zlib
+    compress them well. Every payload is self-contained.
+    """
+
+    name = "delta"
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, level: int = 6):
+        super().__init__(sample_rate, channels)
+        self.level = level
+
+    def encode(self, pcm: bytes) -> bytes:
+        samples = np.frombuffer(pcm, dtype=PCM16)
+        deltas = np.diff(samples, prepend=np.zeros(1, dtype=PCM16))
+        shuffled = deltas.view(np.uint8).reshape(-1, 2).T.tobytes()
+        return zlib.compress(shuffled, self.level)
+
+    def decode(self, payload: bytes, max_bytes: Optional[int] = None) -> bytes:
+        decompressor = zlib.decompressobj()
+        # A max_length of 0 means unlimited; stopping at max_bytes + 1 detects any excess.
+        data = decompressor.decompress(payload, max_bytes + 1 if max_bytes is not None else 0)
+        if max_bytes is not None and (len(data) > max_bytes or decompressor.unconsumed_tail):
+            raise ValueError(f"Frame decodes to more than the {max_bytes} bytes allowed")
+        shuffled = np.frombuffer(data, dtype=np.uint8)
+        deltas = shuffled.reshape(2, -1).T.copy().view(PCM16).ravel()
+        return np.cumsum(deltas, dtype=PCM16).tobytes()
+
+
+class OpusCodec(Codec):
+    """
+    Lossy Opus compression (requires `opuslib` and libopus).
+
+    Audio is encoded in 20 ms frames; each payload is a sequence of length-prefixed Opus packets.
+    The final partial frame is padded with silence on `flush`.
+    """
+
+    name = "opus"
+    lossless = False
+    frame_ms = 20
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1):
+        super().__init__(sample_rate, channels)
+        self.frame_size = sample_rate * self.frame_ms // 1000
+        self.frame_bytes = self.frame_size * channels * PCM16.itemsize
+        self._encoder = opuslib.Encoder(sample_rate, channels, "voip")
+        self._decoder = opuslib.Decoder(sample_rate, channels)
+        self._pending = b""
+
+    def _encode_frames(self, pcm: bytes) -> bytes:
+        packets = []
+        for i in range(0, len(pcm), self.frame_bytes):
+            packet = self._encoder.encode(pcm[i : i + self.frame_bytes], self.frame_size)
+            packets.append(struct.pack("<H", len(packet)) + packet)
+        return b"".join(packets)
+
+    def encode(self, pcm: bytes) -> bytes:
+        pcm = self._pending + pcm
+        usable = len(pcm) - len(pcm) % self.frame_bytes
+        self._pending = pcm[usable:]
+        return self._encode_frames(pcm[:usable])
+
+    def flush(self) -> bytes:
+        if not self._pending:
+            return b""
+        pcm = self._pending.ljust(self.frame_bytes, b"\0")
+        self._pending = b""
+        return self._encode_frames(pcm)
+
+    def decode(self, payload: bytes, max_bytes: Optional[int] = None) -> bytes:
+        frames = []
+        offset = 0
+        while offset < len(payload):
+            if max_bytes is not None and (len(frames) + 1) * self.frame_bytes > max_bytes:
+                raise ValueError(f"Frame decodes to more than the {max_bytes} bytes allowed")
+            (length,) = struct.unpack_from("<H", payload, offset)
+            offset += 2
+            frames.append(self._decoder.decode(payload[offset : offset + length], self.frame_size))
+            offset += length
+        return b"".join(frames)
+
+
+CODECS: Dict[str, Type[Codec]] = {"pcm": PCMCodec, "delta": DeltaCodec}
+if opuslib is not None:
+    CODECS["opus"] = OpusCodec
+
+
+def available_codecs() -> List[str]:
+    """Names of the codecs usable in this environment."""
+    return list(CODECS)
+
+
+def negotiate_codec(offered: Sequence[str], supported: Optional[Sequence[str]] = None) -> str:
+    """Pick the first offered codec that is supported, falling back to raw PCM."""
+    supported = [name for name in (supported or available_codecs()) if name in CODECS]
+    for name in offered:
+        if name in supported:
+            return name
+    return PCMCodec.name
+
+
+def create_codec(name: str, sample_rate: int = 16000, channels: int = 1) -> Codec:
+    if name not in CODECS:
+        raise ValueError(f"Codec {name} is not available, expected one of {available_codecs()}")
+    return CODECS[name](sample_rate=sample_rate, channels=channels)
@@ -1,10 +1,35 @@
 import json
 from pathlib import Path
+from typing import Dict, List, Literal, Optional
 
 import toml
 from pydantic import BaseModel, Field
 
 
+class VADConfig(BaseModel):
+    """Energy and zero-crossing voice activity detection."""
+
+    enabled: bool = Field(default=False, description="Drop and trim silence around speech")
+    frame_ms: float = Field(default=30.0, gt=0, description="Analysis frame length in ms")
+    energy_threshold: float = Field(
+        default=0.01,
+        gt=0,
+        description="RMS level (full scale = 1.0) above which a frame is speech",
+    )
+    zcr_threshold: float = Field(
+        default=0.3, ge=0, le=1, description="Zero-crossing rate that marks unvoiced speech"
+    )
+    unvoiced_ratio: float = Field(
+        default=0.25,
+        ge=0,
+        le=1,
+        description="Fraction of energy_threshold a high zero-crossing frame needs to be speech",
+    )
+    padding_ms: float = Field(
+        default=300.0, ge=0, description="Audio kept before and after detected speech in ms"
+    )
+
+
 class AudioConfig(BaseModel):
     """Audio capture configuration."""
 
@@ -14,6 +39,21 @@ class AudioConfig(BaseModel):
         default=4096, description="Chunk size for audio capture (~256ms at 16kHz)"
     )
     format: str = Field(default="int16", description="Audio format (int16, float32, etc.)")
+    vad: VADConfig = Field(default_factory=VADConfig, description="Voice activity detection")
+    warm: bool = Field(
+        default=False,
+        description="Keep the microphone open between utterances so recording starts instantly",
+    )
+    preroll_ms: float = Field(
+        default=300.0,
+        ge=0,
+        description="Audio captured before the hotkey press to prepend in warm mode, in ms",
+    )
+    capture_buffer_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        description="Captured audio held for the sender before the oldest is dropped, in seconds",
+    )
 
 
 class StreamConfig(BaseModel):
@@ -22,8 +62,32 @@ class StreamConfig(BaseModel):
     min_buffer_size: int = Field(
         default=32000, description="Minimum buffer size in bytes before sending"
     )
-    timeout: float = Field(default=0.1, description="Timeout for websocket operations in seconds")
-    end_marker: str = Field(default="END\n", description="Marker to indicate end of stream")
+    codecs: List[str] = Field(
+        default_factory=lambda: ["delta", "pcm"],
+        description="Audio codecs to offer the server, in order of preference (pcm, delta, opus)",
+    )
+    options: dict = Field(
+        default_factory=dict,
+        description="Per-session server options sent in the start message (partial, cleanup)",
+    )
+    persistent: bool = Field(
+        default=True, description="Keep one connection open across utterances"
+    )
+    ping_interval: Optional[float] = Field(
+        default=20.0, description="Seconds between keepalive pings, None to disable"
+    )
+    ping_timeout: Optional[float] = Field(
+        default=20.0, description="Seconds to wait for a pong before dropping the connection"
+    )
+    reconnect_attempts: int = Field(
+        default=5, ge=0, description="Reconnect retries before an utterance fails"
+    )
+    reconnect_initial_delay: float = Field(
+        default=0.5, gt=0, description="Delay before the first reconnect retry in seconds"
+    )
+    reconnect_max_delay: float = Field(
+        default=10.0, gt=0, description="Maximum delay between reconnect retries in seconds"
+    )
 
 
 class ClientConfig(BaseModel):
@@ -39,11 +103,209 @@ class ClientConfig(BaseModel):
     )
 
 
+class InferenceConfig(BaseModel):
+    """Whisper inference executor configuration."""
+
+    workers: int = Field(
+        default=1, ge=1, description="Number of inference workers, each with its own model"
+    )
+    queue_depth: int = Field(
+        default=32, ge=1, description="Maximum number of jobs waiting for a free worker"
+    )
+    job_timeout: float = Field(
+        default=60.0, gt=0, description="Maximum time in seconds to wait for a single job"
+    )
+    batch_window: float = Field(
+        default=0.02,
+        ge=0,
+        description=(
+            "Seconds to collect jobs arriving together before picking the next one, when more "
+            "jobs are waiting than there are idle workers"
+        ),
+    )
+    short_clip_priority: bool = Field(
+        default=True,
+        description="Run short clips before long ones (fairly across clients) instead of FIFO",
+    )
+
+
+class PartialTranscriptConfig(BaseModel):
+    """Incremental transcription while audio is still streaming in."""
+
+    enabled: bool = Field(
+        default=False, description="Send partial transcripts before the end of the stream"
+    )
+    interval: float = Field(
+        default=1.0, gt=0, description="Seconds of new audio between partial decodes"
+    )
+    commit_margin: float = Field(
+        default=1.0,
+        ge=0,
+        description="Segments ending this many seconds before the buffer end are committed",
+    )
+    max_window: float = Field(
+        default=20.0, gt=0, description="Maximum seconds of uncommitted audio to re-decode"
+    )
+
+
+class LongAudioConfig(BaseModel):
+    """Splitting long recordings into chunks that are decoded in parallel."""
+
+    enabled: bool = Field(default=True, description="Split long recordings at silences")
+    min_seconds: float = Field(
+        default=60.0, gt=0, description="Recordings at least this long are split"
+    )
+    chunk_seconds: float = Field(default=30.0, gt=0, description="Longest chunk in seconds")
+    min_chunk_seconds: float = Field(
+        default=10.0, ge=0, description="Shortest chunk in seconds, except the last"
+    )
+
+
+class AudioBufferConfig(BaseModel):
+    """Per-session audio buffer configuration."""
+
+    initial_seconds: float = Field(
+        default=10.0, gt=0, description="Initially allocated buffer length in seconds"
+    )
+    max_seconds: float = Field(
+        default=600.0, gt=0, description="Maximum audio length accepted per utterance"
+    )
+    upload_max_seconds: float = Field(
+        default=10800.0, gt=0, description="Maximum length of a recording sent to /transcribe"
+    )
+    spill_after_seconds: Optional[float] = Field(
+        default=None, description="Move the buffer to a temporary file beyond this length"
+    )
+    spill_dir: Optional[str] = Field(
+        default=None, description="Directory for spill files (system temp dir if unset)"
+    )
+
+
+class CleanupCacheConfig(BaseModel):
+    """Cache of LLM cleanup results."""
+
+    enabled: bool = Field(default=True, description="Cache cleanup results")
+    max_entries: int = Field(default=1024, ge=1, description="In-memory LRU size")
+    ttl: Optional[float] = Field(
+        default=7 * 24 * 3600, description="Seconds before a cached result expires"
+    )
+    disk: bool = Field(default=False, description="Also persist results in a SQLite database")
+    disk_path: Optional[str] = Field(
+        default=None,
+        description="SQLite database path (~/.whisperchain/cleanup_cache.sqlite if unset)",
+    )
+    disk_max_entries: int = Field(default=100000, ge=1, description="SQLite cache size")
+
+
+class CleanupConfig(BaseModel):
+    """LLM transcription cleanup configuration."""
+
+    max_concurrency: int = Field(
+        default=8, ge=1, description="Maximum number of in-flight LLM cleanup calls"
+    )
+    timeout: float = Field(
+        default=10.0,
+        gt=0,
+        description="Seconds to wait for a cleanup call before falling back to the raw text",
+    )
+    stream: bool = Field(
+        default=True, description="Send cleaned text to the client as the LLM produces it"
+    )
+    skip_policy: Literal["never", "trivial", "clean"] = Field(
+        default="trivial",
+        description="When to bypass the LLM: never, for trivial transcripts, or for any "
+        "transcript without fillers",
+    )
+    skip_max_words: int = Field(
+        default=2, ge=0, description="Transcripts this short without fillers skip the LLM"
+    )
+    cache: CleanupCacheConfig = Field(
+        default_factory=CleanupCacheConfig, description="Cleanup result cache settings"
+    )
+
+
+class HistoryConfig(BaseModel):
+    """Transcription history kept by the server."""
+
+    max_entries: int = Field(default=1000, ge=1, description="Entries kept in memory")
+    max_age: Optional[float] = Field(
+        default=None, gt=0, description="Seconds before an entry is dropped (kept if unset)"
+    )
+    disk: bool = Field(default=False, description="Also persist history in a SQLite database")
+    disk_path: Optional[str] = Field(
+        default=None,
+        description="SQLite database path (~/.whisperchain/history.sqlite if unset)",
+    )
+    disk_max_entries: int = Field(default=100000, ge=1, description="Entries kept on disk")
+    page_size: int = Field(default=100, ge=1, description="Entries per page by default")
+    max_page_size: int = Field(default=1000, ge=1, description="Largest page a client may ask for")
+    stream_keepalive: float = Field(
+        default=15.0, gt=0, description="Seconds between keepalives on /history/stream"
+    )
+
+
+class ModelRouteConfig(BaseModel):
+    """Model used for clips up to a given length."""
+
+    max_seconds: float = Field(gt=0, description="Longest clip routed to this model")
+    model: str = Field(description="Whisper model name")
+
+
+class ModelsConfig(BaseModel):
+    """Whisper model registry configuration."""
+
+    preload: Optional[List[str]] = Field(
+        default=None, description="Models loaded at startup (the default model if unset)"
+    )
+    allowed: Optional[List[str]] = Field(
+        default=None, description="Models sessions may request (any known model if unset)"
+    )
+    routes: List[ModelRouteConfig] = Field(
+        default_factory=list,
+        description="Models for clips by length, shortest first; longer clips use the default",
+    )
+    memory_budget_mb: float = Field(
+        default=4096.0,
+        gt=0,
+        description="Memory for loaded models; least recently used idle models are evicted",
+    )
+    sizes_mb: Dict[str, float] = Field(
+        default_factory=dict, description="Memory per model, overriding the model file size"
+    )
+
+
 class ServerConfig(BaseModel):
     host: str = "0.0.0.0"
     port: int = 8000
     model_name: str = "base.en"
     debug: bool = False
+    inference: InferenceConfig = Field(
+        default_factory=InferenceConfig, description="Whisper inference settings"
+    )
+    models: ModelsConfig = Field(
+        default_factory=ModelsConfig, description="Whisper model registry settings"
+    )
+    partial: PartialTranscriptConfig = Field(
+        default_factory=PartialTranscriptConfig, description="Partial transcript settings"
+    )
+    buffer: AudioBufferConfig = Field(
+        default_factory=AudioBufferConfig, description="Per-session audio buffer settings"
+    )
+    long_audio: LongAudioConfig = Field(
+        default_factory=LongAudioConfig, description="Parallel decoding of long recordings"
+    )
+    cleanup: CleanupConfig = Field(
+        default_factory=CleanupConfig, description="LLM cleanup settings"
+    )
+    vad: VADConfig = Field(
+        default_factory=VADConfig, description="Silence trimming before transcription"
+    )
+    history: HistoryConfig = Field(
+        default_factory=HistoryConfig, description="Transcription history retention"
+    )
+    codecs: Optional[List[str]] = Field(
+        default=None, description="Audio codecs clients may use (all available if unset)"
+    )
 
     def validate_model_name(cls, v):
         from pywhispercpp.constants import AVAILABLE_MODELS
@@ -138,5 +400,9 @@ class ConfigManager:
             toml.dump(streamlit_config, f)
 
 
-# Global config instance
-config = ConfigManager.get_instance()
+def __getattr__(name: str):
+    # The global `config` instance is created on first access, so importing this module does
+    # not touch the filesystem.
+    if name == "config":
+        return ConfigManager.get_instance()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
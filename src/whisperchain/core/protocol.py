@@ -0,0 +1,106 @@
+"""
+Wire protocol between StreamClient and WhisperServer on the /stream websocket.
+
+Control messages are JSON text frames; audio travels in binary frames. A connection carries any
+number of utterances, one after another. Every message about an utterance carries its session_id,
+so a client can drop late messages from an utterance it already gave up on.
+
+Client to server:
+    {"type": "hello", "version": 1, "codecs": [...]}     optional, offers codecs in preference order
+    {"type": "start", "version": 1, "session_id": ..., "sample_rate": 16000, "channels": 1,
+     "format": "int16", "codec": "delta", "options": {...}}
+    <binary>  4-byte little-endian sequence number followed by the encoded audio payload
+    {"type": "end", "session_id": ..., "last_seq": n}   all frames up to `last_seq` were sent
+    {"type": "cancel", "session_id": ...}              discard the utterance
+
+Server to client:
+    {"type": "hello", "version": 1, "codec": ...}       the codec picked from the offer
+    {"type": "started", "session_id": ...}
+    {"type": "transcription", "is_final": false, ...}   echoes and partial transcripts
+    {"type": "cleaned_delta", "is_final": false, ...}   streamed LLM cleanup output
+    {"type": "transcription", "is_final": true, ...}    the final result, with server stage
+                                                        timings in "timings"
+    {"type": "error", "is_final": true, "error": ...}
+"""
+
+import struct
+from typing import Optional, Sequence, Tuple
+
+PROTOCOL_VERSION = 1
+
+# Whisper only accepts 16 kHz mono audio.
+SAMPLE_RATE = 16000
+CHANNELS = 1
+FORMAT = "int16"
+
+FRAME_HEADER = struct.Struct("<I")
+
+
+class ProtocolError(ValueError):
+    """Raised when a peer violates the stream protocol."""
+
+
+def encode_audio_frame(seq: int, payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(seq) + payload
+
+
+def decode_audio_frame(frame: bytes) -> Tuple[int, bytes]:
+    if len(frame) < FRAME_HEADER.size:
+        raise ProtocolError(f"Audio frame of {len(frame)} bytes is too short for its header")
+    (seq,) = FRAME_HEADER.unpack_from(frame)
+    return seq, frame[FRAME_HEADER.size :]
+
+
+def hello_message(codecs: Sequence[str]) -> dict:
+    return {"type": "hello", "version": PROTOCOL_VERSION, "codecs": list(codecs)}
+
+
+def start_message(
+    session_id: str,
+    codec: str,
+    sample_rate: int = SAMPLE_RATE,
+    channels: int = CHANNELS,
+    format: str = FORMAT,
+    options: Optional[dict] = None,
+) -> dict:
+    return {
+        "type": "start",
+        "version": PROTOCOL_VERSION,
+        "session_id": session_id,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "format": format,
+        "codec": codec,
+        "options": options or {},
+    }
+
+
+def end_message(session_id: str, last_seq: int) -> dict:
+    return {"type": "end", "session_id": session_id, "last_seq": last_seq}
+
+
+def cancel_message(session_id: str) -> dict:
+    return {"type": "cancel", "session_id": session_id}
+
+
+def error_message(error: str, session_id: Optional[str] = None) -> dict:
+    message = {"type": "error", "is_final": True, "error": error}
+    if session_id:
+        message["session_id"] = session_id
+    return message
+
+
+def validate_start(message: dict, codecs: Sequence[str]):
+    """Check that a start message describes a stream the server can handle."""
+    if message.get("version") != PROTOCOL_VERSION:
+        raise ProtocolError(
+            f"Unsupported protocol version {message.get('version')}, expected {PROTOCOL_VERSION}"
+        )
+    if not message.get("session_id"):
+        raise ProtocolError("Start message has no session_id")
+    expected = {"sample_rate": SAMPLE_RATE, "channels": CHANNELS, "format": FORMAT}
+    for key, value in expected.items():
+        if message.get(key, value) != value:
+            raise ProtocolError(f"Unsupported {key} {message.get(key)}, expected {value}")
+    if message.get("codec") not in codecs:
+        raise ProtocolError(f"Unsupported codec {message.get('codec')}, expected one of {codecs}")
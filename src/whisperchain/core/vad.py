@@ -0,0 +1,144 @@
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+
+from whisperchain.core.config import VADConfig
+
+INT16_MAX = np.iinfo(np.int16).max
+
+
+def frame_features(samples: np.ndarray, frame_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute per-frame RMS energy and zero-crossing rate.
+
+    Trailing samples that do not fill a whole frame are ignored.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: RMS energy and zero-crossing rate of each frame.
+    """
+    num_frames = len(samples) // frame_length
+    frames = np.asarray(samples[: num_frames * frame_length], dtype=np.float32).reshape(
+        num_frames, frame_length
+    )
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_length)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+    return rms, zcr
+
+
+def speech_frames(samples: np.ndarray, sample_rate: int, config: VADConfig) -> np.ndarray:
+    """
+    Classify fixed-size frames of float32 audio as speech or silence.
+
+    A frame is speech if it is loud enough, or if it is moderately loud with a high zero-crossing
+    rate, which catches quiet unvoiced sounds such as "s" and "f".
+    """
+    frame_length = int(sample_rate * config.frame_ms / 1000)
+    rms, zcr = frame_features(samples, frame_length)
+    threshold = config.energy_threshold
+    return (rms >= threshold) | (
+        (rms >= threshold * config.unvoiced_ratio) & (zcr >= config.zcr_threshold)
+    )
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, config: VADConfig) -> Tuple[int, int]:
+    """
+    Find the span of `samples` that contains speech, padded by `config.padding_ms`.
+
+    Returns:
+        Tuple[int, int]: Start and end sample indices. They are equal if there is no speech.
+    """
+    frame_length = int(sample_rate * config.frame_ms / 1000)
+    speech = np.flatnonzero(speech_frames(samples, sample_rate, config))
+    if not len(speech):
+        return 0, 0
+    padding = int(sample_rate * config.padding_ms / 1000)
+    start = max(speech[0] * frame_length - padding, 0)
+    end = min((speech[-1] + 1) * frame_length + padding, len(samples))
+    return start, end
+
+
+def split_on_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    config: VADConfig,
+    max_seconds: float,
+    min_seconds: float = 0.0,
+) -> List[Tuple[int, int]]:
+    """
+    Split audio into consecutive spans of at most `max_seconds`, cutting in silences.
+
+    Each cut is placed between `min_seconds` and `max_seconds` after the previous one, in the
+    middle of the longest run of silent frames there, or at the quietest frame if there is no
+    silence, so words are rarely cut in half.
+
+    Returns:
+        List[Tuple[int, int]]: Start and end sample indices of the spans, covering all samples.
+    """
+    frame_length = int(sample_rate * config.frame_ms / 1000)
+    max_frames = max(int(max_seconds * 1000 / config.frame_ms), 1)
+    min_frames = min(max(int(min_seconds * 1000 / config.frame_ms), 1), max_frames)
+    rms, _ = frame_features(samples, frame_length)
+    silent = ~speech_frames(samples, sample_rate, config)
+    spans = []
+    start = 0
+    while len(samples) - start * frame_length > max_frames * frame_length:
+        # Cut before one of the frames from `low` to `high`, inclusive.
+        low, high = start + min_frames, start + max_frames
+        window = silent[low : high + 1]
+        if window.any():
+            # Edges of the runs of silent frames in the window.
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], window.view(np.int8), [0]))))
+            run_starts, run_ends = edges[::2], edges[1::2]
+            longest = np.argmax(run_ends - run_starts)
+            cut = low + (run_starts[longest] + run_ends[longest]) // 2
+        elif len(window):
+            cut = low + int(np.argmin(rms[low : high + 1]))
+        else:
+            # The only allowed cut is after the last whole frame.
+            cut = high
+        spans.append((start * frame_length, cut * frame_length))
+        start = cut
+    spans.append((start * frame_length, len(samples)))
+    return spans
+
+
+class SilenceGate:
+    """
+    Drops silent int16 PCM chunks from a live stream.
+
+    Chunks are passed through while speech is detected and for `padding_ms` afterwards. The last
+    `padding_ms` of silence before speech is held back and released with the first speech chunk,
+    so word onsets are not clipped.
+    """
+
+    def __init__(self, config: VADConfig, sample_rate: int = 16000):
+        self.config = config
+        self.sample_rate = sample_rate
+        self.padding_samples = int(sample_rate * config.padding_ms / 1000)
+        self._held = deque()
+        self._held_samples = 0
+        self._hangover = 0
+
+    def is_speech(self, data: bytes) -> bool:
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / INT16_MAX
+        return bool(speech_frames(samples, self.sample_rate, self.config).any())
+
+    def process(self, data: bytes) -> bytes:
+        """Return the bytes to send for this chunk (empty while silent)."""
+        num_samples = len(data) // 2
+        if self.is_speech(data):
+            self._hangover = self.padding_samples
+            held = b"".join(self._held)
+            self._held.clear()
+            self._held_samples = 0
+            return held + data
+        if self._hangover > 0:
+            self._hangover -= num_samples
+            return data
+        self._held.append(data)
+        self._held_samples += num_samples
+        while self._held and self._held_samples - len(self._held[0]) // 2 >= self.padding_samples:
+            self._held_samples -= len(self._held.popleft()) // 2
+        return b""
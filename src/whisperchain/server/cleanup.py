@@ -0,0 +1,75 @@
+import asyncio
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from whisperchain.core.chain import (
+    TranscriptionCleaner,
+    cleanup_skip_reason,
+    strip_blank_markers,
+)
+from whisperchain.core.config import CleanupConfig
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DeltaCallback = Callable[[str], Awaitable[None]]
+
+
+class CleanupResult(NamedTuple):
+    text: str
+    # Why the raw transcription was returned instead of the LLM output, if it was.
+    fallback_reason: Optional[str] = None
+    # Why the LLM was not called at all, if it was not.
+    skip_reason: Optional[str] = None
+
+
+class CleanupService:
+    """
+    Runs LLM cleanup asynchronously with bounded concurrency.
+
+    Transcripts that the local pre-classifier deems trivial skip the LLM entirely. Otherwise, at
+    most `max_concurrency` calls are in flight at once. A call that does not finish within
+    `timeout` seconds (including time spent waiting for a slot) or that fails returns the raw
+    transcription instead, so a slow or failing LLM never holds up the final message for long.
+    """
+
+    def __init__(self, cleaner: TranscriptionCleaner, config: CleanupConfig = None):
+        self.cleaner = cleaner
+        self.config = config or CleanupConfig()
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+    async def _clean(self, transcription: str, on_delta: Optional[DeltaCallback]) -> str:
+        async with self._semaphore:
+            if on_delta is None:
+                return await self.cleaner.aclean(transcription)
+            chunks = []
+            async for delta in self.cleaner.astream(transcription):
+                chunks.append(delta)
+                await on_delta(delta)
+            return "".join(chunks).strip()
+
+    async def clean(
+        self, transcription: str, on_delta: Optional[DeltaCallback] = None
+    ) -> CleanupResult:
+        """
+        Clean `transcription`, falling back to the raw text on timeout or error.
+
+        If `on_delta` is given, the LLM output is streamed and each piece is passed to it as it
+        arrives. After a fallback the deltas already delivered should be discarded in favor of
+        the returned text.
+        """
+        skip_reason = cleanup_skip_reason(
+            transcription, self.config.skip_policy, self.config.skip_max_words
+        )
+        if skip_reason:
+            return CleanupResult(strip_blank_markers(transcription), skip_reason=skip_reason)
+        try:
+            text = await asyncio.wait_for(
+                self._clean(transcription, on_delta), timeout=self.config.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"CleanupService: Timed out after {self.config.timeout}s")
+            return CleanupResult(transcription, "timeout")
+        except Exception as e:
+            logger.error(f"CleanupService: Cleanup failed: {e}")
+            return CleanupResult(transcription, f"error: {e}")
+        return CleanupResult(text)
@@ -0,0 +1,373 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from whisperchain.server.search import InvertedIndex, fts_query, searchable_text
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HistoryStore:
+    """
+    Bounded history of final transcription messages.
+
+    The newest `max_entries` entries are kept in memory. If `disk_path` is given, every entry is
+    also appended to a SQLite database, so history survives restarts and pages older than the
+    in-memory window can still be read. Each entry gets an increasing integer `id` that serves
+    as the pagination cursor. Entries older than `max_age` seconds, and disk entries beyond
+    `disk_max_entries`, are dropped.
+
+    Ids are never reused, even after `clear` and a restart, so clients resuming from the last id
+    they saw do not skip new entries. `aappend` and `aclear` run the disk writes in a worker
+    thread, for callers on an event loop.
+
+    `search` ranks entries by full-text relevance. On disk, entries are indexed with SQLite
+    FTS5; otherwise (or if SQLite lacks FTS5) an in-process inverted index covers the entries
+    in memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_age: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 100000,
+    ):
+        self.max_age = max_age
+        self.disk_max_entries = disk_max_entries
+        # (id, created_at, entry), oldest first.
+        self._memory: deque = deque(maxlen=max_entries)
+        # The memory window is guarded separately from SQLite, so appending on the event loop
+        # never waits for a disk write running in a worker thread.
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._next_id = 1
+        self._db = None
+        self._fts = False
+        # The in-process index and the entries it covers, when FTS5 is not used.
+        self._index: Optional[InvertedIndex] = None
+        self._indexed: Dict[int, Tuple[float, dict]] = {}
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "id INTEGER PRIMARY KEY, created_at REAL NOT NULL, entry TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS history_created ON history (created_at)")
+            # The newest id ever assigned, which outlives the entries themselves.
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER)"
+            )
+            self._fts = self._create_fts()
+            self._db.commit()
+        if not self._fts:
+            self._index = InvertedIndex()
+        if self._db is not None:
+            self._load()
+
+    def _create_fts(self) -> bool:
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(text)")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"HistoryStore: SQLite FTS5 unavailable ({e}), searching in memory")
+            return False
+        # Entries dropped by retention leave the index too.
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history "
+            "BEGIN DELETE FROM history_fts WHERE rowid = old.id; END"
+        )
+        (indexed,) = self._db.execute("SELECT COUNT(*) FROM history_fts").fetchone()
+        if not indexed:
+            # Index history written before search existed.
+            rows = self._db.execute("SELECT id, entry FROM history").fetchall()
+            self._db.executemany(
+                "INSERT INTO history_fts (rowid, text) VALUES (?, ?)",
+                [(row_id, searchable_text(json.loads(entry))) for row_id, entry in rows],
+            )
+        return True
+
+    def _load(self):
+        """Fill the in-memory window with the newest entries on disk."""
+        now = time.time()
+        self._prune_memory(now)
+        self._prune_disk(now)
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT id, created_at, entry FROM history ORDER BY id DESC LIMIT ?",
+            (self._memory.maxlen,),
+        ).fetchall()
+        for row_id, created_at, entry in reversed(rows):
+            self._remember(row_id, created_at, json.loads(entry))
+        (max_id,) = self._db.execute(
+            "SELECT MAX(value) FROM (SELECT MAX(id) AS value FROM history "
+            "UNION ALL SELECT value FROM history_meta WHERE key = 'last_id')"
+        ).fetchone()
+        self._next_id = (max_id or 0) + 1
+        if rows:
+            logger.info(f"HistoryStore: Loaded {len(rows)} entries")
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _remember(self, entry_id: int, created_at: float, entry: dict):
+        """Add an entry to the in-memory window and the in-process index."""
+        if len(self._memory) == self._memory.maxlen:
+            self._forget(self._memory[0][0])
+        self._memory.append((entry_id, created_at, entry))
+        if self._index is not None:
+            self._index.add(entry_id, searchable_text(entry))
+            self._indexed[entry_id] = (created_at, entry)
+
+    def _forget(self, entry_id: int):
+        if self._index is not None:
+            self._index.remove(entry_id)
+            self._indexed.pop(entry_id, None)
+
+    def _add(self, entry: dict, now: float) -> dict:
+        with self._lock:
+            entry = {"id": self._next_id, **entry}
+            self._next_id += 1
+            self._remember(entry["id"], now, entry)
+            self._prune_memory(now)
+        return entry
+
+    def append(self, entry: dict) -> dict:
+        """Store an entry and return it with its `id`."""
+        now = time.time()
+        entry = self._add(entry, now)
+        self._write(entry, now)
+        return entry
+
+    async def aappend(self, entry: dict) -> dict:
+        """Like `append`, but writes the entry to disk in a worker thread."""
+        now = time.time()
+        entry = self._add(entry, now)
+        if self._db is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write, entry, now)
+        return entry
+
+    def _write(self, entry: dict, now: float):
+        with self._disk_lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT INTO history VALUES (?, ?, ?)", (entry["id"], now, json.dumps(entry))
+            )
+            if self._fts:
+                self._db.execute(
+                    "INSERT INTO history_fts (rowid, text) VALUES (?, ?)",
+                    (entry["id"], searchable_text(entry)),
+                )
+            self._db.execute(
+                "INSERT INTO history_meta VALUES ('last_id', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)",
+                (entry["id"],),
+            )
+            self._prune_disk(now)
+            self._db.commit()
+
+    def _prune_memory(self, now: float):
+        # Called with the lock held, or before the store is shared.
+        if self.max_age is not None:
+            while self._memory and now - self._memory[0][1] > self.max_age:
+                self._forget(self._memory.popleft()[0])
+
+    def _prune_disk(self, now: float):
+        # Called with the disk lock held, or before the store is shared.
+        if self.max_age is not None:
+            self._db.execute("DELETE FROM history WHERE created_at < ?", (now - self.max_age,))
+        self._db.execute(
+            "DELETE FROM history WHERE id <= "
+            "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.disk_max_entries,),
+        )
+
+    def page(
+        self, limit: int = 100, before: Optional[int] = None, after: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Return up to `limit` entries, oldest first.
+
+        Without cursors, these are the newest entries. With `before`, the newest entries older
+        than that id; with `after`, the oldest entries newer than that id.
+        """
+        with self._lock:
+            entries = [
+                (entry_id, entry)
+                for entry_id, _, entry in self._memory
+                if (before is None or entry_id < before) and (after is None or entry_id > after)
+            ]
+            oldest = self._memory[0][0] if self._memory else self._next_id
+        # Entries older than the in-memory window are only on disk.
+        if after is not None:
+            covered = after >= oldest - 1
+        else:
+            # The memory window is the newest part of the history.
+            covered = len(entries) >= limit
+        if self._db is not None and not covered:
+            return self._page_disk(limit, before, after)
+        entries = entries[:limit] if after is not None else entries[-limit:]
+        return [entry for _, entry in entries]
+
+    def _page_disk(self, limit: int, before: Optional[int], after: Optional[int]) -> List[dict]:
+        conditions, params = [], []
+        if before is not None:
+            conditions.append("id < ?")
+            params.append(before)
+        if after is not None:
+            conditions.append("id > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "ASC" if after is not None else "DESC"
+        with self._disk_lock:
+            rows = self._db.execute(
+                f"SELECT entry FROM history {where} ORDER BY id {order} LIMIT ?", (*params, limit)
+            ).fetchall()
+        entries = [json.loads(entry) for (entry,) in rows]
+        return entries if after is not None else entries[::-1]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[dict]:
+        """
+        Entries containing every word of `query`, most relevant first, each with its `score`.
+
+        Args:
+            start, end: Only entries created in this range (Unix timestamps).
+        """
+        if self._fts:
+            return self._search_fts(query, limit, offset, start, end)
+        with self._lock:
+            results = []
+            for entry_id, score in self._index.search(query):
+                created_at, entry = self._indexed[entry_id]
+                if (start is None or created_at >= start) and (end is None or created_at < end):
+                    results.append({**entry, "score": round(score, 4)})
+        return results[offset : offset + limit]
+
+    def _search_fts(self, query, limit, offset, start, end) -> List[dict]:
+        match = fts_query(query)
+        if match is None:
+            return []
+        conditions, params = ["history_fts MATCH ?"], [match]
+        if start is not None:
+            conditions.append("history.created_at >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("history.created_at < ?")
+            params.append(end)
+        with self._disk_lock:
+            rows = self._db.execute(
+                "SELECT history.entry, -bm25(history_fts) FROM history_fts "
+                "JOIN history ON history.id = history_fts.rowid "
+                f"WHERE {' AND '.join(conditions)} "
+                "ORDER BY bm25(history_fts), history.id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [{**json.loads(entry), "score": round(score, 4)} for entry, score in rows]
+
+    @property
+    def last_id(self) -> int:
+        """Id of the newest entry, 0 if there are none yet."""
+        return self._next_id - 1
+
+    def clear(self):
+        self._clear_memory()
+        self._clear_disk()
+
+    async def aclear(self):
+        """Like `clear`, but clears the disk in a worker thread."""
+        self._clear_memory()
+        if self._db is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._clear_disk)
+
+    def _clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            if self._index is not None:
+                self._index.clear()
+                self._indexed.clear()
+
+    def _clear_disk(self):
+        with self._disk_lock:
+            if self._db is not None:
+                # history_meta keeps the last id, so ids continue after a restart.
+                self._db.execute("DELETE FROM history")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"entries": len(self._memory), "last_id": self.last_id}
+        with self._disk_lock:
+            if self._db is not None:
+                (stats["disk_entries"],) = self._db.execute(
+                    "SELECT COUNT(*) FROM history"
+                ).fetchone()
+        return stats
+
+    def close(self):
+        with self._disk_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def sse_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Format a server-sent event."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class HistoryFeed:
+    """
+    Fans history events out to subscribers, e.g. dashboards on /history/stream.
+
+    Events are published from the event loop. Each subscriber has a bounded queue; a subscriber
+    that falls behind gets `None` and should reconnect, catching up from the last entry id it saw.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        """Yield a queue of (event, data) tuples published while subscribed."""
+        queue = asyncio.Queue(self.max_queue)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                logger.warning("HistoryFeed: Dropping a subscriber that fell behind")
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
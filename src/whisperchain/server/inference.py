@@ -0,0 +1,169 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+import numpy as np
+from pywhispercpp.model import Segment
+
+from whisperchain.core.config import InferenceConfig
+from whisperchain.server.metrics import ServerMetrics, StageTimings
+from whisperchain.server.models import ModelRegistry
+from whisperchain.server.scheduler import InferenceJob, InferenceScheduler
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when the inference queue cannot accept another job."""
+
+
+class InferencePool:
+    """
+    Runs whisper transcription off the event loop.
+
+    Each worker runs on a dedicated thread with its own instances of the models from the
+    `ModelRegistry`, so several utterances can be decoded in parallel while the event loop keeps
+    serving websockets and HTTP requests. Jobs wait in a bounded `InferenceScheduler` queue that
+    decides which runs next; when it is full, new jobs are rejected immediately instead of piling
+    up.
+
+    If `metrics` is given, each job's queue wait and decode time are recorded in it.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        config: InferenceConfig = None,
+        metrics: Optional[ServerMetrics] = None,
+    ):
+        self.registry = registry
+        self.config = config or InferenceConfig()
+        self.metrics = metrics
+        self._scheduler: Optional[InferenceScheduler] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def started(self) -> bool:
+        return self._scheduler is not None
+
+    async def start(self):
+        """
+        Start the worker tasks.
+
+        Models load when a job first needs them; call `warm` to load them ahead of time.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.workers, thread_name_prefix="whisper"
+        )
+        self._scheduler = InferenceScheduler(self.config)
+        self._workers = [
+            asyncio.create_task(self._worker(slot)) for slot in range(self.config.workers)
+        ]
+        logger.info(f"InferencePool: Started {self.config.workers} worker(s)")
+
+    def _warm_slot(self, name: str, slot: int):
+        with self.registry.use(name, slot):
+            pass
+
+    async def warm(self, names: Iterable[str]):
+        """Load models for every worker ahead of the jobs that need them."""
+        loop = asyncio.get_running_loop()
+        # Load on the worker threads so the event loop is not blocked.
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(self._executor, self._warm_slot, name, slot)
+                for name in names
+                for slot in range(self.config.workers)
+            ]
+        )
+
+    async def stop(self):
+        """Cancel the worker tasks and release the executor."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._scheduler:
+            for job in self._scheduler.drain():
+                job.future.cancel()
+            self._scheduler = None
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("InferencePool: Stopped")
+
+    def _transcribe(self, job: InferenceJob, slot: int) -> List[Segment]:
+        with self.registry.use(job.model, slot) as model:
+            return model.transcribe(job.audio)
+
+    async def _worker(self, slot: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._scheduler.get()
+            future = job.future
+            # Skip jobs whose caller already gave up while they were waiting.
+            if future.done():
+                continue
+            kind = "partial" if job.partial else "final"
+            if self.metrics:
+                self.metrics.queue_wait.observe(loop.time() - job.submitted, kind=kind)
+            job.started = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(self._executor, self._transcribe, job, slot)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                job.decode_time = time.perf_counter() - job.started
+                if self.metrics:
+                    self.metrics.decode.observe(job.decode_time, kind=kind)
+
+    def stats(self) -> dict:
+        """Scheduler queue statistics."""
+        if not self.started:
+            return {"started": False}
+        return {"started": True, "workers": self.config.workers, **self._scheduler.stats()}
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        client: Optional[str] = None,
+        partial: bool = False,
+        model: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+    ) -> List[Segment]:
+        """
+        Queue a float32 audio array for transcription and wait for the result.
+
+        Args:
+            audio: Samples to transcribe.
+            client: Identifies who submitted the job, so the scheduler can share the workers
+                fairly between clients.
+            partial: Whether this is a partial transcript, which yields to final ones.
+            model: Whisper model to use, the registry's default model if unset.
+            timings: Records when the decode started and how long it took.
+
+        Raises:
+            InferenceQueueFull: If the job queue is full.
+            asyncio.TimeoutError: If the job does not finish within the configured timeout.
+        """
+        if not self.started:
+            raise RuntimeError("InferencePool is not started")
+        future = asyncio.get_running_loop().create_future()
+        job = InferenceJob(audio, future, client, partial, model)
+        try:
+            self._scheduler.submit(job)
+        except asyncio.QueueFull:
+            raise InferenceQueueFull(
+                f"Inference queue is full ({self.config.queue_depth} jobs waiting)"
+            )
+        result = await asyncio.wait_for(future, timeout=self.config.job_timeout)
+        if timings:
+            timings.add_decode(job.started, job.decode_time)
+        return result
@@ -0,0 +1,291 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds in seconds, from a fast decode to a slow LLM call.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Utterance lengths, from a word to a long dictation.
+DURATION_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+# Audio bytes per utterance: 32 KB is a second of 16 kHz PCM.
+SIZE_BUCKETS = (1e3, 4e3, 16e3, 64e3, 256e3, 1e6, 4e6, 16e6)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """A named metric with optional labels, rendered in the Prometheus text format."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {sorted(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(suffix, label names, label values, value) for each sample."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """
+    A value that only goes up.
+
+    If `function` is given, the value is read from it when the metric is rendered instead.
+    """
+
+    type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        function: Optional[Callable[[], Optional[float]]] = None,
+    ):
+        super().__init__(name, documentation, labels)
+        self.function = function
+        # Without labels there is a single series, reported even before it changes.
+        self._values: Dict[LabelValues, float] = {} if self.label_names else {(): 0}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self.function is not None:
+            value = self.function()
+            return [] if value is None else [("", (), (), value)]
+        with self._lock:
+            return [("", self.label_names, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Counts observations in cumulative buckets, plus their sum and count."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: a count per bucket (the last one is +Inf), then the sum.
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe how long the block takes, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+        return sum(counts)
+
+    def samples(self):
+        samples = []
+        names = self.label_names + ("le",)
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    samples.append(("_bucket", names, key + (_format_value(bound),), cumulative))
+                samples.append(("_sum", self.label_names, key, total[0]))
+                samples.append(("_count", self.label_names, key, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """A set of metrics exposed together, e.g. by a `/metrics` endpoint."""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        metric.name = self.prefix + metric.name
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, **kwargs) -> Counter:
+        return self.register(Counter(name, documentation, **kwargs))
+
+    def gauge(self, name: str, documentation: str, **kwargs) -> Gauge:
+        return self.register(Gauge(name, documentation, **kwargs))
+
+    def histogram(self, name: str, documentation: str, **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, **kwargs))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ServerMetrics(MetricsRegistry):
+    """The metrics recorded by the transcription server."""
+
+    def __init__(self):
+        super().__init__(prefix="whisperchain_")
+        self.connections = self.gauge("connections", "Open websocket connections.")
+        self.active_sessions = self.gauge("active_sessions", "Utterances being streamed.")
+        self.sessions = self.counter(
+            "sessions_total", "Finished utterances by outcome.", labels=("outcome",)
+        )
+        self.receive_duration = self.histogram(
+            "receive_duration_seconds",
+            "Time from an utterance's start message to its end message.",
+            buckets=DURATION_BUCKETS,
+        )
+        self.received_bytes = self.histogram(
+            "received_bytes",
+            "Audio bytes received per utterance, as sent on the wire.",
+            buckets=SIZE_BUCKETS,
+        )
+        self.audio_duration = self.histogram(
+            "audio_duration_seconds",
+            "Decoded audio per utterance.",
+            buckets=DURATION_BUCKETS,
+        )
+        self.queue_wait = self.histogram(
+            "inference_queue_wait_seconds",
+            "Time inference jobs wait for a worker.",
+            labels=("kind",),
+        )
+        self.decode = self.histogram(
+            "decode_seconds", "Whisper decode time per inference job.", labels=("kind",)
+        )
+        self.cleanup = self.histogram(
+            "cleanup_seconds", "LLM cleanup time per utterance by outcome.", labels=("outcome",)
+        )
+        self.finalize = self.histogram(
+            "finalize_seconds", "Time from an utterance's end message to its final message."
+        )
+
+
+class StageTimings:
+    """
+    Where the server spent its time on one utterance, reported in its final message.
+
+    Only the work after the end message counts: decodes of partial transcripts overlap with
+    recording and are not on the critical path.
+    """
+
+    def __init__(self):
+        self.end_received: Optional[float] = None
+        self.decode_started: Optional[float] = None
+        self.decode_ended: Optional[float] = None
+        # Summed over decode jobs, which may run in parallel.
+        self.decode = 0.0
+        self.cleanup = 0.0
+
+    def add_decode(self, started: float, seconds: float):
+        """Record a decode job that started at `started` (`time.perf_counter()`)."""
+        # Chunks of long audio are decoded in parallel and may finish out of order.
+        if self.decode_started is None or started < self.decode_started:
+            self.decode_started = started
+        if self.decode_ended is None or started + seconds > self.decode_ended:
+            self.decode_ended = started + seconds
+        self.decode += seconds
+
+    def report(self, audio_seconds: float) -> dict:
+        """
+        Stage durations in milliseconds, and the decode's real-time factor.
+
+        `decode_ms` is the wall-clock span from the first decode job's start to the last one's
+        end; `decode_worker_ms` adds up the jobs, which exceeds it when chunks run in parallel.
+        """
+        now = time.perf_counter()
+        end = self.end_received if self.end_received is not None else now
+        wait = self.decode_started - end if self.decode_started is not None else None
+        decode = self.decode_ended - self.decode_started if wait is not None else 0.0
+        return {
+            "audio_seconds": round(audio_seconds, 3),
+            # None if the final pass had nothing left to decode.
+            "decode_wait_ms": round(wait * 1000, 1) if wait is not None else None,
+            "decode_ms": round(decode * 1000, 1),
+            "decode_worker_ms": round(self.decode * 1000, 1),
+            "real_time_factor": round(decode / audio_seconds, 4) if audio_seconds else None,
+            "cleanup_ms": round(self.cleanup * 1000, 1),
+            "server_ms": round((now - end) * 1000, 1),
+        }
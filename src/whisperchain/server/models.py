@@ -0,0 +1,172 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pywhispercpp.model import Model
+
+from whisperchain.core.config import ModelsConfig
+from whisperchain.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Approximate memory per model family, used when the model file cannot be inspected.
+MODEL_FAMILY_SIZES_MB = {"tiny": 75, "base": 142, "small": 466, "medium": 1500, "large": 3000}
+
+MB = 1024 * 1024
+
+
+class LoadedModel:
+    __slots__ = ("name", "model", "size_mb", "in_use", "stale")
+
+    def __init__(self, name: str, model: Model, size_mb: float):
+        self.name = name
+        self.model = model
+        self.size_mb = size_mb
+        self.in_use = False
+        self.stale = False
+
+
+class ModelRegistry:
+    """
+    Whisper models shared by the inference workers.
+
+    A whisper context decodes one clip at a time, so every worker slot gets its own instance of
+    each model it uses. Instances load on first use and are kept in least-recently-used order;
+    when loading one pushes the total past the memory budget, idle instances are evicted
+    starting with the oldest. `unload` drops a model without interrupting decodes in progress:
+    instances in use are discarded when their decode finishes, and the next job loads a fresh
+    copy.
+
+    `use` may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Model],
+        default_model: str,
+        config: ModelsConfig = None,
+    ):
+        self.loader = loader
+        self.default_model = default_model
+        self.config = config or ModelsConfig()
+        self.loads = 0
+        self.evictions = 0
+        self._models: "OrderedDict[Tuple[str, int], LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per instance, held while it loads or decodes.
+        self._instance_locks: Dict[Tuple[str, int], threading.Lock] = {}
+
+    @property
+    def preload(self) -> List[str]:
+        return self.config.preload or [self.default_model]
+
+    @property
+    def memory_used_mb(self) -> float:
+        return sum(entry.size_mb for entry in self._models.values())
+
+    def estimate_size_mb(self, name: str, model: Model) -> float:
+        if name in self.config.sizes_mb:
+            return self.config.sizes_mb[name]
+        path = getattr(model, "model_path", None)
+        if path and os.path.exists(path):
+            return os.path.getsize(path) / MB
+        family = name.split(".")[0].split("-")[0]
+        return MODEL_FAMILY_SIZES_MB.get(family, MODEL_FAMILY_SIZES_MB["large"])
+
+    @contextmanager
+    def use(self, name: Optional[str], slot: int = 0) -> Iterator[Model]:
+        """Hold the model instance for a worker slot, loading it if needed."""
+        key = (name or self.default_model, slot)
+        with self._lock:
+            instance_lock = self._instance_locks.setdefault(key, threading.Lock())
+        with instance_lock:
+            entry = self._get(key) or self._load(key)
+            try:
+                yield entry.model
+            finally:
+                with self._lock:
+                    entry.in_use = False
+                    if entry.stale and self._models.get(key) is entry:
+                        del self._models[key]
+
+    def _get(self, key: Tuple[str, int]) -> Optional[LoadedModel]:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                entry.in_use = True
+            return entry
+
+    def _load(self, key: Tuple[str, int]) -> LoadedModel:
+        name, slot = key
+        logger.info(f"ModelRegistry: Loading {name} for worker {slot}")
+        model = self.loader(name)
+        entry = LoadedModel(name, model, self.estimate_size_mb(name, model))
+        entry.in_use = True
+        with self._lock:
+            self._models[key] = entry
+            self.loads += 1
+            self._evict()
+        return entry
+
+    def _evict(self):
+        # Called with the lock held.
+        budget = self.config.memory_budget_mb
+        for key in list(self._models):
+            if self.memory_used_mb <= budget:
+                return
+            if not self._models[key].in_use:
+                logger.info(f"ModelRegistry: Evicting {key[0]} from worker {key[1]}")
+                del self._models[key]
+                self.evictions += 1
+        if self.memory_used_mb > budget:
+            logger.warning(
+                f"ModelRegistry: {self.memory_used_mb:.0f} MB of models in use exceeds the "
+                f"{budget:.0f} MB budget"
+            )
+
+    def loaded_models(self) -> List[str]:
+        with self._lock:
+            return list(dict.fromkeys(name for name, _ in self._models))
+
+    def unload(self, name: Optional[str] = None) -> List[str]:
+        """
+        Drop a model (or all models) so the next job loads it again.
+
+        Returns:
+            List[str]: The names of the models that were unloaded.
+        """
+        unloaded = []
+        with self._lock:
+            for key, entry in list(self._models.items()):
+                if name is not None and entry.name != name:
+                    continue
+                unloaded.append(entry.name)
+                if entry.in_use:
+                    entry.stale = True
+                else:
+                    del self._models[key]
+        return list(dict.fromkeys(unloaded))
+
+    def stats(self) -> dict:
+        with self._lock:
+            loaded = [
+                {
+                    "name": entry.name,
+                    "slot": slot,
+                    "size_mb": round(entry.size_mb, 1),
+                    "in_use": entry.in_use,
+                }
+                for (_, slot), entry in self._models.items()
+            ]
+            memory_used_mb = self.memory_used_mb
+        return {
+            "default": self.default_model,
+            "memory_budget_mb": self.config.memory_budget_mb,
+            "memory_used_mb": round(memory_used_mb, 1),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "loaded": loaded,
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from whisperchain.core.config import InferenceConfig
+
+# Queue times kept for the percentiles reported by `stats()`.
+QUEUE_TIME_WINDOW = 1024
+
+
+class InferenceJob:
+    """A transcription request waiting for an inference worker."""
+
+    __slots__ = (
+        "audio",
+        "future",
+        "client",
+        "partial",
+        "model",
+        "cost",
+        "finish",
+        "submitted",
+        "started",
+        "decode_time",
+    )
+
+    def __init__(
+        self,
+        audio: np.ndarray,
+        future: asyncio.Future,
+        client: Optional[str] = None,
+        partial: bool = False,
+        model: Optional[str] = None,
+    ):
+        self.audio = audio
+        self.future = future
+        self.client = client
+        self.partial = partial
+        self.model = model
+        self.cost = 0.0
+        self.finish = 0.0
+        self.submitted = 0.0
+        # When a worker started decoding (`time.perf_counter()`) and how long it took.
+        self.started: Optional[float] = None
+        self.decode_time = 0.0
+
+
+class InferenceScheduler:
+    """
+    Orders pending transcription jobs for the inference workers.
+
+    Jobs are picked by self-clocked fair queueing: each job is tagged with a virtual finish time,
+    its client's previous finish time (or the current virtual time, if later) plus the job's
+    audio duration, and the smallest tag goes first. Short clips therefore overtake long
+    dictations, while a client submitting many jobs only ever gets its fair share. Final
+    transcriptions always go before partial ones, which are only previews; partial jobs are
+    tagged on their own clock, so previews do not delay a client's final transcriptions.
+
+    Whisper decodes one clip per call, so jobs are not merged into a single decode. Instead,
+    when more jobs are waiting than there are idle workers, the workers wait `batch_window`
+    seconds from the first of them to collect the jobs submitted at about the same time, so a
+    short clip that arrives just after a long one still goes first. A job that an idle worker
+    can take at once runs without waiting.
+    """
+
+    def __init__(self, config: InferenceConfig = None, sample_rate: int = 16000):
+        self.config = config or InferenceConfig()
+        self.sample_rate = sample_rate
+        self._heap: list = []
+        self._counter = itertools.count()
+        # Virtual time and client finish tags, kept separately for final and partial jobs.
+        self._virtual_time = {False: 0.0, True: 0.0}
+        self._client_finish: Dict[Tuple[bool, str], float] = {}
+        self._batch_started = 0.0
+        # Workers waiting in `get`.
+        self._idle = 0
+        self._available = asyncio.Event()
+        self._queue_times = deque(maxlen=QUEUE_TIME_WINDOW)
+        self.submitted = 0
+        self.dispatched = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def submit(self, job: InferenceJob):
+        """
+        Queue a job.
+
+        Raises:
+            asyncio.QueueFull: If `queue_depth` jobs are already waiting.
+        """
+        if len(self._heap) >= self.config.queue_depth:
+            self.rejected += 1
+            raise asyncio.QueueFull
+        now = asyncio.get_running_loop().time()
+        if not self._heap:
+            self._batch_started = now
+        job.submitted = now
+        if self.config.short_clip_priority:
+            job.cost = len(job.audio) / self.sample_rate
+        key = (job.partial, job.client)
+        start = max(self._virtual_time[job.partial], self._client_finish.get(key, 0.0))
+        job.finish = start + job.cost
+        if job.client is not None:
+            self._client_finish[key] = job.finish
+        heapq.heappush(self._heap, (job.partial, job.finish, next(self._counter), job))
+        self.submitted += 1
+        self._available.set()
+
+    async def get(self) -> InferenceJob:
+        """Wait for the next job to run."""
+        loop = asyncio.get_running_loop()
+        self._idle += 1
+        try:
+            while True:
+                await self._available.wait()
+                # With a worker free for every waiting job there is nothing to reorder.
+                if len(self._heap) > self._idle:
+                    delay = self._batch_started + self.config.batch_window - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                # Another worker may have taken the last job in the meantime.
+                if self._heap:
+                    break
+        finally:
+            self._idle -= 1
+        job = heapq.heappop(self._heap)[-1]
+        if not self._heap:
+            self._available.clear()
+        virtual_time = max(self._virtual_time[job.partial], job.finish)
+        self._virtual_time[job.partial] = virtual_time
+        # Clients that are caught up start from the virtual time anyway.
+        for key in [
+            (partial, client)
+            for (partial, client), finish in self._client_finish.items()
+            if partial == job.partial and finish <= virtual_time
+        ]:
+            del self._client_finish[key]
+        self._queue_times.append(loop.time() - job.submitted)
+        self.dispatched += 1
+        return job
+
+    def drain(self) -> List[InferenceJob]:
+        """Remove and return every waiting job."""
+        jobs = [entry[-1] for entry in self._heap]
+        self._heap.clear()
+        self._available.clear()
+        return jobs
+
+    def stats(self) -> dict:
+        """Queue length, job counters and queue-time statistics in seconds."""
+        queue_times = np.asarray(self._queue_times)
+        stats = {
+            "pending": len(self._heap),
+            "submitted": self.submitted,
+            "dispatched": self.dispatched,
+            "rejected": self.rejected,
+        }
+        if len(queue_times):
+            p50, p95 = np.percentile(queue_times, [50, 95])
+            stats.update(
+                queue_time_mean=float(queue_times.mean()),
+                queue_time_p50=float(p50),
+                queue_time_p95=float(p95),
+                queue_time_max=float(queue_times.max()),
+            )
+        return stats
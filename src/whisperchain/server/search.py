@@ -0,0 +1,101 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Segment timestamps in raw transcriptions, e.g. "[0-250]".
+TIMESTAMP_PATTERN = re.compile(r"\[\d+-\d+\]")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def searchable_text(entry: dict) -> str:
+    """The raw and cleaned transcriptions of a history entry, without timestamps."""
+    raw = TIMESTAMP_PATTERN.sub(" ", entry.get("transcription") or "")
+    return f"{raw} {entry.get('cleaned_transcription') or ''}"
+
+
+def fts_query(query: str) -> Optional[str]:
+    """An FTS5 query matching entries containing every word of `query`, None if it has none."""
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    # Quoting each word keeps characters like '-' or '*' from being read as FTS5 syntax.
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+class InvertedIndex:
+    """
+    In-process full-text index ranking documents with BM25.
+
+    Used when SQLite FTS5 is not available. A query matches the documents containing all of
+    its words.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        # token -> {document id: term frequency}
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._lengths: Dict[int, int] = {}
+        self._tokens: Dict[int, Iterable[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, doc_id: int, text: str):
+        self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        for token, count in counts.items():
+            self._postings[token][doc_id] = count
+        length = sum(counts.values())
+        self._lengths[doc_id] = length
+        self._tokens[doc_id] = counts.keys()
+        self._total_length += length
+
+    def remove(self, doc_id: int):
+        if doc_id not in self._lengths:
+            return
+        for token in self._tokens.pop(doc_id):
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def clear(self):
+        self._postings.clear()
+        self._lengths.clear()
+        self._tokens.clear()
+        self._total_length = 0
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """(document id, score) of the matching documents, best first."""
+        tokens = set(tokenize(query))
+        if not tokens or any(token not in self._postings for token in tokens):
+            return []
+        # Intersect starting from the rarest word.
+        ordered = sorted(tokens, key=lambda token: len(self._postings[token]))
+        matches = set(self._postings[ordered[0]])
+        for token in ordered[1:]:
+            matches &= self._postings[token].keys()
+        num_docs = len(self._lengths)
+        average_length = self._total_length / num_docs
+        scores = []
+        for doc_id in matches:
+            norm = self.K1 * (1 - self.B + self.B * self._lengths[doc_id] / average_length)
+            score = 0.0
+            for token in tokens:
+                postings = self._postings[token]
+                idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                frequency = postings[doc_id]
+                score += idf * frequency * (self.K1 + 1) / (frequency + norm)
+            scores.append((doc_id, score))
+        # Best first; the newest entry wins ties.
+        scores.sort(key=lambda item: (-item[1], -item[0]))
+        return scores
@@ -1,67 +1,463 @@
 import asyncio
+import json
 import os
+import time
+import uuid
 from datetime import datetime
-from typing import List
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 import numpy as np
-import pyaudio
-import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pywhispercpp.constants import AVAILABLE_MODELS
 from pywhispercpp.model import Model, Segment
 
+from whisperchain.core.buffer import AudioBufferFull, PCMBuffer
+from whisperchain.core.cache import CleanupCache
 from whisperchain.core.chain import TranscriptionCleaner
+from whisperchain.core.codec import (
+    CODECS,
+    available_codecs,
+    create_codec,
+    negotiate_codec,
+)
 from whisperchain.core.config import ServerConfig
+from whisperchain.core.protocol import (
+    PROTOCOL_VERSION,
+    SAMPLE_RATE,
+    ProtocolError,
+    decode_audio_frame,
+    error_message,
+    validate_start,
+)
+from whisperchain.core.vad import speech_frames, split_on_silence, trim_silence
+from whisperchain.server.cleanup import CleanupResult, CleanupService
+from whisperchain.server.history import HistoryFeed, HistoryStore, sse_event
+from whisperchain.server.inference import InferencePool, InferenceQueueFull
+from whisperchain.server.metrics import CONTENT_TYPE, ServerMetrics, StageTimings
+from whisperchain.server.models import ModelRegistry
+from whisperchain.server.session import StreamSession
+from whisperchain.server.streaming import StreamingTranscriber
 from whisperchain.utils.logger import get_logger
 from whisperchain.utils.segment import (
+    CENTISECONDS_PER_SECOND,
     list_of_segments_to_text,
     list_of_segments_to_text_with_timestamps,
+    offset_segments,
 )
+from whisperchain.utils.wav import read_wav
 
 logger = get_logger(__name__)
 
 
 class WhisperServer:
-    def __init__(self, config: ServerConfig = None):
+    def __init__(self, config: ServerConfig = None, llm=None):
         self.config = config or ServerConfig()
-        self.whisper_model = None
+        # Chat model for the transcription cleaner, OpenAI if unset.
+        self.llm = llm
+        self.model_registry = ModelRegistry(
+            self.load_whisper_model, self.config.model_name, self.config.models
+        )
+        self.metrics = ServerMetrics()
+        self.inference_pool = InferencePool(
+            self.model_registry, self.config.inference, self.metrics
+        )
         self.transcription_cleaner = None
+        self.cleanup_cache = None
+        self.cleanup_service = None
+        # Background tasks loading the LLM cleaner and the preloaded whisper models.
+        self.cleaner_task: Optional[asyncio.Task] = None
+        self.model_task: Optional[asyncio.Task] = None
         self.app = FastAPI()
-        self.transcription_history = []
+        self.history: Optional[HistoryStore] = None
+        # Pushes new entries and cleanup progress to /history/stream subscribers.
+        self.history_feed = HistoryFeed()
+        # Transcriptions whose cleanup is still streaming in, keyed by session id.
+        self.active_transcriptions = {}
+        # Limits the long-audio chunks queued at once, across all requests.
+        self.chunk_slots: Optional[asyncio.Semaphore] = None
         self.setup_routes()
+        self.setup_metrics()
 
     def setup_routes(self):
         self.app.add_event_handler("startup", self.startup_event)
+        self.app.add_event_handler("shutdown", self.shutdown_event)
         self.app.add_websocket_route("/stream", self.websocket_endpoint)
 
         @self.app.get("/")
         async def get_root():
-            """Health check endpoint"""
+            """Liveness check endpoint"""
             return {"status": "ok"}
 
+        @self.app.get("/ready")
+        async def get_ready():
+            """Readiness check endpoint: 503 until the models and the LLM cleaner are loaded"""
+            status = self.readiness()
+            return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
+
+        @self.app.get("/metrics")
+        async def get_metrics():
+            """Get server metrics in the Prometheus text format"""
+            return Response(self.metrics.render(), media_type=CONTENT_TYPE)
+
         @self.app.get("/history")
-        async def get_history():
-            """Get transcription history"""
-            return self.transcription_history
+        async def get_history(
+            limit: Optional[int] = Query(default=None, ge=1),
+            before: Optional[int] = None,
+            after: Optional[int] = None,
+            since: Optional[int] = None,
+        ):
+            """
+            Get a page of transcription history, oldest first, using entry ids as cursors.
+
+            `since` returns the entries added after that id, up to the largest page size.
+            """
+            history_config = self.config.history
+            if since is not None:
+                after = since
+                limit = limit or history_config.max_page_size
+            limit = min(limit or history_config.page_size, history_config.max_page_size)
+            return self.history.page(limit, before, after)
+
+        @self.app.get("/history/search")
+        async def search_history(
+            q: str = Query(min_length=1),
+            limit: Optional[int] = Query(default=None, ge=1),
+            offset: int = Query(default=0, ge=0),
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+        ):
+            """
+            Search transcription history, most relevant first.
+
+            Entries match if they contain every word of `q`. `start` and `end` (ISO 8601 or Unix
+            time) restrict results to entries created in that range.
+            """
+            history_config = self.config.history
+            limit = min(limit or history_config.page_size, history_config.max_page_size)
+            return self.history.search(
+                q,
+                limit,
+                offset,
+                start=start.timestamp() if start else None,
+                end=end.timestamp() if end else None,
+            )
+
+        @self.app.post("/transcribe")
+        async def transcribe(
+            request: Request,
+            cleanup: bool = True,
+            model: Optional[str] = None,
+            filename: Optional[str] = None,
+        ):
+            """
+            Transcribe recorded audio: a WAV file or raw 16 kHz mono int16 PCM.
+
+            The request body is a single recording, answered with its final message. A
+            multipart/form-data body is a batch of recordings in `files` fields, answered with a
+            list of final messages (or errors) in the same order. Results are added to the
+            history, with the recording's `filename` if known.
+            """
+            if model is not None and model not in self.allowed_models():
+                raise HTTPException(status_code=400, detail=f"Model {model} is not available")
+            if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+                try:
+                    data = await request.body()
+                    return await self.transcribe_upload(data, cleanup, model, filename)
+                except UPLOAD_ERRORS as e:
+                    status_code, detail = upload_error(e)
+                    raise HTTPException(status_code=status_code, detail=detail)
+
+            form = await request.form()
+            # Decode a batch's files as fast as the workers allow, without flooding the queue.
+            semaphore = asyncio.Semaphore(self.config.inference.workers)
+
+            async def transcribe_file(upload) -> dict:
+                async with semaphore:
+                    try:
+                        data = await upload.read()
+                        return await self.transcribe_upload(data, cleanup, model, upload.filename)
+                    except UPLOAD_ERRORS as e:
+                        return {"filename": upload.filename, "error": upload_error(e)[1]}
+
+            try:
+                return await asyncio.gather(*map(transcribe_file, form.getlist("files")))
+            finally:
+                await form.close()
+
+        @self.app.get("/history/stream")
+        async def stream_history(
+            request: Request,
+            since: Optional[int] = None,
+            keepalive: Optional[float] = Query(default=None, gt=0),
+        ):
+            """Stream new history entries and cleanup progress as server-sent events"""
+            last_event_id = request.headers.get("last-event-id")
+            if since is None and last_event_id and last_event_id.isdigit():
+                # A reconnecting EventSource resumes after the last entry it received.
+                since = int(last_event_id)
+            return StreamingResponse(
+                self.history_events(since, keepalive or self.config.history.stream_keepalive),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"},
+            )
+
+        @self.app.get("/history/active")
+        async def get_active_history():
+            """Get transcriptions whose cleanup is still in progress"""
+            return list(self.active_transcriptions.values())
+
+        @self.app.get("/cache")
+        async def get_cache_stats():
+            """Get cleanup cache hit/miss counters"""
+            if self.cleanup_cache is None:
+                return {"enabled": False}
+            return {"enabled": True, **self.cleanup_cache.stats()}
+
+        @self.app.get("/inference")
+        async def get_inference_stats():
+            """Get inference queue lengths, job counters and queue times"""
+            return self.inference_pool.stats()
+
+        @self.app.get("/models")
+        async def get_models():
+            """Get loaded whisper models and their memory use"""
+            return self.model_registry.stats()
+
+        @self.app.post("/models/reload")
+        async def reload_models(name: Optional[str] = None):
+            """Reload loaded models (or one model) without dropping connections"""
+            names = self.model_registry.unload(name)
+            await self.inference_pool.warm(names)
+            return self.model_registry.stats()
+
+        @self.app.post("/models/{name}")
+        async def load_model(name: str, default: bool = False):
+            """Load a model on every worker, optionally making it the default"""
+            if name not in self.allowed_models():
+                raise HTTPException(status_code=404, detail=f"Model {name} is not available")
+            await self.inference_pool.warm([name])
+            if default:
+                self.model_registry.default_model = name
+                logger.info(f"Server: Default model is now {name}")
+            return self.model_registry.stats()
+
+        @self.app.delete("/models/{name}")
+        async def unload_model(name: str):
+            """Unload a model; it is loaded again if a job needs it"""
+            return {"unloaded": self.model_registry.unload(name)}
 
         @self.app.delete("/history")
         async def clear_history():
             """Clear transcription history"""
-            self.transcription_history.clear()
+            await self.history.aclear()
+            self.history_feed.publish("cleared", {})
             return {"status": "cleared"}
 
+    def setup_metrics(self):
+        """Register the metrics read from other components when /metrics is scraped."""
+
+        def cache_stat(name):
+            return lambda: self.cleanup_cache.stats()[name] if self.cleanup_cache else None
+
+        def inference_stat(name):
+            return lambda: self.inference_pool.stats().get(name)
+
+        metrics = self.metrics
+        metrics.gauge(
+            "ready",
+            "Whether the whisper models and the LLM cleaner are loaded.",
+            function=lambda: float(self.readiness()["status"] == "ready"),
+        )
+        metrics.counter(
+            "cleanup_cache_hits_total", "Cleanup cache hits.", function=cache_stat("hits")
+        )
+        metrics.counter(
+            "cleanup_cache_misses_total", "Cleanup cache misses.", function=cache_stat("misses")
+        )
+        metrics.gauge(
+            "cleanup_cache_hit_ratio",
+            "Fraction of cleanup cache lookups that hit.",
+            function=cache_stat("hit_rate"),
+        )
+        metrics.gauge(
+            "inference_queue_length",
+            "Inference jobs waiting for a worker.",
+            function=inference_stat("pending"),
+        )
+        metrics.counter(
+            "inference_rejected_total",
+            "Inference jobs rejected because the queue was full.",
+            function=inference_stat("rejected"),
+        )
+        metrics.gauge(
+            "history_subscribers",
+            "Clients following /history/stream.",
+            function=lambda: len(self.history_feed),
+        )
+        metrics.gauge(
+            "model_memory_megabytes",
+            "Estimated memory used by loaded whisper models.",
+            function=lambda: self.model_registry.stats()["memory_used_mb"],
+        )
+
+    def load_whisper_model(self, model_name: Optional[str] = None) -> Model:
+        model_name = model_name or self.config.model_name
+        logger.info(f"Initializing Whisper model {model_name}...")
+        return Model(model=model_name)
+
+    def allowed_models(self) -> List[str]:
+        return self.config.models.allowed or AVAILABLE_MODELS
+
+    def route_model(self, num_samples: int, requested: Optional[str] = None) -> Optional[str]:
+        """Pick the model for a clip: the session's choice, else by clip length."""
+        if requested:
+            return requested
+        seconds = num_samples / SAMPLE_RATE
+        for route in self.config.models.routes:
+            if seconds <= route.max_seconds:
+                return route.model
+        # The registry's current default model.
+        return None
+
     async def startup_event(self):
-        logger.info(f"Initializing Whisper model {self.config.model_name}...")
-        self.whisper_model = Model(model=self.config.model_name)
-        logger.info("Initializing transcription cleaner...")
-        self.transcription_cleaner = TranscriptionCleaner()
+        await self.inference_pool.start()
+        self.cleanup_cache = self.create_cleanup_cache()
+        self.history = self.create_history_store()
+        # Load in the background so the server accepts connections right away; /ready reports
+        # when loading is done. Jobs that arrive earlier wait for the model they need.
+        self.cleaner_task = asyncio.create_task(self.load_transcription_cleaner())
+        self.model_task = asyncio.create_task(self.load_models())
         if self.config.debug:
             logger.info("Running in DEBUG mode - audio playback enabled. Printing all chain logs.")
 
+    async def load_models(self):
+        try:
+            await self.inference_pool.warm(self.model_registry.preload)
+        except Exception as e:
+            logger.error(f"Failed to load whisper models: {e}")
+            raise
+        logger.info("Whisper models loaded")
+
+    async def load_transcription_cleaner(self):
+        logger.info("Initializing transcription cleaner...")
+        loop = asyncio.get_running_loop()
+        try:
+            # Creating the cleaner imports langchain, which takes a while; keep it off the loop.
+            self.transcription_cleaner = await loop.run_in_executor(
+                None, lambda: TranscriptionCleaner(cache=self.cleanup_cache, llm=self.llm)
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize transcription cleaner: {e}")
+            raise
+        self.cleanup_service = CleanupService(self.transcription_cleaner, self.config.cleanup)
+
+    def readiness(self) -> dict:
+        """Loading state of the background tasks: loading, ready or error."""
+        tasks = {"cleaner": self.cleaner_task, "models": self.model_task}
+        status = {}
+        for name, task in tasks.items():
+            if task is None or not task.done():
+                status[name] = "loading"
+            elif task.cancelled():
+                status[name] = "error: cancelled"
+            elif task.exception():
+                status[name] = f"error: {task.exception()}"
+            else:
+                status[name] = "ready"
+        if any(state.startswith("error") for state in status.values()):
+            overall = "error"
+        elif all(state == "ready" for state in status.values()):
+            overall = "ready"
+        else:
+            overall = "loading"
+        return {"status": overall, **status}
+
+    async def shutdown_event(self):
+        for task in (self.cleaner_task, self.model_task):
+            if task and not task.done():
+                task.cancel()
+        await self.inference_pool.stop()
+        if self.cleanup_cache:
+            self.cleanup_cache.close()
+        if self.history:
+            self.history.close()
+
+    async def history_events(self, since: Optional[int], keepalive: float):
+        """
+        Server-sent events for /history/stream.
+
+        Events: "history" with each new entry (its id is the event id), "active" when a
+        cleanup starts streaming, "active_delta" with each piece of cleaned text, "active_end"
+        when it stops, and "cleared". Comments are sent as keepalives.
+        """
+        # Subscribe before catching up, so entries added meanwhile are not missed.
+        with self.history_feed.subscribe() as queue:
+            last_id = self.history.last_id
+            if since is not None:
+                last_id = since
+                while True:
+                    entries = self.history.page(self.config.history.max_page_size, after=last_id)
+                    if not entries:
+                        break
+                    for entry in entries:
+                        yield sse_event("history", entry, entry["id"])
+                    last_id = entries[-1]["id"]
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    # Fell behind; the client reconnects and catches up from its last id.
+                    return
+                event, data = item
+                if event == "history":
+                    if data["id"] <= last_id:
+                        continue
+                    last_id = data["id"]
+                    yield sse_event(event, data, data["id"])
+                else:
+                    yield sse_event(event, data)
+
+    def create_history_store(self) -> HistoryStore:
+        history_config = self.config.history
+        disk_path = None
+        if history_config.disk:
+            disk_path = history_config.disk_path or str(
+                Path.home() / ".whisperchain" / "history.sqlite"
+            )
+        return HistoryStore(
+            max_entries=history_config.max_entries,
+            max_age=history_config.max_age,
+            disk_path=disk_path,
+            disk_max_entries=history_config.disk_max_entries,
+        )
+
+    def create_cleanup_cache(self) -> Optional[CleanupCache]:
+        cache_config = self.config.cleanup.cache
+        if not cache_config.enabled:
+            return None
+        disk_path = None
+        if cache_config.disk:
+            disk_path = cache_config.disk_path or str(
+                Path.home() / ".whisperchain" / "cleanup_cache.sqlite"
+            )
+        return CleanupCache(
+            max_entries=cache_config.max_entries,
+            ttl=cache_config.ttl,
+            disk_path=disk_path,
+            disk_max_entries=cache_config.disk_max_entries,
+        )
+
     async def play_audio(self, audio_data: bytes):
         """Play the received audio data using PyAudio."""
+        # Only needed in debug mode, so the server does not require PortAudio otherwise.
+        import pyaudio
+
         p = pyaudio.PyAudio()
         stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000, output=True)
         stream.write(audio_data)
@@ -69,74 +465,489 @@ class WhisperServer:
         stream.close()
         p.terminate()
 
-    async def transcribe_audio(self, audio_data: bytes) -> List[Segment]:
-        """Transcribe audio data using the whisper model."""
-        # Convert bytes to a numpy array
-        audio_array = np.frombuffer(audio_data, dtype=np.int16)
-        # Convert to float32
-        audio_array = audio_array.astype(np.float32) / np.iinfo(np.int16).max
-        # Transcribe the audio
-        result: List[Segment] = self.whisper_model.transcribe(audio_array)
-        return result
+    async def transcribe_audio(
+        self,
+        audio: np.ndarray,
+        client: Optional[str] = None,
+        partial: bool = False,
+        model: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+    ) -> List[Segment]:
+        """
+        Transcribe float32 audio samples using the whisper model.
 
-    async def websocket_endpoint(self, websocket: WebSocket):
-        await websocket.accept()
-        received_data = b""
-        while True:
-            try:
-                data = await websocket.receive_bytes()
-            except WebSocketDisconnect:
-                logger.info("Server: WebSocket disconnected")
-                break
-
-            if data.endswith(b"END\n"):
-                # Remove the END marker and accumulate any remaining data.
-                data_without_end = data[:-4]
-                received_data += data_without_end
-                # Transcribe the received audio
-                segments = await self.transcribe_audio(received_data)
-                # Clean the transcription
-                cleaned_transcription = self.transcription_cleaner.clean(
-                    list_of_segments_to_text(segments)
+        Long audio is split at silences into chunks that are decoded in parallel.
+        """
+        model = self.route_model(len(audio), model)
+        long_audio = self.config.long_audio
+        if partial or not long_audio.enabled or len(audio) < long_audio.min_seconds * SAMPLE_RATE:
+            # Transcribe the audio on the inference pool so the event loop stays responsive
+            result: List[Segment] = await self.inference_pool.transcribe(
+                audio, client, partial, model, timings
+            )
+            return result
+
+        spans = split_on_silence(
+            audio,
+            SAMPLE_RATE,
+            self.config.vad,
+            long_audio.chunk_seconds,
+            long_audio.min_chunk_seconds,
+        )
+        if self.config.vad.enabled:
+            spans = [
+                (start, end)
+                for start, end in spans
+                if speech_frames(audio[start:end], SAMPLE_RATE, self.config.vad).any()
+            ]
+        logger.info(
+            "Server: Decoding %.1f s of audio in %d chunks", len(audio) / SAMPLE_RATE, len(spans)
+        )
+        if self.chunk_slots is None:
+            # Queue one chunk per worker at a time, leaving room in the queue for other clients.
+            # Created on first use, inside the event loop.
+            self.chunk_slots = asyncio.Semaphore(self.config.inference.workers)
+
+        async def decode_chunk(start: int, end: int) -> List[Segment]:
+            async with self.chunk_slots:
+                segments = await self.inference_pool.transcribe(
+                    audio[start:end], client, False, model, timings
                 )
-                # Build a final message
-                final_message = {
-                    "type": "transcription",
-                    "processed_bytes": len(received_data),
-                    "is_final": True,
-                    "transcription": list_of_segments_to_text_with_timestamps(segments),
-                    "cleaned_transcription": cleaned_transcription,
-                    "timestamp": datetime.now().isoformat(),
-                }
-                logger.info("Server: Sending final message: %s", final_message)
-                self.transcription_history.append(final_message)
-                await websocket.send_json(final_message)
-                # Play back the received audio only in debug mode
-                if self.config.debug:
-                    logger.info("Server: Playing back received audio (DEBUG mode)...")
-                    await self.play_audio(received_data)
-                await asyncio.sleep(0.1)
-                break
-            else:
-                # Accumulate the incoming bytes and send an intermediate echo message.
-                received_data += data
-                echo_message = {
-                    "type": "transcription",
-                    "processed_bytes": len(data),
+            return offset_segments(segments, start * CENTISECONDS_PER_SECOND // SAMPLE_RATE)
+
+        chunks = await asyncio.gather(*(decode_chunk(start, end) for start, end in spans))
+        return [segment for segments in chunks for segment in segments]
+
+    async def clean_transcription(
+        self, websocket: Optional[WebSocket], session_id: str, segments: List[Segment]
+    ) -> CleanupResult:
+        """Clean the transcription, streaming cleaned text to the client if enabled."""
+        transcription = list_of_segments_to_text(segments)
+        # The cleaner may still be loading right after startup.
+        try:
+            await asyncio.shield(self.cleaner_task)
+        except Exception as e:
+            return CleanupResult(transcription, fallback_reason=f"error: {e}")
+        if not self.config.cleanup.stream or websocket is None:
+            return await self.cleanup_service.clean(transcription)
+
+        active = {
+            "session_id": session_id,
+            "transcription": list_of_segments_to_text_with_timestamps(segments),
+            "cleaned_transcription": "",
+            "timestamp": datetime.now().isoformat(),
+        }
+        self.active_transcriptions[session_id] = active
+        self.history_feed.publish("active", dict(active))
+
+        async def send_delta(delta: str):
+            active["cleaned_transcription"] += delta
+            self.history_feed.publish("active_delta", {"session_id": session_id, "delta": delta})
+            await websocket.send_json(
+                {
+                    "type": "cleaned_delta",
+                    "processed_bytes": 0,
+                    "session_id": session_id,
                     "is_final": False,
+                    "delta": delta,
                 }
-                logger.info("Server: Echoing message: %s", echo_message)
-                await websocket.send_json(echo_message)
+            )
+
+        try:
+            return await self.cleanup_service.clean(transcription, on_delta=send_delta)
+        finally:
+            self.active_transcriptions.pop(session_id, None)
+            self.history_feed.publish("active_end", {"session_id": session_id})
+
+    def create_audio_buffer(
+        self, initial_seconds: Optional[float] = None, max_seconds: Optional[float] = None
+    ) -> PCMBuffer:
+        """A session buffer; the configured sizes apply unless given."""
+        buffer_config = self.config.buffer
+        return PCMBuffer(
+            initial_seconds=initial_seconds or buffer_config.initial_seconds,
+            max_seconds=max_seconds or buffer_config.max_seconds,
+            spill_after_seconds=buffer_config.spill_after_seconds,
+            spill_dir=buffer_config.spill_dir,
+        )
+
+    async def transcribe_buffer(
+        self,
+        audio_buffer: PCMBuffer,
+        transcriber: Optional[StreamingTranscriber] = None,
+        client: Optional[str] = None,
+        model: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+    ) -> List[Segment]:
+        """Transcribe a session's audio, trimming surrounding silence if VAD is enabled."""
+        audio = audio_buffer.view()
+        start = 0
+        if self.config.vad.enabled:
+            start, end = trim_silence(audio, audio_buffer.sample_rate, self.config.vad)
+            if transcriber:
+                # Committed segments already cover the start, so only trim trailing silence.
+                start, end = 0, max(end, transcriber.committed_samples)
+            if end <= start:
+                logger.info("Server: No speech detected, skipping transcription")
+                return transcriber.committed if transcriber else []
+            audio = audio[:end]
+        if transcriber:
+            return await transcriber.finalize(audio)
+        segments = await self.transcribe_audio(audio[start:], client, model=model, timings=timings)
+        return offset_segments(
+            segments, start * CENTISECONDS_PER_SECOND // audio_buffer.sample_rate
+        )
+
+    async def send_partial_transcript(
+        self, websocket: WebSocket, session: StreamSession, audio: np.ndarray
+    ):
+        """Decode the audio received so far and send the partial transcript."""
+        self.route_session(session, len(audio))
+        try:
+            segments = await session.transcriber.update(audio)
+        except (InferenceQueueFull, asyncio.TimeoutError) as e:
+            logger.warning("Server: Skipping partial transcript: %s", e)
+            return
+        partial_message = {
+            "type": "transcription",
+            "processed_bytes": 0,
+            "session_id": session.session_id,
+            "is_final": False,
+            "transcription": list_of_segments_to_text_with_timestamps(segments),
+        }
+        logger.info("Server: Sending partial message: %s", partial_message)
+        await websocket.send_json(partial_message)
+
+    def start_session(self, request: dict, client_id: Optional[str] = None) -> StreamSession:
+        """Create the session described by a start message."""
+        validate_start(request, self.allowed_codecs())
+        options = request.get("options", {})
+        model = options.get("model")
+        if model is not None and model not in self.allowed_models():
+            raise ProtocolError(f"Model {model} is not available")
+        session = StreamSession(
+            request["session_id"],
+            create_codec(request["codec"]),
+            self.create_audio_buffer(),
+            options=options,
+            client_id=client_id,
+        )
+        if options.get("partial", self.config.partial.enabled):
+            # The transcriber passes only the uncommitted tail, so decode with the model routed
+            # for the whole utterance rather than by the tail's length.
+            async def decode_partial(audio: np.ndarray) -> List[Segment]:
+                return await self.transcribe_audio(
+                    audio, client_id, partial=True, model=session.model
+                )
+
+            async def decode_final(audio: np.ndarray) -> List[Segment]:
+                return await self.transcribe_audio(
+                    audio, client_id, model=session.model, timings=session.timings
+                )
+
+            session.transcriber = StreamingTranscriber(
+                decode_partial, self.config.partial, final_decode=decode_final
+            )
+        self.metrics.active_sessions.inc()
+        return session
+
+    def route_session(self, session: StreamSession, num_samples: int):
+        """
+        Route a session with partial transcripts on the `num_samples` received so far.
+
+        If the utterance has grown into a different model's range, the segments committed by the
+        previous model are dropped, so the new model decodes the whole utterance.
+        """
+        model = (
+            self.route_model(num_samples, session.options.get("model"))
+            or self.model_registry.default_model
+        )
+        if session.model is not None and model != session.model:
+            logger.info("Server: Session %s now uses %s", session.session_id, model)
+            session.transcriber.reset()
+        session.model = model
+
+    def close_session(self, session: StreamSession, outcome: str):
+        """Release a session's resources; `outcome` is recorded in the metrics."""
+        session.close()
+        self.metrics.active_sessions.dec()
+        self.metrics.sessions.inc(outcome=outcome)
+
+    def allowed_codecs(self) -> List[str]:
+        return [name for name in (self.config.codecs or available_codecs()) if name in CODECS]
+
+    async def receive_audio(self, websocket: WebSocket, session: StreamSession, frame: bytes):
+        """Add an audio frame to the session, echo it and start a partial decode if due."""
+        seq, payload = decode_audio_frame(frame)
+        pcm = session.add_frame(seq, payload)
+        echo_message = {
+            "type": "transcription",
+            "processed_bytes": len(pcm),
+            "received_bytes": len(frame),
+            "session_id": session.session_id,
+            "seq": seq,
+            "is_final": False,
+        }
+        logger.info("Server: Echoing message: %s", echo_message)
+        await websocket.send_json(echo_message)
+        # Decode the audio so far in the background, one partial decode at a time.
+        transcriber = session.transcriber
+        if (
+            transcriber
+            and (session.partial_task is None or session.partial_task.done())
+            and transcriber.needs_update(len(session.audio_buffer))
+        ):
+            session.partial_task = asyncio.create_task(
+                self.send_partial_transcript(websocket, session, session.audio_buffer.view())
+            )
+
+    def observe_received(self, session: StreamSession):
+        metrics = self.metrics
+        metrics.receive_duration.observe(time.perf_counter() - session.started_at)
+        metrics.received_bytes.observe(session.received_bytes)
+        metrics.audio_duration.observe(session.audio_buffer.duration)
+
+    async def finish_session(self, websocket: WebSocket, session: StreamSession):
+        """Transcribe and clean a completed utterance and send the final message."""
+        await session.wait_for_partial()
+        if session.transcriber:
+            self.route_session(session, len(session.audio_buffer))
+        segments = await self.transcribe_buffer(
+            session.audio_buffer,
+            session.transcriber,
+            session.client_id,
+            session.options.get("model"),
+            session.timings,
+        )
+        cleanup = await self.clean_segments(
+            segments,
+            session.timings,
+            session.options.get("cleanup", True),
+            websocket,
+            session.session_id,
+        )
+        final_message = self.final_message(
+            session.session_id, session.audio_buffer, segments, cleanup, session.timings
+        )
+        logger.info("Server: Sending final message: %s", final_message)
+        self.history_feed.publish("history", await self.history.aappend(final_message))
+        await websocket.send_json(final_message)
+        # Play back the received audio only in debug mode
+        if self.config.debug:
+            logger.info("Server: Playing back received audio (DEBUG mode)...")
+            await self.play_audio(session.audio_buffer.to_pcm16())
+
+    async def clean_segments(
+        self,
+        segments: List[Segment],
+        timings: StageTimings,
+        enabled: bool = True,
+        websocket: Optional[WebSocket] = None,
+        session_id: Optional[str] = None,
+    ) -> CleanupResult:
+        """Clean a transcription unless disabled, recording the cleanup time and outcome."""
+        if not enabled:
+            return CleanupResult(list_of_segments_to_text(segments), skip_reason="disabled")
+        # Clean the transcription without blocking the event loop
+        start = time.perf_counter()
+        cleanup = await self.clean_transcription(websocket, session_id, segments)
+        if cleanup.skip_reason:
+            outcome = "skipped"
+        elif cleanup.fallback_reason:
+            outcome = "fallback"
+        else:
+            outcome = "cleaned"
+        timings.cleanup = time.perf_counter() - start
+        self.metrics.cleanup.observe(timings.cleanup, outcome=outcome)
+        return cleanup
+
+    def final_message(
+        self,
+        session_id: str,
+        audio_buffer: PCMBuffer,
+        segments: List[Segment],
+        cleanup: CleanupResult,
+        timings: StageTimings,
+    ) -> dict:
+        final_message = {
+            "type": "transcription",
+            "session_id": session_id,
+            "processed_bytes": audio_buffer.num_bytes,
+            "is_final": True,
+            "transcription": list_of_segments_to_text_with_timestamps(segments),
+            "cleaned_transcription": cleanup.text,
+            "cleanup_fallback": cleanup.fallback_reason is not None,
+            "cleanup_skipped": cleanup.skip_reason,
+            "timestamp": datetime.now().isoformat(),
+            "timings": timings.report(audio_buffer.duration),
+        }
+        if cleanup.fallback_reason:
+            final_message["cleanup_error"] = cleanup.fallback_reason
+        return final_message
+
+    async def transcribe_upload(
+        self,
+        data: bytes,
+        cleanup: bool = True,
+        model: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> dict:
+        """
+        Transcribe an uploaded recording, clean it and add it to the history.
+
+        Args:
+            data: A WAV file, or raw 16 kHz mono int16 PCM.
+
+        Raises:
+            ValueError: If the data is neither.
+            AudioBufferFull: If the recording is longer than the buffer allows.
+        """
+        pcm = read_wav(data) if data[:4] == b"RIFF" else data
+        if not pcm or len(pcm) % 2:
+            raise ValueError("Expected a WAV file or 16-bit PCM samples")
+        timings = StageTimings()
+        timings.end_received = time.perf_counter()
+        # Recordings may be much longer than live utterances; the size is known up front.
+        audio_buffer = self.create_audio_buffer(
+            initial_seconds=len(pcm) / 2 / SAMPLE_RATE,
+            max_seconds=self.config.buffer.upload_max_seconds,
+        )
         try:
-            await websocket.close()
-        except RuntimeError as e:
-            # Ignore errors if the connection is already closed/completed
-            logger.warning("Server: Warning while closing websocket: %s", e)
+            audio_buffer.append(pcm)
+            self.metrics.audio_duration.observe(audio_buffer.duration)
+            segments = await self.transcribe_buffer(audio_buffer, model=model, timings=timings)
+            result = await self.clean_segments(segments, timings, cleanup)
+            final_message = self.final_message(
+                uuid.uuid4().hex, audio_buffer, segments, result, timings
+            )
+        finally:
+            audio_buffer.close()
+        if filename is not None:
+            final_message["filename"] = filename
+        self.history_feed.publish("history", await self.history.aappend(final_message))
+        return final_message
 
+    async def end_session(
+        self, websocket: WebSocket, session: StreamSession, last_seq: Optional[int]
+    ):
+        """Handle a session's end message: send its final result and close it."""
+        session.timings.end_received = time.perf_counter()
+        session.check_complete(last_seq)
+        self.observe_received(session)
+        with self.metrics.finalize.time():
+            await self.finish_session(websocket, session)
+        self.close_session(session, "finished")
+
+    async def websocket_endpoint(self, websocket: WebSocket):
+        """
+        Serve one client connection.
+
+        A connection carries any number of utterances, one at a time, each delimited by start
+        and end (or cancel) messages. A failed utterance is reported with an error message and
+        the connection stays open; malformed messages close it.
+        """
+        await websocket.accept()
+        self.metrics.connections.inc()
+        session: Optional[StreamSession] = None
+        try:
+            client_id = uuid.uuid4().hex
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    logger.info("Server: WebSocket disconnected")
+                    break
+                try:
+                    if message.get("bytes") is not None:
+                        if session is None:
+                            # Leftover frames of a failed or cancelled utterance.
+                            logger.warning("Server: Ignoring audio frame without a session")
+                            continue
+                        await self.receive_audio(websocket, session, message["bytes"])
+                        continue
+
+                    request = json.loads(message["text"])
+                    message_type = request.get("type")
+                    if message_type == "hello":
+                        # Handshake: the client offers codecs in order of preference.
+                        codec_name = negotiate_codec(
+                            request.get("codecs", []), self.allowed_codecs()
+                        )
+                        logger.info("Server: Negotiated %s codec", codec_name)
+                        await websocket.send_json(
+                            {"type": "hello", "version": PROTOCOL_VERSION, "codec": codec_name}
+                        )
+                    elif message_type == "start":
+                        if session is not None:
+                            raise ProtocolError("Received a start message during a session")
+                        session = self.start_session(request, client_id)
+                        logger.info("Server: Started session %s", session.session_id)
+                        await websocket.send_json(
+                            {"type": "started", "session_id": session.session_id}
+                        )
+                    elif message_type == "end":
+                        if session is None:
+                            logger.warning("Server: Ignoring end message without a session")
+                            continue
+                        await self.end_session(websocket, session, request.get("last_seq"))
+                        session = None
+                    elif message_type == "cancel":
+                        logger.info("Server: Session cancelled by client")
+                        if session:
+                            self.close_session(session, "cancelled")
+                            session = None
+                    else:
+                        raise ValueError(f"Unknown message type {message_type}")
+                except (
+                    ProtocolError,
+                    AudioBufferFull,
+                    InferenceQueueFull,
+                    asyncio.TimeoutError,
+                ) as e:
+                    # The utterance failed, but the connection can carry the next one.
+                    error = str(e) or "Transcription timed out"
+                    logger.error("Server: %s", error)
+                    session_id = session.session_id if session else request.get("session_id")
+                    await websocket.send_json(error_message(error, session_id))
+                    if session:
+                        self.close_session(session, "error")
+                        session = None
+                except (ValueError, KeyError) as e:
+                    logger.error("Server: Closing connection after malformed message: %s", e)
+                    await websocket.send_json(error_message(f"Malformed message: {e}"))
+                    break
+            try:
+                await websocket.close()
+            except RuntimeError as e:
+                # Ignore errors if the connection is already closed/completed
+                logger.warning("Server: Warning while closing websocket: %s", e)
+        finally:
+            # Also release the session if the handler failed unexpectedly.
+            if session:
+                self.close_session(session, "disconnected")
+            self.metrics.connections.dec()
+
+
+# Errors that fail a single upload rather than the whole request.
+UPLOAD_ERRORS = (ValueError, AudioBufferFull, InferenceQueueFull, asyncio.TimeoutError)
+
+
+def upload_error(error: Exception) -> Tuple[int, str]:
+    """HTTP status and message for an upload error."""
+    if isinstance(error, AudioBufferFull):
+        return 413, str(error)
+    if isinstance(error, InferenceQueueFull):
+        return 503, str(error)
+    if isinstance(error, asyncio.TimeoutError):
+        return 504, "Transcription timed out"
+    return 400, str(error)
+
+
+def create_app(config: ServerConfig = None) -> FastAPI:
+    """Create the server app, e.g. `uvicorn --factory whisperchain.server.server:create_app`."""
+    return WhisperServer(config).app
 
-# Create default instance
-default_server = WhisperServer()
-app = default_server.app
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import uvicorn
+
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Optional
+
+from whisperchain.core.buffer import PCMBuffer
+from whisperchain.core.codec import Codec
+from whisperchain.core.protocol import ProtocolError
+from whisperchain.server.metrics import StageTimings
+from whisperchain.server.streaming import StreamingTranscriber
+
+
+class StreamSession:
+    """State of one utterance streamed to the server, from its start message to its end."""
+
+    def __init__(
+        self,
+        session_id: str,
+        codec: Codec,
+        audio_buffer: PCMBuffer,
+        transcriber: Optional[StreamingTranscriber] = None,
+        options: Optional[dict] = None,
+        client_id: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+    ):
+        self.session_id = session_id
+        # The connection the session arrived on, used to share inference fairly.
+        self.client_id = client_id
+        self.codec = codec
+        self.audio_buffer = audio_buffer
+        self.transcriber = transcriber
+        self.options = options or {}
+        self.next_seq = 0
+        # Audio bytes received on the wire, before decoding.
+        self.received_bytes = 0
+        self.started_at = time.perf_counter()
+        self.timings = timings or StageTimings()
+        self.partial_task: Optional[asyncio.Task] = None
+        # Model routed for the audio received so far, see `WhisperServer.route_session`.
+        self.model: Optional[str] = None
+
+    def add_frame(self, seq: int, payload: bytes) -> bytes:
+        """
+        Decode an audio frame into the session buffer.
+
+        Frames must arrive in sequence. A frame that was already received (e.g. resent after a
+        reconnect) is ignored.
+
+        Returns:
+            bytes: The decoded PCM audio, empty if the frame was a duplicate.
+
+        Raises:
+            ProtocolError: If the frame is out of sequence, cannot be decoded, or decodes to more
+                audio than the buffer has room for.
+        """
+        if seq < self.next_seq:
+            return b""
+        if seq > self.next_seq:
+            raise ProtocolError(f"Missing audio frame {self.next_seq}, received {seq}")
+        try:
+            # Bounding the output keeps a compressed frame from expanding past the buffer limit.
+            pcm = self.codec.decode(payload, max_bytes=self.audio_buffer.free_bytes)
+        except Exception as e:
+            # zlib, struct and opus errors alike mean the peer sent a corrupt frame.
+            raise ProtocolError(f"Could not decode audio frame {seq}: {e}") from e
+        self.audio_buffer.append(pcm)
+        self.next_seq += 1
+        self.received_bytes += len(payload)
+        return pcm
+
+    def check_complete(self, last_seq: Optional[int]):
+        """Check that every frame up to `last_seq` has been received."""
+        if last_seq is not None and last_seq != self.next_seq - 1:
+            raise ProtocolError(
+                f"Stream ended at frame {last_seq} but frames up to {self.next_seq - 1} arrived"
+            )
+
+    async def wait_for_partial(self):
+        """Let an in-flight partial decode finish so its committed segments are reused."""
+        if self.partial_task:
+            await asyncio.gather(self.partial_task, return_exceptions=True)
+
+    def close(self):
+        if self.partial_task and not self.partial_task.done():
+            self.partial_task.cancel()
+        self.audio_buffer.close()
@@ -0,0 +1,90 @@
+from typing import Awaitable, Callable, List, Optional
+
+import numpy as np
+from pywhispercpp.model import Segment
+
+from whisperchain.core.config import PartialTranscriptConfig
+from whisperchain.utils.segment import CENTISECONDS_PER_SECOND, offset_segments
+
+
+class StreamingTranscriber:
+    """
+    Incrementally transcribes a growing audio buffer.
+
+    Each update decodes only the audio after the last committed segment. Segments that end well
+    before the end of the buffer are unlikely to change when more audio arrives, so they are
+    committed and never decoded again. The final pass then only has to decode the uncommitted
+    tail.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[np.ndarray], Awaitable[List[Segment]]],
+        config: PartialTranscriptConfig = None,
+        sample_rate: int = 16000,
+        final_decode: Optional[Callable[[np.ndarray], Awaitable[List[Segment]]]] = None,
+    ):
+        self.decode = decode
+        # The final pass may be scheduled differently from the partial updates.
+        self.final_decode = final_decode or decode
+        self.config = config or PartialTranscriptConfig()
+        self.sample_rate = sample_rate
+        self.committed: List[Segment] = []
+        self.committed_samples = 0
+        self.tentative: List[Segment] = []
+        self.decoded_samples = 0
+
+    @property
+    def segments(self) -> List[Segment]:
+        """Committed segments followed by the latest tentative ones."""
+        return self.committed + self.tentative
+
+    def reset(self):
+        """Drop all segments, so the next decode covers the whole buffer."""
+        self.committed = []
+        self.committed_samples = 0
+        self.tentative = []
+
+    def needs_update(self, num_samples: int) -> bool:
+        """Whether enough new audio has arrived since the last decode."""
+        return num_samples - self.decoded_samples >= self.config.interval * self.sample_rate
+
+    def _to_samples(self, centiseconds: int) -> int:
+        return centiseconds * self.sample_rate // CENTISECONDS_PER_SECOND
+
+    async def _decode_tail(self, audio: np.ndarray, decode: Callable) -> List[Segment]:
+        offset = self.committed_samples * CENTISECONDS_PER_SECOND // self.sample_rate
+        tail = audio[self._to_samples(offset) :]
+        if not len(tail):
+            return []
+        segments = await decode(tail)
+        return offset_segments(segments, offset)
+
+    async def update(self, audio: np.ndarray) -> List[Segment]:
+        """Decode the uncommitted tail of `audio` and commit segments that are now stable."""
+        self.decoded_samples = len(audio)
+        segments = await self._decode_tail(audio, self.decode)
+
+        end = len(audio) * CENTISECONDS_PER_SECOND // self.sample_rate
+        margin = int(self.config.commit_margin * CENTISECONDS_PER_SECOND)
+        window = int(self.config.max_window * CENTISECONDS_PER_SECOND)
+        commit_offset = self.committed_samples * CENTISECONDS_PER_SECOND // self.sample_rate
+        # Always keep the last segment tentative: it is the one most likely to change. If the
+        # uncommitted window grows too long, commit everything else regardless of the margin.
+        num_commit = 0
+        for segment in segments[:-1]:
+            if segment.t1 <= end - margin or end - commit_offset > window:
+                num_commit += 1
+            else:
+                break
+        if num_commit:
+            self.committed.extend(segments[:num_commit])
+            self.committed_samples = self._to_samples(segments[num_commit - 1].t1)
+        self.tentative = segments[num_commit:]
+        return self.segments
+
+    async def finalize(self, audio: np.ndarray) -> List[Segment]:
+        """Decode the remaining tail and return the full list of segments."""
+        self.tentative = await self._decode_tail(audio, self.final_decode)
+        self.decoded_samples = len(audio)
+        return self.segments
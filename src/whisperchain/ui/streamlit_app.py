@@ -6,14 +6,86 @@
 #
 # $ lsof -ti :8501 | xargs kill -9
 
+import json
 import time
-from datetime import datetime
+from typing import Iterator, Tuple
 
 import requests
 import streamlit as st
 
 from whisperchain.core.config import config
 
+# Seconds between keepalives on the history stream. The script only notices button clicks
+# when it updates the page, so keep this short.
+STREAM_KEEPALIVE = 1.0
+
+
+def stream_events(since: int) -> Iterator[Tuple[str, dict]]:
+    """
+    Follow the server's /history/stream, yielding (event, data) for each server-sent event.
+
+    Keepalives are yielded as ("keepalive", {}).
+    """
+    response = requests.get(
+        config.ui_config.server_url + "/history/stream",
+        params={"since": since, "keepalive": STREAM_KEEPALIVE},
+        stream=True,
+        timeout=(5, STREAM_KEEPALIVE * 5),
+    )
+    response.raise_for_status()
+    event, data = "message", ""
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith(":"):
+            yield "keepalive", {}
+        elif line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:"):
+            data += line[len("data:") :].strip()
+        elif not line and data:
+            yield event, json.loads(data)
+            event, data = "message", ""
+    raise requests.ConnectionError("History stream closed")
+
+
+def render_history(placeholder, history: list):
+    with placeholder.container():
+        for entry in reversed(history):
+            with st.expander(
+                f"Transcription {entry.get('id', '')}", expanded=config.ui_config.default_expanded
+            ):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.subheader("Raw Transcription")
+                    st.text(entry.get("transcription", ""))
+                    st.caption(f"Processed bytes: {entry.get('processed_bytes', 0)}")
+                with col2:
+                    st.subheader("Cleaned Transcription")
+                    st.text(entry.get("cleaned_transcription", ""))
+                    st.caption(f"Timestamp: {entry.get('timestamp', '')}")
+
+
+def render_search(query: str):
+    """Show history entries matching `query`, most relevant first."""
+    response = requests.get(
+        config.ui_config.server_url + "/history/search",
+        params={"q": query, "limit": config.ui_config.history_limit},
+    )
+    response.raise_for_status()
+    results = response.json()
+    st.header(f"Search Results ({len(results)})")
+    for entry in results:
+        with st.expander(f"Transcription {entry['id']}", expanded=True):
+            st.text(entry.get("cleaned_transcription", "") or entry.get("transcription", ""))
+            st.caption(f"Timestamp: {entry.get('timestamp', '')} · Score: {entry['score']:.2f}")
+
+
+def render_active(placeholder, active: dict):
+    with placeholder.container():
+        # Show cleanups that are still streaming in
+        for entry in active.values():
+            text = entry.get("cleaned_transcription", "") or entry.get("transcription", "")
+            st.info(f"In progress: {text}")
+
 
 def main():
     # Set page config
@@ -25,33 +97,21 @@ def main():
 
     st.title("WhisperChain Dashboard")
 
-    # Initialize session state
-    if "last_history" not in st.session_state:
-        st.session_state.last_history = []
-        st.session_state.last_check_time = time.time()
-        st.session_state.server_online = False  # Initialize server status
+    # History is fetched once, then kept up to date from the server's event stream.
+    if "history" not in st.session_state:
+        st.session_state.history = None
+        st.session_state.active = {}
 
-    # Server status check - only check every 5 seconds
-    current_time = time.time()
-    if current_time - st.session_state.last_check_time >= 5:
-        try:
-            response = requests.get(config.ui_config.server_url)
-            st.session_state.server_online = response.status_code == 200
-            st.session_state.last_check_time = current_time
-        except:
-            st.session_state.server_online = False
-
-    # Display server status
     st.sidebar.header("Server Status")
-    if st.session_state.server_online:
-        st.sidebar.success("🟢 Server Online")
-    else:
-        st.sidebar.error("🔴 Server Offline")
-        st.header(
-            "Once the server is online, the UI will automatically refresh and display the transcription history."
-        )
-        time.sleep(5)  # Longer delay when server is offline
-        st.rerun()
+    status = st.sidebar.empty()
+    query = st.sidebar.text_input("Search History")
+
+    if query.strip():
+        try:
+            render_search(query)
+        except requests.RequestException:
+            # The server status below reports the failure.
+            pass
 
     # Transcription History
     st.header("Transcription History")
@@ -59,42 +119,57 @@ def main():
     # Clear history button
     if st.button("Clear History"):
         requests.delete(config.ui_config.server_url + "/history")
-        st.session_state.last_history = []
-        st.rerun()
-
-    try:
-        # Fetch history from server
-        response = requests.get(config.ui_config.server_url + "/history")
-        history = response.json()
+        st.session_state.history = []
 
-        # Check if history has changed
-        history_changed = len(history) != len(st.session_state.last_history)
-        st.session_state.last_history = history
+    active_placeholder = st.empty()
+    history_placeholder = st.empty()
+    limit = config.ui_config.history_limit
 
-        # Display transcriptions
-        for idx, entry in enumerate(reversed(history)):
-            with st.expander(f"Transcription {len(history) - idx}", expanded=False):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.subheader("Raw Transcription")
-                    st.text(entry.get("transcription", ""))
-                    st.caption(f"Processed bytes: {entry.get('processed_bytes', 0)}")
-                with col2:
-                    st.subheader("Cleaned Transcription")
-                    st.text(entry.get("cleaned_transcription", ""))
-                    st.caption(f"Timestamp: {entry.get('timestamp', '')}")
-
-        # Only rerun if history has changed
-        if history_changed:
-            print("History changed, rerunning...")
-            time.sleep(config.ui_config.quick_refresh)
-            st.rerun()
-        else:
-            time.sleep(config.ui_config.refresh_interval)
-            st.rerun()
-
-    except Exception as e:
-        st.error(f"Error fetching history: {str(e)}")
+    try:
+        if st.session_state.history is None:
+            response = requests.get(
+                config.ui_config.server_url + "/history", params={"limit": limit}
+            )
+            response.raise_for_status()
+            st.session_state.history = response.json()
+        history = st.session_state.history
+        active = st.session_state.active
+        render_history(history_placeholder, history)
+        render_active(active_placeholder, active)
+
+        # Only entries newer than the last one shown are sent.
+        since = history[-1]["id"] if history else 0
+        for event, data in stream_events(since):
+            status.success("🟢 Server Online")
+            if event == "history":
+                history.append(data)
+                del history[:-limit]
+                active.pop(data.get("session_id"), None)
+                render_history(history_placeholder, history)
+                render_active(active_placeholder, active)
+            elif event == "active":
+                active[data["session_id"]] = data
+                render_active(active_placeholder, active)
+            elif event == "active_delta" and data["session_id"] in active:
+                active[data["session_id"]]["cleaned_transcription"] += data["delta"]
+                render_active(active_placeholder, active)
+            elif event == "active_end":
+                active.pop(data["session_id"], None)
+                render_active(active_placeholder, active)
+            elif event == "cleared":
+                history.clear()
+                render_history(history_placeholder, history)
+
+    except requests.RequestException:
+        status.error("🔴 Server Offline")
+        if not st.session_state.history:
+            st.header(
+                "Once the server is online, the UI will automatically refresh and display the transcription history."
+            )
+        # Fetch the history again once the server is back, in case it restarted.
+        st.session_state.history = None
+        st.session_state.active = {}
+        time.sleep(config.ui_config.refresh_interval)
         st.rerun()
 
 
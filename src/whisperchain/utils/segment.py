@@ -2,6 +2,9 @@ from typing import List
 
 from pywhispercpp.model import Segment
 
+# Whisper reports segment timestamps in centiseconds.
+CENTISECONDS_PER_SECOND = 100
+
 
 def list_of_segments_to_text(segments: List[Segment]) -> str:
     return " ".join([segment.text for segment in segments])
@@ -9,3 +12,10 @@ def list_of_segments_to_text(segments: List[Segment]) -> str:
 
 def list_of_segments_to_text_with_timestamps(segments: List[Segment]) -> str:
     return " ".join([f"[{segment.t0}-{segment.t1}] {segment.text}" for segment in segments])
+
+
+def offset_segments(segments: List[Segment], offset: int) -> List[Segment]:
+    """Shift segment timestamps (in centiseconds, as reported by whisper) by `offset`."""
+    return [
+        Segment(segment.t0 + offset, segment.t1 + offset, segment.text) for segment in segments
+    ]
@@ -0,0 +1,65 @@
+import io
+import wave
+from pathlib import Path
+from typing import BinaryIO, Union
+
+import numpy as np
+
+from whisperchain.core.protocol import SAMPLE_RATE
+
+
+def resample(audio: np.ndarray, sample_rate: int, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Resample float audio by linear interpolation."""
+    if sample_rate == target_rate or not len(audio):
+        return audio
+    duration = len(audio) / sample_rate
+    positions = np.arange(int(duration * target_rate)) * (sample_rate / target_rate)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(audio.dtype)
+
+
+def read_wav(source: Union[str, Path, bytes, BinaryIO]) -> bytes:
+    """
+    Read a PCM WAV file as 16 kHz mono int16 PCM, the format the server expects.
+
+    Stereo is mixed down and other sample rates are resampled.
+
+    Args:
+        source: A path, the file's bytes or a binary file object.
+
+    Raises:
+        ValueError: If the data is not an 8, 16 or 32-bit PCM WAV file.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif isinstance(source, Path):
+        source = str(source)
+    try:
+        with wave.open(source, "rb") as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            sample_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Not a PCM WAV file: {e}")
+    if sample_width == 1:
+        # 8-bit WAV samples are unsigned.
+        audio = (np.frombuffer(frames, np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        audio = np.frombuffer(frames, np.int16).astype(np.float32) / 32768
+    elif sample_width == 4:
+        audio = np.frombuffer(frames, np.int32).astype(np.float32) / 2**31
+    else:
+        raise ValueError(f"Unsupported WAV sample width of {sample_width} bytes")
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    audio = resample(audio, sample_rate)
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def write_wav(path: Union[str, Path], pcm: bytes, sample_rate: int = SAMPLE_RATE):
+    """Write mono int16 PCM to a WAV file."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
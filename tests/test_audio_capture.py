@@ -1,11 +1,13 @@
+import asyncio
 import multiprocessing as mp
 import os
+import threading
 import time
 
 import pyaudio
 import pytest
 
-from whisperchain.core.audio import AudioCapture
+from whisperchain.core.audio import AudioCapture, AudioReader
 from whisperchain.core.config import AudioConfig
 
 
@@ -78,3 +80,21 @@ def test_audio_playback():
         rate=config.sample_rate,
         output=True,
     ).write(bytes(audio_data))
+
+
+async def test_audio_reader():
+    reader = AudioReader(capacity=8)
+    producer = threading.Thread(target=lambda: [reader.put(b"ab") for _ in range(3)])
+    producer.start()
+    producer.join()
+    # Chunks captured between reads are returned together.
+    assert await reader.read() == b"ababab"
+
+    reader.put(b"0123456789")
+    assert await reader.read() == b"23456789"
+    assert reader.num_dropped == 2
+
+    reader.put(b"xy")
+    reader.close()
+    assert await reader.read() == b"xy"
+    assert await asyncio.wait_for(reader.read(), timeout=1.0) == b""
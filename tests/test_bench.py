@@ -0,0 +1,76 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+import whisperchain.cli.bench as bench
+from whisperchain.cli.bench import Result, RSSSampler, current_rss_mb, summarize
+from whisperchain.utils.wav import read_wav
+
+
+def wav_bytes(samples: np.ndarray, sample_rate: int, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def test_read_wav_mixes_down_and_resamples():
+    # One second of 8 kHz stereo becomes one second of 16 kHz mono.
+    stereo = np.full((8000, 2), [1000, 3000]).reshape(-1)
+    pcm = read_wav(wav_bytes(stereo, 8000, channels=2))
+    audio = np.frombuffer(pcm, np.int16)
+    assert len(audio) == 16000
+    assert abs(int(audio[100]) - 2000) <= 1
+
+
+def test_read_wav_rejects_other_files():
+    with pytest.raises(ValueError):
+        read_wav(b"not a wav file")
+
+
+def test_summarize_percentiles_and_real_time_factor():
+    results = [Result(f"clip{i}", 2.0, i / 100, {"decode_ms": 100.0}) for i in range(1, 101)]
+    results.append(Result("broken", 2.0, 0.0, {}, "failed"))
+    summary = summarize(results, wall_seconds=10.0)
+    assert summary["requests"] == 101 and summary["errors"] == 1
+    assert summary["requests_per_second"] == 10.0
+    assert summary["audio_throughput"] == 20.0
+    assert summary["latency_p50_ms"] == 505.0
+    assert summary["latency_p99_ms"] == 990.1
+    assert summary["real_time_factor"] == 0.05
+    assert summary["peak_rss_mb"] is None
+
+
+@pytest.mark.skipif(current_rss_mb() is None, reason="Needs /proc/self/statm")
+def test_rss_sampler_measures_each_run():
+    with RSSSampler(interval=0.01) as first:
+        data = np.ones(64 * 1024 * 1024, np.uint8)
+        del data
+    # Memory freed after the first run does not count towards the second.
+    with RSSSampler(interval=0.01) as second:
+        pass
+    assert first.peak - second.peak > 32
+
+
+def test_url_mode_asks_the_server_for_each_model(monkeypatch, tmp_path):
+    (tmp_path / "clip.wav").write_bytes(wav_bytes(np.zeros(16000), 16000))
+    requested = []
+
+    async def bench_websocket(benchmark, url, levels, repeat, warmup, measure_memory=True):
+        requested.append((url, benchmark.options))
+        return [{"concurrency": 1}]
+
+    monkeypatch.setattr(bench, "bench_websocket", bench_websocket)
+    args = [str(tmp_path), "--mode", "websocket", "--url", "ws://server/stream", "--no-cleanup"]
+    result = CliRunner().invoke(bench.main, args + ["--model", "tiny.en", "--model", "base.en"])
+    assert result.exit_code == 0, result.output
+    assert requested == [
+        ("ws://server/stream", {"cleanup": False, "model": "tiny.en"}),
+        ("ws://server/stream", {"cleanup": False, "model": "base.en"}),
+    ]
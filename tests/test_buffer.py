@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from whisperchain.core.buffer import AudioBufferFull, PCMBuffer, RingBuffer
+
+
+def pcm(samples):
+    return np.asarray(samples, dtype=np.int16).tobytes()
+
+
+def test_append_converts_to_float32():
+    buffer = PCMBuffer()
+    buffer.append(pcm([0, 32767, -32767]))
+    assert buffer.view().dtype == np.float32
+    np.testing.assert_allclose(buffer.view(), [0.0, 1.0, -1.0])
+    assert buffer.num_bytes == 6
+
+
+def test_matches_bulk_conversion_across_odd_chunks():
+    samples = np.random.default_rng(0).integers(-32768, 32767, 5000, dtype=np.int16)
+    data = samples.tobytes()
+    buffer = PCMBuffer(initial_seconds=0.01)
+    # Odd-sized chunks split samples across appends.
+    for i in range(0, len(data), 333):
+        buffer.append(data[i : i + 333])
+    expected = samples.astype(np.float32) / np.iinfo(np.int16).max
+    np.testing.assert_array_equal(buffer.view(), expected)
+    assert buffer.to_pcm16() == data
+
+
+def test_upper_bound():
+    buffer = PCMBuffer(sample_rate=100, initial_seconds=0.5, max_seconds=1.0)
+    buffer.append(pcm(np.zeros(100)))
+    with pytest.raises(AudioBufferFull):
+        buffer.append(pcm([1]))
+    assert len(buffer) == 100
+
+
+def test_spill_to_disk(tmp_path):
+    buffer = PCMBuffer(
+        sample_rate=100, initial_seconds=0.5, spill_after_seconds=1.0, spill_dir=str(tmp_path)
+    )
+    samples = np.arange(500, dtype=np.int16)
+    for chunk in np.split(samples, 10):
+        buffer.append(pcm(chunk))
+    assert buffer.spilled
+    assert isinstance(buffer.view().base, np.memmap) or isinstance(buffer.view(), np.memmap)
+    assert buffer.to_pcm16() == samples.tobytes()
+    buffer.close()
+    assert not buffer.spilled
+
+
+def test_ring_buffer_keeps_latest_bytes():
+    ring = RingBuffer(8)
+    ring.write(b"abc")
+    assert ring.read() == b"abc"
+    ring.write(b"defgh")
+    ring.write(b"ijk")
+    assert ring.read() == b"defghijk"
+    ring.write(b"0123456789")
+    assert ring.drain() == b"23456789"
+    assert len(ring) == 0 and ring.read() == b""
@@ -0,0 +1,89 @@
+import time
+
+from whisperchain.core.cache import CleanupCache, cache_key
+
+
+def test_cache_key_normalizes_transcription():
+    key = cache_key(" Send  it ", "prompt", "gpt-3.5-turbo")
+    assert key == cache_key("send it", "prompt", "gpt-3.5-turbo")
+    assert key != cache_key("send it", "other prompt", "gpt-3.5-turbo")
+    assert key != cache_key("send it", "prompt", "gpt-4o")
+
+
+def test_lru_eviction():
+    cache = CleanupCache(max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+    # "b" was the least recently used entry.
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl():
+    cache = CleanupCache(ttl=0.05)
+    cache.put("a", "A")
+    assert cache.get("a") == "A"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = CleanupCache(disk_path=path)
+    cache.put("a", "A")
+    cache.close()
+
+    cache = CleanupCache(disk_path=path)
+    assert cache.get("a") == "A"
+    assert cache.stats()["disk_hits"] == 1
+    # Promoted to memory, so the next hit does not touch the disk.
+    assert cache.get("a") == "A"
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
+
+
+def test_disk_size_limit(tmp_path):
+    cache = CleanupCache(
+        max_entries=1, disk_path=str(tmp_path / "cache.sqlite"), disk_max_entries=2
+    )
+    for key in "abc":
+        cache.put(key, key.upper())
+        time.sleep(0.01)
+    assert cache.get("a") is None
+    assert cache.get("b") == "B"
+    cache.close()
+
+
+def test_disk_eviction_is_batched(tmp_path):
+    cache = CleanupCache(
+        max_entries=1, disk_path=str(tmp_path / "cache.sqlite"), disk_max_entries=10
+    )
+    for i in range(11):
+        cache.put(str(i), str(i))
+    # Up to a tenth over the limit is tolerated until the next trim.
+    assert cache._count_disk() == 11
+    cache.put("11", "11")
+    assert cache._count_disk() == 10
+    assert cache.get("0") is None and cache.get("11") == "11"
+    cache.close()
+
+
+async def test_async_access_uses_the_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = CleanupCache(max_entries=1, disk_path=path)
+    await cache.aput("a", "A")
+    await cache.aput("b", "B")
+    # "a" was evicted from memory but is still on disk.
+    assert await cache.aget("a") == "A"
+    assert await cache.aget("missing") is None
+    assert cache.stats()["disk_hits"] == 1 and cache.stats()["misses"] == 1
+    cache.close()
+
+    memory_only = CleanupCache()
+    await memory_only.aput("a", "A")
+    assert await memory_only.aget("a") == "A" and await memory_only.aget("b") is None
@@ -1,7 +1,7 @@
 import pytest
 from pywhispercpp.model import Segment
 
-from whisperchain.core.chain import TranscriptionCleaner
+from whisperchain.core.chain import TranscriptionCleaner, cleanup_skip_reason
 from whisperchain.utils.segment import list_of_segments_to_text
 
 
@@ -24,3 +24,19 @@ def test_list_of_segments(cleaner):
 
     cleaned_text = cleaner.clean(final_text)
     assert cleaned_text == "Hello, world!"
+
+
+def test_cleanup_skip_reason():
+    assert cleanup_skip_reason("") == "empty"
+    assert cleanup_skip_reason(" [BLANK_AUDIO]") == "blank_audio"
+    assert cleanup_skip_reason(" (upbeat music) [BLANK_AUDIO]") == "blank_audio"
+    assert cleanup_skip_reason(" New line.") == "short"
+    assert cleanup_skip_reason(" Um, new line.") is None
+    assert cleanup_skip_reason("send send it") is None
+    assert cleanup_skip_reason("What is the weather like in Salt Lake City?") is None
+    assert (
+        cleanup_skip_reason("What is the weather like in Salt Lake City?", policy="clean")
+        == "no_fillers"
+    )
+    assert cleanup_skip_reason("Uh what is the weather", policy="clean") is None
+    assert cleanup_skip_reason("", policy="never") is None
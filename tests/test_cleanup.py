@@ -0,0 +1,82 @@
+import asyncio
+
+from whisperchain.core.config import CleanupConfig
+from whisperchain.server.cleanup import CleanupService
+
+
+class FakeCleaner:
+    """Stands in for TranscriptionCleaner without calling an LLM."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aclean(self, transcription: str) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            return transcription.upper()
+        finally:
+            self.in_flight -= 1
+
+
+async def test_clean():
+    service = CleanupService(FakeCleaner())
+    result = await service.clean("um hello there")
+    assert result.text == "UM HELLO THERE"
+    assert result.fallback_reason is None
+
+
+async def test_concurrency_limit():
+    cleaner = FakeCleaner(delay=0.05)
+    service = CleanupService(cleaner, CleanupConfig(max_concurrency=2))
+    await asyncio.gather(*[service.clean("um hello there") for _ in range(6)])
+    assert cleaner.max_in_flight == 2
+
+
+async def test_timeout_falls_back_to_raw_text():
+    service = CleanupService(FakeCleaner(delay=1.0), CleanupConfig(timeout=0.05))
+    result = await service.clean("um hello there")
+    assert result.text == "um hello there"
+    assert result.fallback_reason == "timeout"
+
+
+async def test_error_falls_back_to_raw_text():
+    service = CleanupService(FakeCleaner(error=RuntimeError("rate limited")))
+    result = await service.clean("um hello there")
+    assert result.text == "um hello there"
+    assert "rate limited" in result.fallback_reason
+
+
+class FakeStreamingCleaner(FakeCleaner):
+    async def astream(self, transcription: str):
+        for word in transcription.upper().split():
+            await asyncio.sleep(self.delay)
+            yield word + " "
+
+
+async def test_stream_deltas():
+    deltas = []
+
+    async def on_delta(delta):
+        deltas.append(delta)
+
+    service = CleanupService(FakeStreamingCleaner())
+    result = await service.clean("uh hello world", on_delta=on_delta)
+    assert deltas == ["UH ", "HELLO ", "WORLD "]
+    assert result.text == "UH HELLO WORLD"
+
+
+async def test_skip_trivial_transcripts():
+    cleaner = FakeCleaner()
+    service = CleanupService(cleaner)
+    result = await service.clean(" [BLANK_AUDIO]")
+    assert result == ("", None, "blank_audio")
+    result = await service.clean(" Send it.")
+    assert result == ("Send it.", None, "short")
+    assert cleaner.max_in_flight == 0
@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+
+def test_run_cli_imports_heavy_dependencies_lazily():
+    # Starting e.g. only the client must not pay for loading whisper or the LLM stack.
+    code = (
+        "import sys, whisperchain.cli.run\n"
+        "heavy = ('pywhispercpp', 'langchain', 'langchain_core', 'langchain_openai', 'openai',\n"
+        "         'uvicorn', 'fastapi')\n"
+        "print(sorted({name.split('.')[0] for name in sys.modules} & set(heavy)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
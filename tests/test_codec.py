@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from whisperchain.core.codec import (
+    DeltaCodec,
+    PCMCodec,
+    available_codecs,
+    create_codec,
+    negotiate_codec,
+)
+
+
+def speech_like_pcm(seconds=1.0, sample_rate=16000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 180 * t) + 0.1 * np.sin(2 * np.pi * 950 * t)
+    noise = np.random.default_rng(0).normal(0, 0.002, len(t))
+    return ((signal + noise) * np.iinfo(np.int16).max).astype(np.int16).tobytes()
+
+
+@pytest.mark.parametrize("codec_class", [PCMCodec, DeltaCodec])
+def test_lossless_round_trip(codec_class):
+    pcm = speech_like_pcm()
+    extremes = np.array([32767, -32768, 32767, -32768, 0], dtype=np.int16).tobytes()
+    encoder, decoder = codec_class(), codec_class()
+    for chunk in [pcm[:8192], pcm[8192:], extremes]:
+        assert decoder.decode(encoder.encode(chunk)) == chunk
+
+
+def test_delta_compresses_speech():
+    pcm = speech_like_pcm()
+    assert len(DeltaCodec().encode(pcm)) < 0.75 * len(pcm)
+
+
+def test_negotiate_codec():
+    assert negotiate_codec(["delta", "pcm"]) == "delta"
+    assert negotiate_codec(["unknown", "delta"]) == "delta"
+    assert negotiate_codec(["delta"], supported=["pcm"]) == "pcm"
+    assert negotiate_codec([]) == "pcm"
+
+
+def test_create_codec():
+    assert set(available_codecs()) >= {"pcm", "delta"}
+    assert isinstance(create_codec("delta"), DeltaCodec)
+    with pytest.raises(ValueError):
+        create_codec("mp3")
+
+
+@pytest.mark.skipif("opus" not in available_codecs(), reason="Requires opuslib and libopus")
+def test_opus_round_trip_length():
+    pcm = speech_like_pcm(seconds=0.5)
+    encoder, decoder = create_codec("opus"), create_codec("opus")
+    payload = encoder.encode(pcm[:3000]) + encoder.encode(pcm[3000:]) + encoder.flush()
+    decoded = decoder.decode(payload)
+    assert len(decoded) >= len(pcm)
+    assert len(payload) < len(pcm) / 4
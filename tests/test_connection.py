@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+import websockets
+from websockets.protocol import State
+
+from whisperchain.client.connection import ConnectionManager
+from whisperchain.core.config import ClientConfig
+
+
+@pytest.fixture
+async def server():
+    connections = []
+
+    async def handler(websocket, *args):
+        connections.append(websocket)
+        async for message in websocket:
+            request = json.loads(message)
+            if request["type"] == "hello":
+                await websocket.send(json.dumps({"type": "hello", "codec": request["codecs"][0]}))
+
+    async with websockets.serve(handler, "localhost", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        yield f"ws://localhost:{port}", connections
+
+
+@pytest.fixture
+async def manager_factory():
+    managers = []
+
+    def create(url, **stream):
+        manager = ConnectionManager(ClientConfig(server_url=url, stream=stream))
+        manager.start()
+        managers.append(manager)
+        return manager
+
+    yield create
+    for manager in managers:
+        # Stop from a thread so the test server can answer the closing handshake.
+        await asyncio.to_thread(manager.stop)
+
+
+async def run(manager, coro):
+    return await asyncio.wrap_future(manager.submit(coro))
+
+
+async def test_connection_is_reused(server, manager_factory):
+    url, connections = server
+    manager = manager_factory(url, codecs=["delta", "pcm"])
+    websocket, codec_name = await run(manager, manager.connect())
+    assert codec_name == "delta"
+    assert (await run(manager, manager.connect()))[0] is websocket
+    assert len(connections) == 1
+
+    # A dropped connection is reopened and the codec negotiated again.
+    await connections[0].close()
+    await asyncio.sleep(0.1)
+    assert (await run(manager, manager.connect()))[0] is not websocket
+    assert len(connections) == 2
+
+
+async def test_connect_gives_up_after_retries(manager_factory):
+    manager = manager_factory(
+        "ws://localhost:1", reconnect_attempts=2, reconnect_initial_delay=0.01
+    )
+    with pytest.raises(ConnectionError):
+        await run(manager, manager.connect())
+
+
+async def test_failed_negotiation_closes_the_connection(manager_factory):
+    connections = []
+
+    async def handler(websocket, *args):
+        connections.append(websocket)
+        async for _ in websocket:
+            await websocket.send("not a hello reply")
+
+    async with websockets.serve(handler, "localhost", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        manager = manager_factory(
+            f"ws://localhost:{port}", reconnect_attempts=2, reconnect_initial_delay=0.01
+        )
+        with pytest.raises(ConnectionError):
+            await run(manager, manager.connect())
+        await asyncio.sleep(0.1)
+        assert len(connections) == 3
+        assert all(websocket.state is State.CLOSED for websocket in connections)
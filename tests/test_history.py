@@ -0,0 +1,114 @@
+import time
+
+from whisperchain.server.history import HistoryFeed, HistoryStore, sse_event
+
+
+def texts(entries):
+    return [entry["text"] for entry in entries]
+
+
+def fill(store, count):
+    for i in range(count):
+        store.append({"text": f"t{i}"})
+
+
+def test_ring_buffer_keeps_newest_entries():
+    store = HistoryStore(max_entries=3)
+    fill(store, 5)
+    assert len(store) == 3
+    assert texts(store.page()) == ["t2", "t3", "t4"]
+    assert store.last_id == 5
+
+
+def test_cursor_pagination():
+    store = HistoryStore()
+    fill(store, 10)
+    assert texts(store.page(limit=3)) == ["t7", "t8", "t9"]
+    assert texts(store.page(limit=3, before=8)) == ["t4", "t5", "t6"]
+    assert texts(store.page(limit=3, after=2)) == ["t2", "t3", "t4"]
+    assert texts(store.page(limit=5, after=4, before=8)) == ["t4", "t5", "t6"]
+    assert store.page(after=10) == []
+
+
+def test_disk_store_pages_past_memory_and_survives_restart(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    store = HistoryStore(max_entries=2, disk_path=path)
+    fill(store, 6)
+    assert texts(store.page(limit=3)) == ["t3", "t4", "t5"]
+    assert texts(store.page(limit=2, before=3)) == ["t0", "t1"]
+    assert texts(store.page(limit=2, after=1)) == ["t1", "t2"]
+    store.close()
+
+    store = HistoryStore(max_entries=2, disk_path=path)
+    assert texts(store.page(limit=2)) == ["t4", "t5"]
+    assert store.append({"text": "t6"})["id"] == 7
+    assert store.stats() == {"entries": 2, "last_id": 7, "disk_entries": 7}
+    store.close()
+
+
+def test_retention(tmp_path):
+    store = HistoryStore(disk_path=str(tmp_path / "history.sqlite"), disk_max_entries=3)
+    fill(store, 5)
+    assert store.stats()["disk_entries"] == 3
+
+    store = HistoryStore(max_age=0.05)
+    fill(store, 2)
+    time.sleep(0.1)
+    store.append({"text": "new"})
+    assert texts(store.page()) == ["new"]
+
+
+def test_clear(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    store = HistoryStore(disk_path=path)
+    fill(store, 3)
+    store.clear()
+    assert store.page() == []
+    assert store.append({"text": "next"})["id"] == 4
+    store.clear()
+    store.close()
+
+    # Ids keep increasing after a restart, so resuming clients do not skip new entries.
+    store = HistoryStore(disk_path=path)
+    assert store.last_id == 4
+    assert store.append({"text": "after restart"})["id"] == 5
+    store.close()
+
+
+async def test_async_writes_reach_the_disk(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    store = HistoryStore(max_entries=1, disk_path=path)
+    assert (await store.aappend({"text": "t0"}))["id"] == 1
+    await store.aappend({"text": "t1"})
+    assert texts(store.page(limit=2)) == ["t0", "t1"]
+    await store.aclear()
+    assert store.stats() == {"entries": 0, "last_id": 2, "disk_entries": 0}
+    store.close()
+
+
+def test_feed_drops_subscribers_that_fall_behind():
+    feed = HistoryFeed(max_queue=2)
+    with feed.subscribe() as queue:
+        for i in range(3):
+            feed.publish("history", {"id": i})
+        assert len(feed) == 0
+        assert queue.get_nowait() is None
+
+
+async def test_history_events_catch_up_then_follow():
+    from whisperchain.server.server import WhisperServer
+
+    server = WhisperServer()
+    server.history = HistoryStore()
+    fill(server.history, 3)
+    events = server.history_events(since=1, keepalive=0.05)
+    received = [await events.__anext__() for _ in range(2)]
+    assert [event.splitlines()[1] for event in received] == ["id: 2", "id: 3"]
+
+    assert await events.__anext__() == ": keepalive\n\n"
+    server.history_feed.publish("history", server.history.append({"text": "t3"}))
+    server.history_feed.publish("cleared", {})
+    assert await events.__anext__() == sse_event("history", {"id": 4, "text": "t3"}, 4)
+    assert await events.__anext__() == "event: cleared\ndata: {}\n\n"
+    await events.aclose()
+    assert len(server.history_feed) == 0
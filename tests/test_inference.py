@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from pywhispercpp.model import Segment
+
+from whisperchain.core.config import InferenceConfig
+from whisperchain.server.inference import InferencePool, InferenceQueueFull
+from whisperchain.server.models import ModelRegistry
+
+
+class FakeModel:
+    """Stands in for a pywhispercpp Model; sleeps to simulate decoding."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.threads = set()
+
+    def transcribe(self, audio):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return [Segment(0, len(audio) // 160, f"{len(audio)} samples")]
+
+
+def make_pool(config, model_factory=FakeModel):
+    return InferencePool(ModelRegistry(lambda name: model_factory(), "base.en"), config)
+
+
+@pytest.fixture
+async def pool():
+    pool = make_pool(InferenceConfig(workers=2, queue_depth=2, job_timeout=1.0))
+    await pool.start()
+    yield pool
+    await pool.stop()
+
+
+async def test_transcribe_returns_segments(pool):
+    segments = await pool.transcribe(np.zeros(1600, dtype=np.float32))
+    assert segments[0].text == "1600 samples"
+
+
+async def test_event_loop_stays_responsive(pool):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await pool.transcribe(np.zeros(16000, dtype=np.float32))
+    task.cancel()
+    assert ticks > 5, "Event loop was blocked during inference"
+
+
+async def test_workers_run_in_parallel(pool):
+    start = time.perf_counter()
+    await asyncio.gather(*[pool.transcribe(np.zeros(16, dtype=np.float32)) for _ in range(2)])
+    assert time.perf_counter() - start < 0.35
+
+
+async def test_queue_full():
+    pool = make_pool(InferenceConfig(workers=1, queue_depth=1, job_timeout=1.0))
+    await pool.start()
+    audio = np.zeros(16, dtype=np.float32)
+    # One job running and one waiting fills the pool.
+    running = asyncio.create_task(pool.transcribe(audio))
+    await asyncio.sleep(0.05)
+    waiting = asyncio.create_task(pool.transcribe(audio))
+    await asyncio.sleep(0)
+    with pytest.raises(InferenceQueueFull):
+        await pool.transcribe(audio)
+    await asyncio.gather(running, waiting)
+    await pool.stop()
+
+
+async def test_job_timeout():
+    pool = make_pool(
+        InferenceConfig(workers=1, queue_depth=1, job_timeout=0.1), lambda: FakeModel(delay=0.5)
+    )
+    await pool.start()
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.transcribe(np.zeros(16, dtype=np.float32))
+    await pool.stop()
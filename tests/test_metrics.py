@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pytest
+
+from whisperchain.core.config import InferenceConfig
+from whisperchain.server.inference import InferencePool
+from whisperchain.server.metrics import MetricsRegistry, ServerMetrics, StageTimings
+from whisperchain.server.models import ModelRegistry
+
+
+class FakeModel:
+    def transcribe(self, audio):
+        return []
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry(prefix="test_")
+    histogram = registry.histogram(
+        "decode_seconds", "Decode time.", labels=("kind",), buckets=(0.1, 1)
+    )
+    for value in [0.05, 0.5, 0.5, 3]:
+        histogram.observe(value, kind="final")
+    lines = registry.render().splitlines()
+    assert lines[:2] == [
+        "# HELP test_decode_seconds Decode time.",
+        "# TYPE test_decode_seconds histogram",
+    ]
+    assert lines[2:] == [
+        'test_decode_seconds_bucket{kind="final",le="0.1"} 1',
+        'test_decode_seconds_bucket{kind="final",le="1"} 3',
+        'test_decode_seconds_bucket{kind="final",le="+Inf"} 4',
+        'test_decode_seconds_sum{kind="final"} 4.05',
+        'test_decode_seconds_count{kind="final"} 4',
+    ]
+
+
+def test_counters_and_gauges():
+    registry = MetricsRegistry()
+    sessions = registry.counter("sessions_total", "Sessions.", labels=("outcome",))
+    active = registry.gauge("active", "Active.")
+    registry.gauge("ratio", "Ratio.", function=lambda: 0.25)
+    registry.gauge("missing", "Not available.", function=lambda: None)
+    sessions.inc(outcome="finished")
+    sessions.inc(outcome="finished")
+    active.inc()
+    active.dec()
+    text = registry.render()
+    assert 'sessions_total{outcome="finished"} 2\n' in text
+    assert "active 0\n" in text
+    assert "ratio 0.25\n" in text
+    assert "# TYPE missing gauge\nmissing" not in text
+    with pytest.raises(ValueError):
+        sessions.inc(kind="finished")
+
+
+async def test_inference_pool_records_queue_wait_and_decode():
+    metrics = ServerMetrics()
+    pool = InferencePool(
+        ModelRegistry(lambda name: FakeModel(), "base.en"),
+        InferenceConfig(workers=1, batch_window=0),
+        metrics,
+    )
+    await pool.start()
+    timings = StageTimings()
+    timings.end_received = time.perf_counter()
+    await pool.transcribe(np.zeros(16, dtype=np.float32), timings=timings)
+    await pool.transcribe(np.zeros(16, dtype=np.float32), partial=True)
+    await pool.stop()
+    assert metrics.decode.count(kind="final") == 1
+    assert metrics.decode.count(kind="partial") == 1
+    assert metrics.queue_wait.count(kind="final") == 1
+    report = timings.report(audio_seconds=2.0)
+    assert report["decode_wait_ms"] >= 0 and report["decode_ms"] >= 0
+    assert report["server_ms"] >= report["decode_wait_ms"]
+
+
+def test_stage_timings_without_final_decode():
+    timings = StageTimings()
+    timings.end_received = time.perf_counter()
+    timings.cleanup = 0.25
+    report = timings.report(audio_seconds=0.0)
+    assert report["decode_wait_ms"] is None and report["real_time_factor"] is None
+    assert report["cleanup_ms"] == 250.0
+
+
+def test_stage_timings_of_parallel_decodes():
+    timings = StageTimings()
+    timings.end_received = 10.0
+    # Two chunks decoded side by side, finishing out of order.
+    timings.add_decode(started=10.5, seconds=2.0)
+    timings.add_decode(started=10.1, seconds=1.0)
+    report = timings.report(audio_seconds=60.0)
+    assert report["decode_wait_ms"] == 100.0
+    assert report["decode_ms"] == 2400.0
+    assert report["decode_worker_ms"] == 3000.0
+    assert report["real_time_factor"] == 0.04
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+from whisperchain.core.config import ModelsConfig
+from whisperchain.server.models import ModelRegistry
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+
+
+def make_registry(**config):
+    loaded = []
+
+    def loader(name):
+        loaded.append(name)
+        return FakeModel(name)
+
+    config.setdefault("sizes_mb", {"tiny.en": 100, "base.en": 200, "small.en": 500})
+    return ModelRegistry(loader, "base.en", ModelsConfig(**config)), loaded
+
+
+def test_loads_lazily_per_slot():
+    registry, loaded = make_registry()
+    with registry.use(None) as model:
+        assert model.name == "base.en"
+    with registry.use("base.en", slot=0):
+        pass
+    with registry.use("tiny.en", slot=1) as model:
+        assert model.name == "tiny.en"
+    assert loaded == ["base.en", "tiny.en"]
+    assert registry.stats()["memory_used_mb"] == 300
+
+
+def test_evicts_least_recently_used():
+    registry, _ = make_registry(memory_budget_mb=700)
+    for name in ["tiny.en", "base.en", "tiny.en"]:
+        with registry.use(name):
+            pass
+    # Loading small.en exceeds the budget; base.en was used least recently.
+    with registry.use("small.en"):
+        pass
+    assert registry.loaded_models() == ["tiny.en", "small.en"]
+    assert registry.evictions == 1
+
+
+def test_models_in_use_are_not_evicted():
+    registry, _ = make_registry(memory_budget_mb=250)
+    with registry.use("base.en"):
+        with registry.use("tiny.en", slot=1):
+            pass
+        assert "base.en" in registry.loaded_models()
+
+
+def test_unload_waits_for_decodes_in_progress():
+    registry, loaded = make_registry()
+    in_use = threading.Event()
+    release = threading.Event()
+
+    def decode():
+        with registry.use("base.en"):
+            in_use.set()
+            release.wait()
+
+    thread = threading.Thread(target=decode)
+    thread.start()
+    in_use.wait()
+    assert registry.unload("base.en") == ["base.en"]
+    # Still loaded while the decode runs, dropped once it finishes.
+    assert registry.loaded_models() == ["base.en"]
+    release.set()
+    thread.join()
+    assert registry.loaded_models() == []
+    with registry.use("base.en"):
+        pass
+    assert loaded == ["base.en", "base.en"]
+
+
+async def test_ready_only_once_models_and_cleaner_are_loaded():
+    from fastapi.testclient import TestClient
+
+    from whisperchain.server.server import WhisperServer
+
+    server = WhisperServer()
+    # Without a context manager, the client does not run the startup event.
+    client = TestClient(server.app)
+    loading = asyncio.get_running_loop().create_future()
+    server.model_task = asyncio.ensure_future(loading)
+    server.cleaner_task = asyncio.create_task(asyncio.sleep(0))
+    await server.cleaner_task
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "loading", "cleaner": "ready", "models": "loading"}
+
+    loading.set_result(None)
+    await server.model_task
+    response = client.get("/ready")
+    assert response.status_code == 200 and response.json()["status"] == "ready"
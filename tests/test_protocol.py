@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from whisperchain.core.buffer import PCMBuffer
+from whisperchain.core.codec import DeltaCodec
+from whisperchain.core.protocol import (
+    ProtocolError,
+    decode_audio_frame,
+    encode_audio_frame,
+    start_message,
+    validate_start,
+)
+from whisperchain.server.session import StreamSession
+
+
+def test_audio_frame_round_trip():
+    # Payloads ending in the old END marker are just audio now.
+    frame = encode_audio_frame(7, b"audioEND\n")
+    assert decode_audio_frame(frame) == (7, b"audioEND\n")
+    with pytest.raises(ProtocolError):
+        decode_audio_frame(b"\x01")
+
+
+def test_validate_start():
+    validate_start(start_message("abc", "delta"), ["pcm", "delta"])
+    with pytest.raises(ProtocolError, match="codec"):
+        validate_start(start_message("abc", "opus"), ["pcm", "delta"])
+    with pytest.raises(ProtocolError, match="sample_rate"):
+        validate_start(start_message("abc", "pcm", sample_rate=44100), ["pcm"])
+    with pytest.raises(ProtocolError, match="version"):
+        validate_start({**start_message("abc", "pcm"), "version": 99}, ["pcm"])
+
+
+def test_session_frames_in_sequence():
+    codec = DeltaCodec()
+    session = StreamSession("abc", DeltaCodec(), PCMBuffer())
+    chunks = [np.arange(i, i + 100, dtype=np.int16).tobytes() for i in range(3)]
+    for seq, chunk in enumerate(chunks):
+        assert session.add_frame(seq, codec.encode(chunk)) == chunk
+    # A resent frame is ignored.
+    assert session.add_frame(1, codec.encode(chunks[1])) == b""
+    assert session.audio_buffer.to_pcm16() == b"".join(chunks)
+    session.check_complete(2)
+    with pytest.raises(ProtocolError):
+        session.check_complete(3)
+    # A gap in the sequence is an error.
+    with pytest.raises(ProtocolError):
+        session.add_frame(5, codec.encode(chunks[0]))
+    session.close()
+
+
+def test_corrupt_frame_is_a_protocol_error():
+    session = StreamSession("abc", DeltaCodec(), PCMBuffer())
+    with pytest.raises(ProtocolError, match="decode"):
+        session.add_frame(0, b"not zlib data")
+    assert session.next_seq == 0
+    session.close()
+
+
+def test_compressed_frame_cannot_exceed_the_buffer():
+    # 100 seconds of silence compress to a few hundred bytes.
+    payload = DeltaCodec().encode(bytes(100 * 16000 * 2))
+    assert len(payload) < 10000
+    session = StreamSession("abc", DeltaCodec(), PCMBuffer(max_seconds=10.0))
+    with pytest.raises(ProtocolError, match="more than"):
+        session.add_frame(0, payload)
+    assert len(session.audio_buffer) == 0
+    # A frame that fits exactly is still accepted.
+    assert session.add_frame(0, DeltaCodec().encode(bytes(10 * 16000 * 2)))
+    session.close()
+
+
+def test_corrupt_frame_fails_only_the_utterance():
+    from fastapi.testclient import TestClient
+
+    from whisperchain.server.server import WhisperServer
+
+    server = WhisperServer()
+    # Without a context manager, the client does not run the startup event.
+    client = TestClient(server.app)
+    with client.websocket_connect("/stream") as ws:
+        ws.send_json(start_message("abc", "delta"))
+        assert ws.receive_json()["type"] == "started"
+        ws.send_bytes(encode_audio_frame(0, b"not zlib data"))
+        error = ws.receive_json()
+        assert error["type"] == "error" and error["session_id"] == "abc"
+        assert server.metrics.active_sessions.value() == 0
+        # The connection carries the next utterance.
+        ws.send_json(start_message("def", "pcm"))
+        assert ws.receive_json()["type"] == "started"
+    assert server.metrics.active_sessions.value() == 0
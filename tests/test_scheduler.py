@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from whisperchain.core.config import InferenceConfig
+from whisperchain.server.scheduler import InferenceJob, InferenceScheduler
+
+SAMPLE_RATE = 16000
+
+
+def job(seconds, client=None, partial=False):
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    return InferenceJob(audio, asyncio.get_running_loop().create_future(), client, partial)
+
+
+async def order(scheduler, count):
+    return [len((await scheduler.get()).audio) / SAMPLE_RATE for _ in range(count)]
+
+
+async def test_short_clips_first():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=0))
+    for seconds in [30, 1, 5]:
+        scheduler.submit(job(seconds))
+    assert await order(scheduler, 3) == [1, 5, 30]
+
+
+async def test_fifo_without_short_clip_priority():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=0, short_clip_priority=False))
+    for seconds in [30, 1, 5]:
+        scheduler.submit(job(seconds))
+    assert await order(scheduler, 3) == [30, 1, 5]
+
+
+async def test_fair_between_clients():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=0))
+    # A burst of clips from one client does not hold back another client's clip.
+    for _ in range(4):
+        scheduler.submit(job(2, client="a"))
+    scheduler.submit(job(3, client="b"))
+    assert await order(scheduler, 5) == [2, 3, 2, 2, 2]
+
+
+async def test_final_before_partial():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=0))
+    scheduler.submit(job(1, client="a", partial=True))
+    scheduler.submit(job(10, client="b"))
+    assert (await scheduler.get()).partial is False
+
+
+async def test_partial_jobs_do_not_delay_final_ones():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=0))
+    # Previews queued for client "a" do not count against its final transcription.
+    for _ in range(3):
+        scheduler.submit(job(10, client="a", partial=True))
+    scheduler.submit(job(5, client="b"))
+    scheduler.submit(job(1, client="a"))
+    assert await order(scheduler, 2) == [1, 5]
+
+
+async def test_batch_window_collects_simultaneous_jobs():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=0.05))
+    scheduler.submit(job(30))
+    scheduler.submit(job(20))
+    getter = asyncio.create_task(scheduler.get())
+    await asyncio.sleep(0.01)
+    scheduler.submit(job(1))
+    assert len((await getter).audio) == SAMPLE_RATE
+
+
+async def test_idle_worker_skips_batch_window():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=1.0))
+    getter = asyncio.create_task(scheduler.get())
+    await asyncio.sleep(0)
+    scheduler.submit(job(1))
+    assert len((await asyncio.wait_for(getter, 0.1)).audio) == SAMPLE_RATE
+
+
+async def test_queue_depth_and_stats():
+    scheduler = InferenceScheduler(InferenceConfig(batch_window=0, queue_depth=2))
+    scheduler.submit(job(1))
+    scheduler.submit(job(1))
+    with pytest.raises(asyncio.QueueFull):
+        scheduler.submit(job(1))
+    await order(scheduler, 2)
+    stats = scheduler.stats()
+    assert stats["submitted"] == 2 and stats["dispatched"] == 2 and stats["rejected"] == 1
+    assert stats["pending"] == 0 and stats["queue_time_max"] >= 0
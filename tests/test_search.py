@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from whisperchain.server.history import HistoryStore
+from whisperchain.server.search import InvertedIndex, fts_query, searchable_text
+
+
+def ids(entries):
+    return [entry["id"] for entry in entries]
+
+
+def add(store, *texts):
+    for text in texts:
+        store.append({"transcription": "[0-100] " + text, "cleaned_transcription": text})
+
+
+@pytest.fixture(params=["memory", "disk"])
+def store(request, tmp_path):
+    disk_path = str(tmp_path / "history.sqlite") if request.param == "disk" else None
+    store = HistoryStore(disk_path=disk_path)
+    yield store
+    store.close()
+
+
+def test_searchable_text_strips_timestamps():
+    entry = {"transcription": "[0-250] hello [250-400] world", "cleaned_transcription": "Hi."}
+    assert searchable_text(entry).split() == ["hello", "world", "Hi."]
+
+
+def test_fts_query_quotes_words():
+    assert fts_query("state-of-the-art") == '"state" "of" "the" "art"'
+    assert fts_query(" *? ") is None
+
+
+def test_inverted_index_ranks_with_bm25():
+    index = InvertedIndex()
+    index.add(1, "the meeting is on monday")
+    index.add(2, "meeting meeting notes")
+    index.add(3, "lunch on monday")
+    assert [doc_id for doc_id, _ in index.search("meeting")] == [2, 1]
+    assert [doc_id for doc_id, _ in index.search("Monday meeting")] == [1]
+    assert index.search("tuesday") == []
+    index.remove(2)
+    assert [doc_id for doc_id, _ in index.search("meeting")] == [1]
+    assert len(index) == 2
+
+
+def test_search_ranks_and_paginates(store):
+    add(store, "budget review", "weather report", "budget budget planning", "budget")
+    add(store, *(f"filler {i}" for i in range(6)))
+    results = store.search("budget")
+    assert ids(results) == [4, 3, 1]
+    assert results[0]["score"] > results[1]["score"] > results[2]["score"] > 0
+    assert ids(store.search("budget", limit=2, offset=1)) == [3, 1]
+    assert ids(store.search("budget review")) == [1]
+    assert store.search("missing") == []
+    assert store.search("") == []
+
+
+def test_search_time_filters(store):
+    add(store, "first note")
+    time.sleep(0.05)
+    middle = time.time()
+    add(store, "second note")
+    assert ids(store.search("note", start=middle)) == [2]
+    assert ids(store.search("note", end=middle)) == [1]
+
+
+def test_search_follows_retention_and_clear(tmp_path):
+    memory = HistoryStore(max_entries=2)
+    add(memory, "alpha one", "alpha two", "alpha three")
+    assert sorted(ids(memory.search("alpha"))) == [2, 3]
+
+    disk = HistoryStore(max_entries=1, disk_path=str(tmp_path / "h.sqlite"), disk_max_entries=2)
+    add(disk, "alpha one", "alpha two", "alpha three")
+    assert sorted(ids(disk.search("alpha"))) == [2, 3]
+    disk.clear()
+    assert disk.search("alpha") == []
+    disk.close()
+
+
+def test_disk_search_indexes_existing_history(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    store = HistoryStore(disk_path=path)
+    add(store, "kept across restarts")
+    # Simulate a database written before the search index existed.
+    store._db.execute("DROP TABLE history_fts")
+    store._db.commit()
+    store.close()
+
+    store = HistoryStore(disk_path=path)
+    assert ids(store.search("restarts")) == [1]
+    store.close()
@@ -1,15 +1,108 @@
 import asyncio
+import json
 import os
+import threading
+import time
 from time import sleep
 
 import pytest
+import websockets
 
 from whisperchain.client.stream_client import StreamClient
+from whisperchain.core.config import ClientConfig
 from whisperchain.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+class ThreadCapture:
+    """Stands in for the microphone: feeds the utterance's AudioReader from a thread."""
+
+    def __init__(self):
+        self.running = threading.Event()
+        self.thread = None
+
+    def begin(self, reader):
+        def feed():
+            while self.running.is_set():
+                reader.put(bytes(640))
+                time.sleep(0.02)
+
+        self.running.set()
+        self.thread = threading.Thread(target=feed, daemon=True)
+        self.thread.start()
+
+    def end(self):
+        self.running.clear()
+        self.thread.join()
+
+
+@pytest.fixture
+async def fake_server():
+    """A server that answers the end message with a final result, unless told to hang."""
+    received = []
+    state = {"final": True}
+
+    async def handler(websocket, *args):
+        frames = 0
+        async for message in websocket:
+            if isinstance(message, bytes):
+                frames += 1
+                continue
+            request = json.loads(message)
+            received.append((time.monotonic(), request))
+            if request["type"] == "hello":
+                await websocket.send(json.dumps({"type": "hello", "codec": "pcm"}))
+            elif request["type"] == "start":
+                session_id = request["session_id"]
+                await websocket.send(json.dumps({"type": "started", "session_id": session_id}))
+                await websocket.send(json.dumps({"session_id": session_id, "is_partial": True}))
+            elif request["type"] == "end" and state["final"]:
+                await websocket.send(
+                    json.dumps({"session_id": session_id, "is_final": True, "frames": frames})
+                )
+
+    async with websockets.serve(handler, "localhost", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        yield f"ws://localhost:{port}", received, state
+
+
+def streaming_tasks():
+    return [task for task in asyncio.all_tasks() if "_forward_errors" in repr(task.get_coro())]
+
+
+async def test_stream_sends_end_after_stop_and_yields_final(fake_server):
+    url, received, _ = fake_server
+    client = StreamClient(ClientConfig(server_url=url), capture=ThreadCapture())
+
+    async def stop_later():
+        await asyncio.sleep(0.2)
+        client.stop()
+        return time.monotonic()
+
+    stopper = asyncio.create_task(stop_later())
+    messages = [message async for message in client.stream_microphone()]
+    stopped_at = await stopper
+    assert messages[-1]["is_final"] and messages[-1]["frames"] > 0
+    ended_at = next(at for at, request in received if request["type"] == "end")
+    assert ended_at - stopped_at < 0.1
+    assert streaming_tasks() == []
+
+
+async def test_abandoned_stream_cancels_tasks_and_session(fake_server):
+    url, received, state = fake_server
+    state["final"] = False
+    capture = ThreadCapture()
+    client = StreamClient(ClientConfig(server_url=url), capture=capture)
+    stream = client.stream_microphone()
+    assert (await stream.__anext__())["is_partial"]
+    await stream.aclose()
+    assert streaming_tasks() == []
+    assert not capture.running.is_set()
+    await asyncio.sleep(0.1)
+    assert [request["type"] for _, request in received][-1] == "cancel"
+
+
 async def stop_after(client, seconds):
     await asyncio.sleep(seconds)
     # Clear the recording flag to trigger the stop logic in stream_microphone()
@@ -0,0 +1,91 @@
+import numpy as np
+from pywhispercpp.model import Segment
+
+from whisperchain.core.config import PartialTranscriptConfig
+from whisperchain.server.streaming import StreamingTranscriber
+
+SAMPLE_RATE = 16000
+
+
+class FakeDecoder:
+    """Returns one segment per full second of audio and records decoded lengths."""
+
+    def __init__(self):
+        self.decoded = []
+
+    async def __call__(self, audio):
+        self.decoded.append(len(audio))
+        seconds = len(audio) // SAMPLE_RATE
+        return [Segment(i * 100, (i + 1) * 100, f"s{i}") for i in range(seconds)]
+
+
+def seconds(n):
+    return np.zeros(n * SAMPLE_RATE, dtype=np.float32)
+
+
+async def test_commits_stable_segments():
+    decoder = FakeDecoder()
+    transcriber = StreamingTranscriber(decoder, PartialTranscriptConfig(commit_margin=1.0))
+
+    segments = await transcriber.update(seconds(4))
+    # Segments ending at least 1s before the end are committed; the last is kept tentative.
+    assert [s.text for s in transcriber.committed] == ["s0", "s1", "s2"]
+    assert [s.text for s in transcriber.tentative] == ["s3"]
+    assert [s.text for s in segments] == ["s0", "s1", "s2", "s3"]
+    assert transcriber.committed_samples == 3 * SAMPLE_RATE
+
+
+async def test_finalize_decodes_only_tail():
+    decoder = FakeDecoder()
+    transcriber = StreamingTranscriber(decoder, PartialTranscriptConfig(commit_margin=1.0))
+    await transcriber.update(seconds(4))
+
+    segments = await transcriber.finalize(seconds(6))
+    assert decoder.decoded == [4 * SAMPLE_RATE, 3 * SAMPLE_RATE]
+    # Tail segments are shifted back to absolute timestamps.
+    assert [(s.t0, s.t1) for s in segments[3:]] == [(300, 400), (400, 500), (500, 600)]
+
+
+async def test_needs_update():
+    transcriber = StreamingTranscriber(FakeDecoder(), PartialTranscriptConfig(interval=1.0))
+    assert not transcriber.needs_update(SAMPLE_RATE // 2)
+    assert transcriber.needs_update(SAMPLE_RATE)
+    await transcriber.update(seconds(1))
+    assert not transcriber.needs_update(SAMPLE_RATE + 100)
+
+
+async def test_partial_transcripts_route_on_the_whole_utterance():
+    from whisperchain.core.config import ServerConfig
+    from whisperchain.core.protocol import start_message
+    from whisperchain.server.server import WhisperServer
+
+    config = ServerConfig(
+        partial={"enabled": True},
+        models={"routes": [{"max_seconds": 2, "model": "tiny.en"}]},
+    )
+    server = WhisperServer(config)
+    models = []
+
+    class Pool:
+        async def transcribe(self, audio, client, partial, model, timings):
+            models.append(model)
+            return [Segment(i * 100, (i + 1) * 100, model) for i in range(len(audio) // 16000)]
+
+    class WebSocket:
+        async def send_json(self, message):
+            pass
+
+    server.inference_pool = Pool()
+    session = server.start_session(start_message("abc", "pcm"))
+    second = np.zeros(SAMPLE_RATE, dtype=np.int16).tobytes()
+    for seq in range(10):
+        session.add_frame(seq, second)
+        await server.send_partial_transcript(WebSocket(), session, session.audio_buffer.view())
+    # Short partial transcripts use the small model until the utterance outgrows it.
+    assert models[:3] == ["tiny.en", "tiny.en", "base.en"]
+
+    server.route_session(session, len(session.audio_buffer))
+    segments = await server.transcribe_buffer(session.audio_buffer, session.transcriber)
+    assert len(segments) == 10
+    assert {segment.text for segment in segments} == {"base.en"}
+    session.close()
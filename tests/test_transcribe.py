@@ -0,0 +1,166 @@
+import asyncio
+import io
+import json
+import wave
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from pywhispercpp.model import Segment
+
+import whisperchain.cli.transcribe as transcribe_cli
+from whisperchain.server.history import HistoryStore
+
+PCM = (np.ones(16000) * 1000).astype(np.int16).tobytes()
+
+
+def wav_bytes(pcm: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def server():
+    from whisperchain.server.server import WhisperServer
+
+    server = WhisperServer()
+    server.history = HistoryStore()
+
+    async def transcribe_audio(audio, client=None, partial=False, model=None, timings=None):
+        return [Segment(0, 100, f"{len(audio)} samples")]
+
+    server.transcribe_audio = transcribe_audio
+    return server
+
+
+async def test_transcribe_upload_accepts_wav_and_pcm(server):
+    result = await server.transcribe_upload(wav_bytes(PCM), cleanup=False, filename="a.wav")
+    assert result["is_final"]
+    assert result["transcription"] == "[0-100] 16000 samples"
+    assert result["cleaned_transcription"] == "16000 samples"
+    assert result["filename"] == "a.wav"
+
+    result = await server.transcribe_upload(PCM[:16000], cleanup=False)
+    assert result["transcription"] == "[0-100] 8000 samples"
+    assert [entry["id"] for entry in server.history.page()] == [1, 2]
+
+    with pytest.raises(ValueError):
+        await server.transcribe_upload(b"odd", cleanup=False)
+
+
+def test_transcribe_endpoint_single_and_batch(server):
+    # Without a context manager, the client does not run the startup event.
+    client = TestClient(server.app)
+    response = client.post("/transcribe", params={"cleanup": "false"}, content=PCM)
+    assert response.status_code == 200
+    assert response.json()["processed_bytes"] == len(PCM)
+
+    response = client.post("/transcribe", content=b"")
+    assert response.status_code == 400
+
+    files = [
+        ("files", ("a.wav", wav_bytes(PCM), "audio/wav")),
+        ("files", ("b.wav", b"RIFF broken", "audio/wav")),
+    ]
+    response = client.post("/transcribe", params={"cleanup": "false"}, files=files)
+    assert response.status_code == 200
+    first, second = response.json()
+    assert first["filename"] == "a.wav" and first["is_final"]
+    assert second["filename"] == "b.wav" and "error" in second
+
+
+def test_find_recordings(tmp_path):
+    (tmp_path / "b.wav").write_bytes(b"")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.pcm").write_bytes(b"")
+    (tmp_path / "notes.txt").write_bytes(b"")
+    extra = tmp_path / "notes.txt"
+    recordings = transcribe_cli.find_recordings([tmp_path, extra])
+    assert recordings == [tmp_path / "b.wav", tmp_path / "sub" / "a.pcm", extra]
+
+
+def test_transcribe_files_writes_json_lines(monkeypatch, tmp_path):
+    def transcribe_file(url, path, params, timeout):
+        if path.name == "bad.wav":
+            raise RuntimeError("HTTP 400: Not a PCM WAV file")
+        return {"cleaned_transcription": path.stem, **params}
+
+    monkeypatch.setattr(transcribe_cli, "transcribe_file", transcribe_file)
+    output = io.StringIO()
+    paths = [tmp_path / f"{name}.wav" for name in ("one", "bad", "two")]
+    done, failed = transcribe_cli.transcribe_files(
+        paths, "http://server", {"cleanup": "false"}, output, concurrency=2
+    )
+    assert (done, failed) == (2, 1)
+    results = {
+        json.loads(line)["file"]: json.loads(line) for line in output.getvalue().splitlines()
+    }
+    assert results[str(paths[0])]["cleaned_transcription"] == "one"
+    assert results[str(paths[1])]["error"] == "HTTP 400: Not a PCM WAV file"
+
+
+async def test_long_audio_is_decoded_in_chunks(server):
+    server.config.long_audio.min_seconds = 20.0
+    server.config.long_audio.chunk_seconds = 10.0
+    server.config.long_audio.min_chunk_seconds = 5.0
+    server.config.inference.workers = 2
+    chunks = []
+
+    class Pool:
+        async def transcribe(self, audio, client, partial, model, timings):
+            chunks.append(len(audio))
+            return [Segment(0, len(audio) * 100 // 16000, "chunk")]
+
+    from whisperchain.server.server import WhisperServer
+
+    server.inference_pool = Pool()
+    audio = np.zeros(25 * 16000, np.float32)
+    segments = await WhisperServer.transcribe_audio(server, audio)
+    assert sum(chunks) == len(audio) and max(chunks) <= 10 * 16000
+    # Chunk timestamps are offset to positions in the whole recording.
+    assert segments[0].t0 == 0 and segments[-1].t1 == 2500
+    assert all(a.t1 == b.t0 for a, b in zip(segments, segments[1:]))
+
+    chunks.clear()
+    await WhisperServer.transcribe_audio(server, audio[: 15 * 16000])
+    assert chunks == [15 * 16000]
+
+
+async def test_long_audio_chunks_share_the_workers(server):
+    from whisperchain.server.server import WhisperServer
+
+    server.config.long_audio.min_seconds = 20.0
+    server.config.long_audio.chunk_seconds = 10.0
+    server.config.inference.workers = 2
+    in_flight, peak = 0, 0
+
+    class Pool:
+        async def transcribe(self, audio, client, partial, model, timings):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return []
+
+    server.inference_pool = Pool()
+    audio = np.zeros(40 * 16000, np.float32)
+    # Several long recordings at once still queue at most one chunk per worker.
+    await asyncio.gather(*(WhisperServer.transcribe_audio(server, audio) for _ in range(3)))
+    assert peak == 2
+
+
+async def test_uploads_may_be_longer_than_live_utterances(server):
+    # Longer than the 10 minutes a live utterance may last.
+    pcm = np.zeros(11 * 60 * 16000, np.int16).tobytes()
+    result = await server.transcribe_upload(pcm, cleanup=False)
+    assert result["processed_bytes"] == len(pcm)
+
+    server.config.buffer.upload_max_seconds = 60.0
+    response = TestClient(server.app).post("/transcribe", content=pcm)
+    assert response.status_code == 413
@@ -0,0 +1,95 @@
+import numpy as np
+
+from whisperchain.core.config import VADConfig
+from whisperchain.core.vad import (
+    SilenceGate,
+    speech_frames,
+    split_on_silence,
+    trim_silence,
+)
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, amplitude=0.3, frequency=220.0):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def silence(seconds):
+    noise = np.random.default_rng(0).normal(0, 0.001, int(seconds * SAMPLE_RATE))
+    return noise.astype(np.float32)
+
+
+def to_pcm(samples):
+    return (samples * np.iinfo(np.int16).max).astype(np.int16).tobytes()
+
+
+def test_speech_frames():
+    config = VADConfig(frame_ms=10)
+    audio = np.concatenate([silence(0.5), tone(0.5)])
+    frames = speech_frames(audio, SAMPLE_RATE, config)
+    assert not frames[:50].any()
+    assert frames[50:].all()
+
+
+def test_unvoiced_frames_use_zero_crossings():
+    config = VADConfig(frame_ms=10, energy_threshold=0.01)
+    # Quiet, noisy hiss like an "s": below the energy threshold but crossing zero constantly.
+    hiss = np.random.default_rng(1).normal(0, 0.005, SAMPLE_RATE).astype(np.float32)
+    assert speech_frames(hiss, SAMPLE_RATE, config).mean() > 0.9
+
+
+def test_trim_silence():
+    config = VADConfig(frame_ms=10, padding_ms=100)
+    audio = np.concatenate([silence(1.0), tone(1.0), silence(1.0)])
+    start, end = trim_silence(audio, SAMPLE_RATE, config)
+    assert abs(start - 0.9 * SAMPLE_RATE) <= 160
+    assert abs(end - 2.1 * SAMPLE_RATE) <= 160
+    assert trim_silence(silence(1.0), SAMPLE_RATE, config) == (0, 0)
+
+
+def test_silence_gate():
+    config = VADConfig(frame_ms=10, padding_ms=250)
+    gate = SilenceGate(config, SAMPLE_RATE)
+    chunk = SAMPLE_RATE // 10
+    quiet, loud = to_pcm(silence(0.1)), to_pcm(tone(0.1))
+
+    # Leading silence is held back rather than sent.
+    assert [gate.process(quiet) for _ in range(5)] == [b""] * 5
+    # Speech releases the held chunks covering padding_ms before it.
+    sent = gate.process(loud)
+    assert len(sent) == 2 * (3 * chunk + chunk)
+    # Trailing silence is sent for padding_ms, then dropped again.
+    trailing = [gate.process(quiet) for _ in range(5)]
+    assert [len(t) for t in trailing] == [2 * chunk] * 3 + [0, 0]
+
+
+def test_split_on_silence_cuts_in_pauses():
+    config = VADConfig(frame_ms=10)
+    # Speech with a short pause at 3 s and a long one at 6-7 s.
+    audio = np.concatenate(
+        [tone(3.0), silence(0.2), tone(2.8), silence(1.0), tone(3.0), silence(0.5), tone(1.0)]
+    )
+    spans = split_on_silence(audio, SAMPLE_RATE, config, max_seconds=8.0, min_seconds=2.0)
+    assert spans[0][0] == 0 and spans[-1][1] == len(audio)
+    assert all(end == start for (_, end), (start, _) in zip(spans, spans[1:]))
+    # The first cut lands in the middle of the longer pause.
+    assert abs(spans[0][1] / SAMPLE_RATE - 6.5) < 0.05
+    assert all(end - start <= 8.0 * SAMPLE_RATE for start, end in spans)
+
+
+def test_split_on_silence_without_pauses():
+    config = VADConfig(frame_ms=10)
+    audio = tone(25.0)
+    spans = split_on_silence(audio, SAMPLE_RATE, config, max_seconds=10.0, min_seconds=5.0)
+    assert spans[0][0] == 0 and spans[-1][1] == len(audio)
+    assert all(5.0 * SAMPLE_RATE <= end - start <= 10.0 * SAMPLE_RATE for start, end in spans[:-1])
+    assert split_on_silence(tone(5.0), SAMPLE_RATE, config, max_seconds=10.0) == [(0, 80000)]
+
+
+def test_split_on_silence_with_fixed_chunk_length():
+    config = VADConfig(frame_ms=10)
+    audio = tone(25.0)
+    spans = split_on_silence(audio, SAMPLE_RATE, config, max_seconds=10.0, min_seconds=10.0)
+    assert spans == [(0, 160000), (160000, 320000), (320000, 400000)]